@@ -35,6 +35,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'management.perf.QueryPerfMiddleware', # Query count/latency (session/auth queries bhi gine)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -71,6 +72,53 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile (DB_PROFILE=production):
+# - WAL: report padhte waqt bhi entry save ho sake (reader writer ko nahi rokta)
+# - timeout: lock mile to 20 sec tak ruko, turant "database is locked" nahi
+# - IMMEDIATE: write transaction shuru me hi lock le - beech me upgrade par deadlock nahi
+# - CONN_MAX_AGE: har request par naya connection (aur pragmas) nahi
+# Pragmas management/db.py ka connection_created hook lagata hai.
+SQLITE_PRODUCTION = {
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'timeout': 20,
+        'transaction_mode': 'IMMEDIATE',
+    },
+}
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL', # WAL me safe; har commit par fsync nahi
+    'cache_size': -64000,    # KiB me (minus) = ~64 MB page cache
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+SQLITE_PRAGMAS = {}
+
+# PostgreSQL (DB_ENGINE=postgres, `pip install "psycopg[binary]"`). Purana data:
+#   python manage.py migrate && python manage.py copy_from_sqlite
+if os.environ.get('DB_ENGINE') == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'canteen'),
+            'USER': os.environ.get('POSTGRES_USER', 'canteen'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+        },
+        # copy_from_sqlite ka source - app isse kabhi query nahi karta
+        'sqlite': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        },
+    }
+elif os.environ.get('DB_PROFILE') == 'production':
+    DATABASES['default'].update(SQLITE_PRODUCTION)
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -100,4 +148,107 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # 6. Login Redirects
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home_dashboard'
-LOGOUT_REDIRECT_URL = 'login'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'login'
+# Cache: 'reports' me rendered report HTML, 'report_versions' me uske
+# invalidation counters (management/report_cache.py). Counters alag cache me,
+# taaki bade HTML entries ke cull me koi counter na ude.
+# Production profile / PostgreSQL par kai server processes (aur export worker)
+# hote hain - wahan default file cache, taaki signal se hua invalidation sab
+# processes ko dikhe (locmem har process ka alag hai). REPORT_CACHE=file/locmem
+# se badal sakte hain.
+REPORT_CACHE = os.environ.get('REPORT_CACHE') or (
+    'file' if os.environ.get('DB_PROFILE') == 'production' or os.environ.get('DB_ENGINE') == 'postgres'
+    else 'locmem'
+)
+# Counters chhote hain (canteens x mahine) - MAX_ENTRIES itna ki cull kabhi na ho
+REPORT_VERSION_MAX_ENTRIES = 10 ** 7
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'reports',
+        'OPTIONS': {'MAX_ENTRIES': 500},
+    },
+    'report_versions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'report_versions',
+        'OPTIONS': {'MAX_ENTRIES': REPORT_VERSION_MAX_ENTRIES},
+    },
+}
+if REPORT_CACHE == 'file':
+    CACHES['reports'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'reports',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    }
+    CACHES['report_versions'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'report_versions',
+        'OPTIONS': {'MAX_ENTRIES': REPORT_VERSION_MAX_ENTRIES},
+    }
+REPORT_CACHE_TIMEOUT = 60 * 60 * 24 # seconds
+
+# Lambi report tables me ek baar me kitne rows (baaki "Load more" se)
+REPORT_PAGE_SIZE = 50
+
+# 7. Performance Log (management/perf.py)
+# Har request ki queries/time logs/perf.log me (5 MB ki 3 files tak)
+LOG_DIR = BASE_DIR / 'logs'
+LOG_DIR.mkdir(exist_ok=True)
+PERF_LOG_FILE = LOG_DIR / 'perf.log'
+PERF_LOG_BACKUPS = 3
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'perf_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': PERF_LOG_FILE,
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': PERF_LOG_BACKUPS,
+            'formatter': 'plain',
+            'encoding': 'utf-8',
+        },
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'management.perf': {'handlers': ['perf_file'], 'level': 'INFO', 'propagate': False},
+        'management.budget': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# View (url name) -> max SQL queries, session/auth ki 2 queries milake.
+# Zyada hua to production me warning, tests me failure.
+PERF_QUERY_BUDGETS = {
+    'home_dashboard': 5,
+    'canteen_summary_report': 8,
+    'canteen_summary_rows': 4,
+    'canteen_detail_report': 5,
+    'canteen_day_expenses': 4,
+    'payroll_summary': 5,
+    'generate_payroll': 9,       # snapshot recompute: leaves + insert/update, purane mahine par joining check
+    'get_canteen_data': 3,
+    'dashboard_trend': 3,
+    'staff_list': 3,
+    'staff_profile': 8,          # pehla view: naye ledger checkpoints - BEGIN + ek INSERT
+    'print_staff_ledger': 8,
+    'staff_leave_history': 4,
+    'staff_leave_history_rows': 3,
+    'consumption_report': 5,
+    'consumption_rows': 3,
+    'canteen_comparison_report': 8, # har table ki ek GROUP BY canteen query
+    'export_comparison_excel': 8,
+    'export_expenses': 3,
+    'export_canteen_excel': 9,
+    'ex_staff_list': 3,
+    'bulk_daily_entry': 24,      # POST: upsert + har chhue mahine ka summary rebuild (hafta = 2 mahine)
+}
+PERF_BUDGET_STRICT = False
+TEST_RUNNER = 'management.perf.PerfBudgetTestRunner'
@@ -0,0 +1,265 @@
+# benchmarks/run.py
+
+"""
+Report/Export views ka benchmark, alag-alag data scale par.
+
+    python benchmarks/run.py                       # tiny, small, medium
+    python benchmarks/run.py --scales large        # ~1M rows (seed me ~15 sec)
+    python benchmarks/run.py --update-baseline     # naye numbers ko baseline bana do
+
+Har scale ka seeded SQLite database benchmarks/.data/ me cache hota hai
+(seed_scale command se, fixed --seed aur --end-date). Har view ke liye wall
+time (median), query count aur peak Python memory (tracemalloc) naapte hain,
+results JSON me likhte hain aur benchmarks/baseline.json se compare karte hain.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+DATA_DIR = BENCH_DIR / '.data'
+BASELINE_FILE = BENCH_DIR / 'baseline.json'
+RESULTS_FILE = BENCH_DIR / 'results' / 'latest.json'
+
+SEED_END_DATE = '2025-12-31'
+SCALES = {
+    # naam: seed_scale arguments
+    'tiny': ['--canteens', '2', '--staff', '5', '--years', '1'],
+    'small': ['--canteens', '5', '--staff', '10', '--years', '2'],
+    'medium': ['--canteens', '20', '--staff', '15', '--years', '3'],
+    'large': ['--canteens', '50', '--staff', '15', '--years', '5', '--expenses-per-day', '10'],
+}
+DEFAULT_SCALES = ['tiny', 'small', 'medium']
+
+# Baseline se itna dheema ho tab regression (aur kam se kam MIN_TIME_DELTA_MS)
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+MIN_TIME_DELTA_MS = 5
+
+
+# ==========================================
+# Worker: ek scale ke database par saare views
+# ==========================================
+
+def _benchmark_urls():
+    from django.urls import reverse
+    from management.models import Canteen, Staff
+
+    # MONTHLY canteen - token columns bhi Excel me aayein
+    canteen = Canteen.objects.filter(billing_type='MONTHLY').order_by('pk').first() \
+        or Canteen.objects.order_by('pk').first()
+    staff = Staff.objects.order_by('pk').first()
+    year = '?start_date=2025-01-01&end_date=2025-12-31'
+
+    return {
+        'home_dashboard': reverse('home_dashboard') + '?filter_date=2025-12',
+        'canteen_summary_report': reverse('canteen_summary_report', args=[canteen.pk]) + year,
+        'consumption_report': reverse('consumption_report') + year,
+        'payroll_summary': reverse('payroll_summary'),
+        'generate_payroll': reverse('generate_payroll') + '?month=12&year=2025',
+        'staff_profile_view': reverse('staff_profile', args=[staff.pk]),
+        'export_canteen_excel': reverse('export_canteen_excel', args=[canteen.pk]) + year,
+        'export_monthly_expenses': reverse('export_expenses') + year,
+    }
+
+
+def _request(client, url):
+    response = client.get(url)
+    # Streaming response (CSV/Excel) ka poora content padho, warna kaam hua hi nahi
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} -> HTTP {response.status_code}")
+    return len(body)
+
+
+def _measure(client, url, repeats):
+    from management.perf import track_queries
+    from management.report_cache import report_cache
+
+    # Har request se pehle (timer ke bahar) report HTML cache khali - warna
+    # repeats sirf cache hit naapte aur baseline me asli regression chhup jaata.
+    # Version counters rehte hain, wo DB ka koi kaam nahi bachate.
+    cache = report_cache()
+
+    # Pehli request alag (cold): payroll snapshot/ledger checkpoints isi me bante hain
+    cache.clear()
+    start = time.perf_counter()
+    _request(client, url)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(repeats):
+        cache.clear()
+        start = time.perf_counter()
+        size = _request(client, url)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    cache.clear()
+    with track_queries() as queries:
+        _request(client, url)
+
+    cache.clear()
+    tracemalloc.start()
+    _request(client, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'first_ms': round(first_ms, 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'queries': queries.count,
+        'peak_kb': round(peak / 1024, 1),
+        'bytes': size,
+    }
+
+
+def _prepare_database(scale):
+    """Seeded DB cache me na ho (ya args badle hon) to naya banao."""
+    from django.core.management import call_command
+
+    db_path = Path(os.environ['BENCH_DB'])
+    marker = db_path.with_suffix('.json')
+    seed_args = SCALES[scale] + ['--end-date', SEED_END_DATE]
+
+    if db_path.exists() and not (marker.exists() and json.loads(marker.read_text()) == seed_args):
+        db_path.unlink()
+    fresh = not db_path.exists()
+
+    call_command('migrate', verbosity=0)
+    if fresh:
+        start = time.perf_counter()
+        call_command('seed_scale', *seed_args)
+        marker.write_text(json.dumps(seed_args))
+        print(f"[{scale}] seeded in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+def run_worker(scale, repeats, output):
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+
+    _prepare_database(scale)
+    setup_test_environment() # Client ke liye (ALLOWED_HOSTS me testserver, templates instrument)
+
+    user, _ = User.objects.get_or_create(
+        username='bench', defaults={'is_staff': True, 'is_superuser': True}
+    )
+    client = Client()
+    client.force_login(user)
+
+    results = {}
+    for name, url in _benchmark_urls().items():
+        results[name] = _measure(client, url, repeats)
+        print(f"[{scale}] {name:<24} {results[name]['median_ms']:>9.1f} ms "
+              f"{results[name]['queries']:>4} q {results[name]['peak_kb']:>9.0f} KB", file=sys.stderr)
+
+    Path(output).write_text(json.dumps(results))
+
+
+# ==========================================
+# Runner: har scale alag process me, phir baseline se compare
+# ==========================================
+
+def run_scale(scale, repeats):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+        'BENCH_DB': str(DATA_DIR / f'{scale}.sqlite3'),
+        'PYTHONPATH': os.pathsep.join(filter(None, [str(ROOT_DIR), os.environ.get('PYTHONPATH')])),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / 'result.json'
+        subprocess.run(
+            [sys.executable, __file__, '--worker', scale, '--repeats', str(repeats), '--worker-output', str(output)],
+            env=env, check=True, cwd=ROOT_DIR,
+        )
+        return json.loads(output.read_text())
+
+
+def compare(results, baseline):
+    """Baseline se zyada time/queries/memory wale (scale, view) ki list."""
+    regressions = []
+    for scale, views in results.items():
+        for name, current in views.items():
+            base = baseline.get(scale, {}).get(name)
+            if not base:
+                continue
+            if current['queries'] > base['queries']:
+                regressions.append((scale, name, 'queries', base['queries'], current['queries']))
+            slower = current['median_ms'] - base['median_ms']
+            if slower > MIN_TIME_DELTA_MS and current['median_ms'] > base['median_ms'] * (1 + TIME_TOLERANCE):
+                regressions.append((scale, name, 'median_ms', base['median_ms'], current['median_ms']))
+            if current['peak_kb'] > base['peak_kb'] * (1 + MEMORY_TOLERANCE):
+                regressions.append((scale, name, 'peak_kb', base['peak_kb'], current['peak_kb']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default=','.join(DEFAULT_SCALES),
+                        help=f"Comma separated: {', '.join(SCALES)}")
+    parser.add_argument('--repeats', type=int, default=5, help="Har view kitni baar (median nikalne ke liye)")
+    parser.add_argument('--output', default=str(RESULTS_FILE))
+    parser.add_argument('--baseline', default=str(BASELINE_FILE))
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Is run ke numbers baseline file me likh do")
+    parser.add_argument('--strict', action='store_true', help="Regression mile to exit code 1")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--worker-output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return run_worker(args.worker, args.repeats, args.worker_output)
+
+    scales = [s.strip() for s in args.scales.split(',') if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"Unknown scale(s): {', '.join(unknown)}")
+
+    results = {scale: run_scale(scale, args.repeats) for scale in scales}
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+    print(f"Results: {output}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+        print(f"Baseline updated: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print("Baseline file nahi mili - --update-baseline se banayein.")
+        return 0
+
+    regressions = compare(results, json.loads(baseline_path.read_text()))
+    if not regressions:
+        print("Baseline ke muqable koi regression nahi.")
+        return 0
+
+    print("REGRESSIONS:")
+    for scale, name, metric, before, after in regressions:
+        print(f"  [{scale}] {name:<24} {metric:<10} {before} -> {after}")
+    return 1 if args.strict else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
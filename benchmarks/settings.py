@@ -0,0 +1,26 @@
+# benchmarks/settings.py
+
+# ==========================================
+# Benchmark Settings
+# ==========================================
+# Asli settings hi, bas database alag (har scale ki apni SQLite file, jo
+# benchmarks/run.py BENCH_DB env se deta hai) aur perf log band.
+
+import os
+
+from Canteen_Manager.settings import *  # noqa: F401,F403
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['BENCH_DB'],
+    }
+}
+
+# Benchmark ki requests production perf log (logs/perf.log) me na jaayein
+LOGGING = {  # noqa: F405
+    **LOGGING,  # noqa: F405
+    'handlers': {**LOGGING['handlers'], 'perf_file': {'class': 'logging.NullHandler'}},  # noqa: F405
+}
+MEDIA_ROOT = BASE_DIR / 'benchmarks' / '.data' / 'media'  # noqa: F405
@@ -1,7 +1,7 @@
 # management/admin.py
 
 from django.contrib import admin
-from .models import Canteen, Staff, StaffLeave, Expense, SalaryPayment, DailyEntry 
+from .models import Canteen, Staff, StaffLeave, Expense, SalaryPayment, DailyEntry, MonthlyCanteenSummary, ExportJob
 from django.utils.html import format_html # फोटो दिखाने के लिए जरूरी
 
 # 1. Canteen Admin
@@ -12,6 +12,7 @@ class CanteenAdmin(admin.ModelAdmin):
 # 2. Staff Leave Admin
 class StaffLeaveAdmin(admin.ModelAdmin):
     list_display = ('staff', 'start_date', 'end_date', 'total_days', 'reason',)
+    list_select_related = ('staff__canteen',) # staff ka __str__ canteen.name padhta hai
     list_filter = ('staff', 'start_date')
 
 # 3. DailyEntry Admin (सरल और साफ)
@@ -50,6 +51,17 @@ class ExpenseAdmin(admin.ModelAdmin):
     list_filter = ('date', 'category', 'payment_mode', 'canteen')
     search_fields = ('description',)
 
+# Summary table signals se update hota hai, admin me sirf dekhne ke liye
+class MonthlyCanteenSummaryAdmin(admin.ModelAdmin):
+    list_display = ('canteen', 'month', 'cash_received', 'online_received', 'expense_total', 'salary_total', 'updated_on')
+    list_filter = ('canteen', 'month')
+    readonly_fields = [f.name for f in MonthlyCanteenSummary._meta.fields]
+
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('cache_key', 'started_at', 'finished_at')
+
 # management/admin.py
 
 
@@ -77,4 +89,6 @@ admin.site.register(Expense, ExpenseAdmin)
 admin.site.register(Canteen, CanteenAdmin)
 admin.site.register(StaffLeave, StaffLeaveAdmin)
 admin.site.register(SalaryPayment)
-admin.site.register(DailyEntry, DailyEntryAdmin)
\ No newline at end of file
+admin.site.register(DailyEntry, DailyEntryAdmin)
+admin.site.register(MonthlyCanteenSummary, MonthlyCanteenSummaryAdmin)
+admin.site.register(ExportJob, ExportJobAdmin)
\ No newline at end of file
@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class ManagementConfig(AppConfig):
     name = 'management'
+
+    def ready(self):
+        # Summary table ko update rakhne wale signals
+        from . import signals  # noqa: F401
+
+        # SQLite pragmas (settings.SQLITE_PRAGMAS) har naye connection par
+        from django.db.backends.signals import connection_created
+        from .db import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='management.sqlite_pragmas')
@@ -0,0 +1,56 @@
+# management/bulk_entry.py
+
+# ==========================================
+# Bulk Daily Entry (ek submit me kai canteens / poora hafta)
+# ==========================================
+# Har (canteen, date) ki entry alag lookup + save ki jagah saari rows ek
+# INSERT ... ON CONFLICT (canteen, date) DO UPDATE me - ek transaction.
+#
+# bulk_create signals nahi bhejta, isliye jo kaam DailyEntry ke signals karte
+# (monthly summary refresh + report cache invalidation) wo yahan khud hota
+# hai. DailyEntry payroll/ledger ko nahi chhoti.
+
+from django.db import transaction
+
+from .models import DailyEntry
+from .report_cache import invalidate_reports
+from .summary import refresh_summaries
+
+
+# Grid me bharne wale columns (canteen, date row ki pehchaan hain)
+GRID_FIELDS = [
+    'tea_qty', 'nasta_qty', 'lunch_qty', 'dinner_qty',
+    'normal_token_qty', 'special_token_qty', 'guest_token_qty',
+    'cash_received', 'online_received',
+]
+
+
+def upsert_daily_entries(entries):
+    """
+    DailyEntry objects (pk ho ya na ho) ko (canteen, date) par upsert karta hai.
+    Naye rows bante hain, maujooda rows ke GRID_FIELDS update. Rows ki ginti lautata hai.
+    """
+    rows = [
+        DailyEntry(
+            canteen_id=entry.canteen_id, date=entry.date,
+            **{field: getattr(entry, field) for field in GRID_FIELDS},
+        )
+        for entry in entries
+    ]
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        DailyEntry.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['canteen', 'date'],
+            update_fields=GRID_FIELDS,
+        )
+        buckets = {(row.canteen_id, row.date.replace(day=1)) for row in rows}
+        refresh_summaries(buckets)
+
+    # Transaction ke baad - beech me koi report bane to purana data cache na ho
+    for canteen_id, month in buckets:
+        invalidate_reports(canteen_id, month)
+    return len(rows)
@@ -0,0 +1,20 @@
+# management/db.py
+
+# ==========================================
+# SQLite connection tuning
+# ==========================================
+# settings.SQLITE_PRAGMAS (DB_PROFILE=production me WAL, synchronous, cache,
+# mmap) har naye SQLite connection par lagte hain. CONN_MAX_AGE ke saath
+# connection requests ke beech bana rehta hai, isliye ye kaam ek hi baar.
+
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created signal ka receiver (apps.py me juda hai)."""
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,499 @@
+# management/exports.py
+
+# ==========================================
+# Export Helpers (CSV / Excel)
+# ==========================================
+
+import csv
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+import django
+from django.db import connections
+from django.db.models import CharField, Count, Max
+from django.db.models.functions import Cast, Length
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from .models import Canteen, DailyEntry, Expense
+from .reports import financial_rollup
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """csv.writer ke liye nakli file - jo likho wahi wapis de deta hai."""
+
+    def write(self, value):
+        return value
+
+
+def filtered_expenses(start_date, end_date=None, canteen_id=None, category=None):
+    """CSV export ke filters (view aur background job dono yahi use karte hain)."""
+    expenses = Expense.objects.filter(date__gte=start_date)
+    if end_date:
+        expenses = expenses.filter(date__lte=end_date)
+    if canteen_id:
+        expenses = expenses.filter(canteen_id=canteen_id)
+    if category:
+        expenses = expenses.filter(category=category)
+    return expenses.order_by('-date', 'id')
+
+
+def expense_rows(expenses):
+    """Expense queryset ko CSV rows me badalta hai, bina model objects banaye."""
+    yield ['Date', 'Category', 'Description', 'Canteen', 'Payment Mode', 'Amount']
+    rows = expenses.values_list(
+        'date', 'category', 'description', 'canteen__name', 'payment_mode', 'amount'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for exp_date, category, description, canteen_name, payment_mode, amount in rows:
+        yield [exp_date, category, description, canteen_name or "General", payment_mode, amount]
+
+
+def streaming_csv_response(rows, filename):
+    writer = csv.writer(Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows),
+        content_type='text/csv',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def write_csv(fileobj, rows, total=None, progress=None):
+    """Rows ko file me likhta hai; progress(done, total) har chunk ke baad."""
+    writer = csv.writer(fileobj)
+    for done, row in enumerate(rows):
+        writer.writerow(row)
+        if progress and done and done % EXPORT_CHUNK_SIZE == 0:
+            progress(done, total)
+
+
+# ==========================================
+# Canteen Excel Report (openpyxl write-only mode)
+# ==========================================
+# Write-only sheet me rows seedhe temp file me likhe jaate hain, cell objects
+# memory me nahi rehte. Column widths <sheetData> se pehle likhni padti hain,
+# isliye headers ki lambai turant aur data ki lambai ek MAX(LENGTH) query se
+# jod lete hain - poori sheet dobara scan nahi karni padti.
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+BOLD_FONT = Font(bold=True, size=12)
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+EXPENSE_HEADER_FILL = PatternFill(start_color="C0504D", fill_type="solid")
+SUMMARY_FILLS = [
+    PatternFill(start_color="28a745", fill_type="solid"), # Green
+    PatternFill(start_color="dc3545", fill_type="solid"), # Red
+    PatternFill(start_color="007bff", fill_type="solid"), # Blue
+]
+TITLE_FONT = Font(bold=True, size=16, color="000000")
+CENTER_ALIGN = Alignment(horizontal="center")
+CURRENCY_FORMAT = '#,##0'
+
+INCOME_FIELDS = ['date', 'tea_qty', 'nasta_qty', 'lunch_qty', 'dinner_qty', 'cash_received', 'online_received']
+TOKEN_FIELDS = ['normal_token_qty', 'special_token_qty', 'guest_token_qty']
+EXPENSE_FIELDS = ['date', 'category', 'description', 'amount']
+
+
+def show_tokens_for(canteen):
+    return bool(canteen.billing_type and 'monthly' in str(canteen.billing_type).lower())
+
+
+class ColumnWidths:
+    """Har column ki sabse lambi value (len(str(value))) yaad rakhta hai."""
+
+    def __init__(self):
+        self.lengths = {}
+
+    def feed(self, values):
+        for col, value in enumerate(values, 1):
+            if value:
+                self.feed_length(col, len(str(value)))
+
+    def feed_length(self, col, length):
+        if length and length > self.lengths.get(col, 0):
+            self.lengths[col] = length
+
+    def apply(self, ws):
+        for col in range(1, max(self.lengths, default=0) + 1):
+            ws.column_dimensions[get_column_letter(col)].width = self.lengths.get(col, 0) + 2
+
+
+def _styled(ws, values, font=None, fill=None, alignment=None, number_format=None):
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        if alignment:
+            cell.alignment = alignment
+        if number_format:
+            cell.number_format = number_format
+        cells.append(cell)
+    return cells
+
+
+def _data_lengths(queryset, fields, text_fields):
+    """
+    Ek aggregate query: text columns ki MAX(LENGTH), numbers/dates ka MAX.
+    Return: ({column_no: length}, row_count)
+    """
+    aggregates = {'rows': Count('pk')}
+    for col, name in enumerate(fields, 1):
+        if name in text_fields:
+            aggregates[f'c{col}'] = Max(Length(Cast(name, output_field=CharField())))
+        else:
+            aggregates[f'c{col}'] = Max(name)
+    result = queryset.aggregate(**aggregates)
+
+    lengths = {}
+    if not result['rows']:
+        return lengths, 0
+    for col, name in enumerate(fields, 1):
+        value = result[f'c{col}']
+        if name in text_fields:
+            lengths[col] = value or 0
+        elif value:
+            field = queryset.model._meta.get_field(name)
+            if isinstance(value, Decimal):
+                # Aggregate ka Decimal zyada decimal places ke saath aata hai
+                value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+            lengths[col] = len(str(value))
+    return lengths, result['rows']
+
+
+@dataclass
+class CanteenSheet:
+    """
+    Ek canteen ki sheet ka data (queries ho chuki, sirf likhna baaki).
+    Rows iterator (seedha DB stream) ya list (process pool se wapis aaye) ho sakte hain.
+    """
+    canteen_name: str
+    start_date: date
+    end_date: date
+    show_tokens: bool
+    total_cash: Decimal
+    total_online: Decimal
+    expense_total: Decimal
+    data_widths: dict        # {column_no: length} - incomes aur expenses dono ka max
+    income_rows: object
+    expense_rows: object
+    total_rows: int = 0
+
+    @property
+    def total_income(self):
+        return self.total_cash + self.total_online
+
+    @property
+    def net_profit(self):
+        return self.total_income - self.expense_total
+
+
+def canteen_sheet(canteen, start_date, end_date, materialize=False):
+    """Sheet ke liye saari queries (rollup, widths, rows). materialize=True par rows list me."""
+    incomes = DailyEntry.objects.filter(canteen=canteen, date__range=[start_date, end_date]).order_by('date')
+    expenses = Expense.objects.filter(canteen=canteen, date__range=[start_date, end_date]).order_by('date', 'id')
+    rollup = financial_rollup(start_date, end_date, canteen)
+
+    show_tokens = show_tokens_for(canteen)
+    income_fields = INCOME_FIELDS + TOKEN_FIELDS if show_tokens else INCOME_FIELDS
+
+    widths = ColumnWidths()
+    income_lengths, income_count = _data_lengths(incomes, income_fields, text_fields=set())
+    expense_lengths, expense_count = _data_lengths(expenses, EXPENSE_FIELDS, text_fields={'category', 'description'})
+    for lengths in (income_lengths, expense_lengths):
+        for col, length in lengths.items():
+            widths.feed_length(col, length)
+
+    income_rows = incomes.values_list(*income_fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    expense_rows = expenses.values_list(*EXPENSE_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if materialize:
+        income_rows, expense_rows = list(income_rows), list(expense_rows)
+
+    return CanteenSheet(
+        canteen_name=canteen.name,
+        start_date=start_date,
+        end_date=end_date,
+        show_tokens=show_tokens,
+        total_cash=rollup.total_cash,
+        total_online=rollup.total_online,
+        expense_total=rollup.expense_total,
+        data_widths=widths.lengths,
+        income_rows=income_rows,
+        expense_rows=expense_rows,
+        total_rows=income_count + expense_count,
+    )
+
+
+def render_canteen_sheet(wb, sheet, title="Report", progress=None):
+    """
+    CanteenSheet ko write-only workbook ki nayi sheet me likhta hai.
+    progress(done, total) har EXPORT_CHUNK_SIZE rows ke baad (background jobs ke liye).
+    """
+    ws = wb.create_sheet(title)
+    summary_values = [sheet.total_income, sheet.expense_total, sheet.net_profit]
+
+    columns = ['Date', 'Tea', 'Nasta', 'Lunch', 'Dinner', 'Cash (₹)', 'Online (₹)']
+    if sheet.show_tokens:
+        columns.extend(['Normal Token', 'Special Token', 'Guest Token'])
+    exp_columns = ['Date', 'Category', 'Description', 'Amount (₹)']
+
+    report_title = f"CANTEEN REPORT: {sheet.canteen_name.upper()}"
+    period = f"Period: {sheet.start_date} to {sheet.end_date}"
+    summary_headers = ["Total Income", "Total Expense", "NET PROFIT"]
+
+    # --- COLUMN WIDTHS (rows likhne se pehle) ---
+    widths = ColumnWidths()
+    for values in ([report_title], [period], ["FINANCIAL SUMMARY"], summary_headers, summary_values,
+                   ["DAILY INCOME & CONSUMPTION DETAILS"], columns, ["DETAILED EXPENSES"], exp_columns):
+        widths.feed(values)
+    for col, length in sheet.data_widths.items():
+        widths.feed_length(col, length)
+    widths.apply(ws)
+
+    written = 0
+
+    def append_rows(rows):
+        nonlocal written
+        for row in rows:
+            ws.append(row)
+            written += 1
+            if progress and written % EXPORT_CHUNK_SIZE == 0:
+                progress(written, sheet.total_rows)
+
+    # --- A. REPORT HEADER ---
+    ws.merged_cells.add('A1:G1')
+    ws.merged_cells.add('A2:G2')
+    ws.append(_styled(ws, [report_title], font=TITLE_FONT, alignment=CENTER_ALIGN))
+    ws.append(_styled(ws, [period], alignment=CENTER_ALIGN))
+    ws.append([])
+
+    # --- B. FINANCIAL SUMMARY BOX ---
+    ws.append(_styled(ws, ["FINANCIAL SUMMARY"], font=BOLD_FONT))
+    ws.append([])
+    header_cells = _styled(ws, summary_headers, font=HEADER_FONT, alignment=CENTER_ALIGN)
+    for cell, fill in zip(header_cells, SUMMARY_FILLS):
+        cell.fill = fill
+    ws.append(header_cells)
+    ws.append(_styled(ws, summary_values, font=BOLD_FONT, alignment=CENTER_ALIGN, number_format=CURRENCY_FORMAT))
+    ws.append([])
+    ws.append([])
+
+    # --- C. DAILY CONSUMPTION & INCOME ---
+    ws.append(_styled(ws, ["DAILY INCOME & CONSUMPTION DETAILS"], font=BOLD_FONT))
+    ws.append(_styled(ws, columns, font=HEADER_FONT, fill=HEADER_FILL, alignment=CENTER_ALIGN))
+    append_rows(sheet.income_rows)
+    ws.append([])
+    ws.append([])
+
+    # --- D. EXPENSE DETAILS ---
+    ws.append(_styled(ws, ["DETAILED EXPENSES"], font=BOLD_FONT))
+    ws.append(_styled(ws, exp_columns, font=HEADER_FONT, fill=EXPENSE_HEADER_FILL, alignment=CENTER_ALIGN))
+    append_rows(sheet.expense_rows)
+
+    return ws
+
+
+def write_canteen_sheet(wb, canteen, start_date, end_date, title="Report", progress=None):
+    """Write-only workbook me ek canteen ki poori report sheet (rows DB se seedhe stream)."""
+    return render_canteen_sheet(wb, canteen_sheet(canteen, start_date, end_date), title, progress)
+
+
+def canteen_excel_filename(canteen, start_date, end_date):
+    return f"{canteen.name}_Report_{start_date}_to_{end_date}.xlsx"
+
+
+def canteen_excel_response(canteen, start_date, end_date):
+    """Report ko temp file me save karke chunks me bhejta hai (poori file memory me nahi)."""
+    wb = Workbook(write_only=True)
+    write_canteen_sheet(wb, canteen, start_date, end_date)
+    return workbook_response(wb, canteen_excel_filename(canteen, start_date, end_date))
+
+
+def workbook_response(wb, filename):
+    spool = tempfile.TemporaryFile()
+    wb.save(spool)
+    spool.seek(0)
+    return FileResponse(spool, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+# ==========================================
+# Consolidated Workbook (saari canteens, ek file)
+# ==========================================
+# Har canteen ki sheet ka data (rollup, widths, rows) process pool me alag-alag
+# banta hai; parent process Summary sheet ke baad sab ko ek hi write-only
+# workbook me likh deta hai - header/styling/token columns wahi
+# render_canteen_sheet wale.
+
+INVALID_SHEET_CHARS = '[]:*?/\\'
+
+
+def _sheet_title(name, used):
+    """Excel sheet naam: max 31 chars, []:*?/\\ nahi, aur unique."""
+    base = ''.join('-' if ch in INVALID_SHEET_CHARS else ch for ch in name).strip() or 'Canteen'
+    title, counter = base[:31], 2
+    while title.lower() in used:
+        suffix = f" ({counter})"
+        title, counter = base[:31 - len(suffix)] + suffix, counter + 1
+    used.add(title.lower())
+    return title
+
+
+def _canteen_sheet_task(canteen_id, start_date, end_date):
+    # Pool ke child process me chalta hai - rows list me, taaki pickle hoke parent tak jaayein
+    canteen = Canteen.objects.get(pk=canteen_id)
+    return canteen_sheet(canteen, start_date, end_date, materialize=True)
+
+
+def collect_canteen_sheets(canteens, start_date, end_date, workers=None, progress=None):
+    """Saari canteens ka CanteenSheet data, canteens ke order me."""
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1, len(canteens))
+    # run_export_worker ke pool child me har process pehle se ek job bana raha
+    # hai - uske andar dusra pool (workers x workers forks) nahi, yahin banao
+    if multiprocessing.parent_process() is not None:
+        workers = 1
+
+    if workers <= 1:
+        sheets = []
+        for done, canteen in enumerate(canteens, 1):
+            sheets.append(canteen_sheet(canteen, start_date, end_date))
+            if progress:
+                progress(done, len(canteens))
+        return sheets
+
+    # Fork se pehle connection band - har child apna SQLite connection khole
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        futures = [pool.submit(_canteen_sheet_task, c.pk, start_date, end_date) for c in canteens]
+        sheets = []
+        for done, future in enumerate(futures, 1):
+            sheets.append(future.result())
+            if progress:
+                progress(done, len(futures))
+    return sheets
+
+
+def write_summary_sheet(wb, sheets, start_date, end_date, title="Summary"):
+    """Pehli sheet: har canteen ki ek line (income, expense, profit) + TOTAL."""
+    ws = wb.create_sheet(title)
+
+    report_title = "CONSOLIDATED REPORT: ALL CANTEENS"
+    period = f"Period: {start_date} to {end_date}"
+    headers = ['Canteen', 'Cash (₹)', 'Online (₹)', 'Total Income', 'Total Expense', 'NET PROFIT']
+    rows = [
+        [s.canteen_name, s.total_cash, s.total_online, s.total_income, s.expense_total, s.net_profit]
+        for s in sheets
+    ]
+    totals = ['TOTAL'] + [sum((row[col] for row in rows), Decimal('0')) for col in range(1, len(headers))]
+
+    widths = ColumnWidths()
+    for values in [[report_title], [period], headers, totals, *rows]:
+        widths.feed(values)
+    widths.apply(ws)
+
+    ws.merged_cells.add('A1:F1')
+    ws.merged_cells.add('A2:F2')
+    ws.append(_styled(ws, [report_title], font=TITLE_FONT, alignment=CENTER_ALIGN))
+    ws.append(_styled(ws, [period], alignment=CENTER_ALIGN))
+    ws.append([])
+
+    ws.append(_styled(ws, headers, font=HEADER_FONT, fill=HEADER_FILL, alignment=CENTER_ALIGN))
+    for row in rows:
+        ws.append(_styled(ws, row[:1]) + _styled(ws, row[1:], number_format=CURRENCY_FORMAT))
+    ws.append(_styled(ws, totals[:1], font=BOLD_FONT)
+              + _styled(ws, totals[1:], font=BOLD_FONT, number_format=CURRENCY_FORMAT))
+    return ws
+
+
+def write_comparison_sheet(wb, comparison, title="Comparison"):
+    """Canteen comparison: har canteen ki ek line + TOTAL, expense mix category-wise columns."""
+    ws = wb.create_sheet(title)
+
+    report_title = "CANTEEN COMPARISON"
+    period = f"Period: {comparison.start_date} to {comparison.end_date}"
+    headers = ['Canteen', 'Cash (₹)', 'Online (₹)', 'Total Income', 'Total Expense', 'Salary',
+               'Profit', 'Net (after Salary)', 'Meals', 'Cost / Meal', *comparison.categories]
+
+    def values(row):
+        return [row.name, row.total_cash, row.total_online, row.total_income, row.expense_total,
+                row.salary_total, row.profit, row.net_profit, row.meals, row.cost_per_meal,
+                *(amount for _, amount, _ in row.mix)]
+
+    rows = [values(row) for row in comparison.rows]
+    totals = values(comparison.total)
+
+    widths = ColumnWidths()
+    for line in [[report_title], [period], headers, totals, *rows]:
+        widths.feed(line)
+    widths.apply(ws)
+
+    last_column = get_column_letter(len(headers))
+    ws.merged_cells.add(f'A1:{last_column}1')
+    ws.merged_cells.add(f'A2:{last_column}2')
+    ws.append(_styled(ws, [report_title], font=TITLE_FONT, alignment=CENTER_ALIGN))
+    ws.append(_styled(ws, [period], alignment=CENTER_ALIGN))
+    ws.append([])
+
+    def styled(row, font=None):
+        # Cost / Meal paise tak, baaki poore rupaye
+        return (_styled(ws, row[:1], font=font)
+                + _styled(ws, row[1:9], font=font, number_format=CURRENCY_FORMAT)
+                + _styled(ws, row[9:10], font=font, number_format='#,##0.00')
+                + _styled(ws, row[10:], font=font, number_format=CURRENCY_FORMAT))
+
+    ws.append(_styled(ws, headers, font=HEADER_FONT, fill=HEADER_FILL, alignment=CENTER_ALIGN))
+    for row in rows:
+        ws.append(styled(row))
+    ws.append(styled(totals, font=BOLD_FONT))
+    return ws
+
+
+def comparison_excel_response(comparison):
+    wb = Workbook(write_only=True)
+    write_comparison_sheet(wb, comparison)
+    filename = f"Canteen_Comparison_{comparison.start_date}_to_{comparison.end_date}.xlsx"
+    return workbook_response(wb, filename)
+
+
+def consolidated_excel_filename(start_date, end_date):
+    return f"All_Canteens_Report_{start_date}_to_{end_date}.xlsx"
+
+
+def write_consolidated_workbook(target, start_date, end_date, canteens=None, workers=None, progress=None):
+    """
+    Summary + har canteen ki ek sheet. target file path ya file object.
+    progress(done, total): pehle sheets ka data (pool), phir likhna.
+    """
+    if canteens is None:
+        canteens = Canteen.objects.all().order_by('name')
+    canteens = list(canteens)
+    steps = 2 * len(canteens)
+
+    def collected(done, total):
+        if progress:
+            progress(done, steps)
+
+    sheets = collect_canteen_sheets(canteens, start_date, end_date, workers, collected)
+
+    wb = Workbook(write_only=True)
+    write_summary_sheet(wb, sheets, start_date, end_date)
+    used = {'summary'}
+    for done, sheet in enumerate(sheets, len(sheets) + 1):
+        render_canteen_sheet(wb, sheet, _sheet_title(sheet.canteen_name, used))
+        if progress:
+            progress(done, steps)
+    wb.save(target)
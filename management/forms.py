@@ -97,6 +97,11 @@ class StaffLeaveForm(forms.ModelForm):
             # Checkbox ke liye alag widget ki zarurat nahi, Django default checkbox dega
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Dropdown me har staff ka naam canteen ke saath (__str__) - ek JOIN, N queries nahi
+        self.fields['staff'].queryset = Staff.objects.with_canteen()
+
 
 
 # management/forms.py ke sabse niche paste karein
@@ -132,4 +137,76 @@ class StaffForm(forms.ModelForm):
             # Photos
             'photo': forms.FileInput(attrs={'class': 'form-control'}),
             'aadhar_card': forms.FileInput(attrs={'class': 'form-control'}), # <-- Sahi naam
-        }
\ No newline at end of file
+        }
+
+# ==========================================
+# Bulk Daily Entry Grid (sab canteens ek date, ya ek canteen ka hafta)
+# ==========================================
+
+class DailyEntryGridForm(forms.ModelForm):
+    """Grid ki ek row. Canteen/date form me nahi - view row ke entry object me deta hai."""
+
+    TOKEN_FIELDS = ['normal_token_qty', 'special_token_qty', 'guest_token_qty']
+
+    class Meta:
+        model = DailyEntry
+        fields = [
+            'tea_qty', 'nasta_qty', 'lunch_qty', 'dinner_qty',
+            'normal_token_qty', 'special_token_qty', 'guest_token_qty',
+            'cash_received', 'online_received',
+        ]
+        widgets = {
+            name: forms.NumberInput(attrs={'class': 'form-control form-control-sm', 'min': 0})
+            for name in fields
+        }
+
+    def __init__(self, *args, entry, **kwargs):
+        super().__init__(*args, instance=entry, **kwargs)
+        # Tokens sirf MONTHLY canteens ke (add_consumption wala JS rule)
+        if entry.canteen.billing_type != 'MONTHLY':
+            for name in self.TOKEN_FIELDS:
+                self.fields[name].disabled = True
+
+
+class BaseDailyEntryGridFormSet(forms.BaseFormSet):
+    """
+    Rows (entries) view tay karta hai, POST ka TOTAL_FORMS nahi - har form
+    apni (canteen, date) wali entry ke saath banta hai.
+    """
+
+    def __init__(self, *args, entries, **kwargs):
+        self.entries = entries
+        super().__init__(*args, **kwargs)
+
+    def total_form_count(self):
+        return len(self.entries)
+
+    def initial_form_count(self):
+        return len(self.entries)
+
+    def get_form_kwargs(self, index):
+        return {**super().get_form_kwargs(index), 'entry': self.entries[index]}
+
+    def changed_entries(self):
+        """Sirf badli hui rows - baaki ko dobara likhne ki zarurat nahi."""
+        return [form.instance for form in self.forms if form.has_changed()]
+
+
+DailyEntryGridFormSet = forms.formset_factory(
+    DailyEntryGridForm, formset=BaseDailyEntryGridFormSet, extra=0,
+)
+
+
+# ==========================================
+# CSV / Excel Import (management/imports.py)
+# ==========================================
+
+class ImportUploadForm(forms.Form):
+    KIND_CHOICES = [
+        ('expenses', 'Expenses (Supplier bills)'),
+        ('daily_entries', 'Daily Entries (Galla + Consumption)'),
+    ]
+
+    kind = forms.ChoiceField(choices=KIND_CHOICES, widget=forms.Select(attrs={'class': 'form-select'}))
+    file = forms.FileField(widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx,.xlsm'}))
+    dry_run = forms.BooleanField(required=False, label="Sirf check karein (kuch save nahi hoga)")
@@ -0,0 +1,329 @@
+# management/imports.py
+
+# ==========================================
+# CSV / Excel Import (Expenses, Daily Entries)
+# ==========================================
+# Upload ki gayi file ki rows ek-ek karke padhte hain (CSV stream, XLSX
+# openpyxl read-only mode) - poori file memory me nahi aati. Har row wahi
+# form rules (ExpenseForm / DailyEntryForm) se validate hoti hai, sahi rows
+# IMPORT_CHUNK_SIZE ke chunks me bulk_create, galat rows ki line-wise report.
+#
+# Per-row queries nahi: canteen naam/ID se pehle se bani dict me milti hai,
+# aur DailyEntry ka (canteen, date) duplicate check har chunk par ek query.
+# bulk_create signals nahi bhejta - summary refresh + report cache yahan khud.
+
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from zipfile import BadZipFile
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .forms import ConsumptionForm, DailyEntryForm, ExpenseForm
+from .models import Canteen, DailyEntry, Expense
+from .report_cache import invalidate_reports
+from .summary import refresh_summaries
+
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_EXTENSIONS = ('.csv', '.xlsx', '.xlsm')
+
+# Bills par Indian format (31/01/2025) zyada aata hai, ISO bhi chalega
+IMPORT_DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d/%m/%y']
+
+
+class ImportFileError(ValueError):
+    """File hi nahi padh sake (format, header) - row-level error nahi."""
+
+
+# ==========================================
+# File readers (pehli row header)
+# ==========================================
+
+def _csv_rows(file):
+    # utf-8-sig: Excel ke "CSV UTF-8" wale BOM ko hata deta hai
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.reader(text)
+    except (UnicodeDecodeError, csv.Error) as error:
+        raise ImportFileError(f"CSV padh nahi sake (UTF-8 me save karein): {error}") from error
+    finally:
+        text.detach() # upload file ko band na kare
+
+
+def _xlsx_rows(file):
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException, KeyError) as error:
+        raise ImportFileError(f"Excel file padh nahi sake: {error}") from error
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(file, filename):
+    """File ki rows (tuples) ka iterator, extension ke hisaab se."""
+    extension = Path(filename).suffix.lower()
+    if extension == '.csv':
+        return _csv_rows(file)
+    if extension in IMPORT_EXTENSIONS:
+        return _xlsx_rows(file)
+    raise ImportFileError(f"'{extension or filename}' file nahi chalegi - sirf CSV ya XLSX.")
+
+
+# ==========================================
+# Import forms (asli forms ke rules, bina per-row query)
+# ==========================================
+
+class CanteenLookupField(forms.Field):
+    """Canteen naam ya ID se - pehle se load ki gayi dict me dhoondta hai."""
+
+    def __init__(self, canteens, **kwargs):
+        self.canteens = canteens
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        canteen = self.canteens.get(str(value).strip().lower())
+        if canteen is None:
+            raise ValidationError(f"Canteen '{value}' nahi mili.")
+        return canteen
+
+
+def _canteen_lookup():
+    canteens = {}
+    for canteen in Canteen.objects.all():
+        canteens[str(canteen.pk)] = canteen
+        canteens[canteen.name.strip().lower()] = canteen
+    return canteens
+
+
+class SharedFields(dict):
+    """
+    Form har instance me base_fields ki deepcopy karta hai - 50k rows par
+    aadha time usi me. Import forms render nahi hote, isliye fields share.
+    """
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class ImportFormMixin:
+    def _get_validation_exclusions(self):
+        # ForeignKey.validate() har row par canteen ki query chalata - dict me mil chuki hai
+        return super()._get_validation_exclusions() | {'canteen'}
+
+
+def _shared(form_class):
+    form_class.base_fields = SharedFields(form_class.base_fields)
+    return form_class
+
+
+def _expense_form(canteens):
+    class ExpenseImportForm(ImportFormMixin, ExpenseForm):
+        canteen = CanteenLookupField(canteens, required=False, label="Canteen") # khali = General
+        date = forms.DateField(input_formats=IMPORT_DATE_FORMATS, label="Date")
+
+    return _shared(ExpenseImportForm)
+
+
+def _daily_entry_form(canteens):
+    quantities = [name for name in ConsumptionForm.Meta.fields if name not in ('date', 'canteen')]
+
+    class DailyEntryImportForm(ImportFormMixin, DailyEntryForm):
+        canteen = CanteenLookupField(canteens, label="Canteen")
+        date = forms.DateField(input_formats=IMPORT_DATE_FORMATS, label="Date")
+
+        class Meta(DailyEntryForm.Meta):
+            fields = DailyEntryForm.Meta.fields + quantities
+
+        def validate_unique(self):
+            # (canteen, date) har row par query ki jagah chunk me ek baar (_daily_entry_conflicts)
+            pass
+
+    return _shared(DailyEntryImportForm)
+
+
+def _daily_entry_conflicts(chunk, seen):
+    """Chunk ki wo rows jinki (canteen, date) entry DB me ya file me pehle aa chuki."""
+    instances = [instance for _, instance in chunk]
+    existing = set(DailyEntry.objects.filter(
+        canteen_id__in={instance.canteen_id for instance in instances},
+        date__range=[min(i.date for i in instances), max(i.date for i in instances)],
+    ).values_list('canteen_id', 'date'))
+
+    conflicts = set()
+    for number, instance in chunk:
+        key = (instance.canteen_id, instance.date)
+        if key in existing or key in seen:
+            conflicts.add(number)
+        seen.add(key)
+    return conflicts
+
+
+@dataclass
+class ImportKind:
+    label: str
+    model: type
+    build_form: object
+    conflicts: object = None # (chunk, seen) -> duplicate row numbers
+    conflict_message: str = ''
+
+
+IMPORT_KINDS = {
+    'expenses': ImportKind("Expenses", Expense, _expense_form),
+    'daily_entries': ImportKind(
+        "Daily Entries", DailyEntry, _daily_entry_form,
+        conflicts=_daily_entry_conflicts,
+        conflict_message="Is Canteen aur Date ki entry pehle se hai!",
+    ),
+}
+
+
+# ==========================================
+# Pipeline
+# ==========================================
+
+@dataclass
+class ImportResult:
+    kind: str
+    rows: int = 0
+    created: int = 0
+    dry_run: bool = False
+    errors: list = field(default_factory=list) # (row number, message)
+
+    @property
+    def valid(self):
+        return self.rows - len(self.errors)
+
+
+def _normalize(name):
+    return ' '.join(str(name or '').replace('_', ' ').split()).lower()
+
+
+def _columns(header, form_class):
+    """Header ke har column ka form field (naam ya label se), anjaan columns None."""
+    aliases = {}
+    for name, form_field in form_class.base_fields.items():
+        aliases[_normalize(name)] = name
+        aliases[_normalize(form_field.label or '')] = name
+    return [aliases.get(_normalize(column)) for column in header]
+
+
+def _choice_lookup(form_class):
+    # "milk", "Milk/Dairy" -> "Milk": sheet me key ya label kisi bhi case me
+    lookup = {}
+    for name, form_field in form_class.base_fields.items():
+        if isinstance(form_field, forms.ChoiceField) and not isinstance(form_field, forms.ModelChoiceField):
+            lookup[name] = {
+                _normalize(text): key
+                for key, label in form_field.choices if key
+                for text in (key, label)
+            }
+    return lookup
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date()
+    return value.strip() if isinstance(value, str) else value
+
+
+def _form_errors(form):
+    messages = []
+    for name, errors in form.errors.items():
+        label = form.fields[name].label if name in form.fields else None
+        messages.extend(f"{label}: {error}" if label else error for error in errors)
+    return '; '.join(messages)
+
+
+def import_rows(kind, rows, dry_run=False, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    rows: read_rows() ka iterator (pehli row header). Sahi rows insert
+    (dry_run me sirf check), galat rows ImportResult.errors me.
+    """
+    spec = IMPORT_KINDS[kind]
+    form_class = spec.build_form(_canteen_lookup())
+    result = ImportResult(kind=kind, dry_run=dry_run)
+
+    rows = iter(rows)
+    header = next(rows, None)
+    if not header:
+        raise ImportFileError("File khali hai.")
+    columns = _columns(header, form_class)
+
+    # Khali cell / gayab column = model default (jaise tea_qty = 0, payment_mode = Online).
+    # Zaroori column ka default hi na ho aur wo file me na ho to poori file galat.
+    present = set(filter(None, columns))
+    defaults = {
+        name: form_field.initial for name, form_field in form_class.base_fields.items()
+        if form_field.initial is not None and not callable(form_field.initial)
+    }
+    for name, form_field in form_class.base_fields.items():
+        if form_field.required and name not in present and name not in defaults:
+            raise ImportFileError(f"Column '{form_field.label or name}' file me nahi hai.")
+    missing = {name: value for name, value in defaults.items() if name not in present}
+    choices = _choice_lookup(form_class)
+
+    pending, seen, buckets = [], set(), set()
+
+    def flush():
+        conflicts = spec.conflicts(pending, seen) if spec.conflicts else set()
+        for number in sorted(conflicts):
+            result.errors.append((number, spec.conflict_message))
+        objects = [instance for number, instance in pending if number not in conflicts]
+        if objects and not dry_run:
+            spec.model.objects.bulk_create(objects)
+            buckets.update((obj.canteen_id, obj.date.replace(day=1)) for obj in objects)
+            result.created += len(objects)
+        pending.clear()
+
+    with transaction.atomic():
+        for number, values in enumerate(rows, 2): # spreadsheet ki line number (1 = header)
+            values = [_cell(value) for value in values]
+            if not any(value != '' for value in values):
+                continue
+            result.rows += 1
+
+            data = dict(missing)
+            for name, value in zip(columns, values):
+                if not name:
+                    continue
+                if value == '':
+                    value = defaults.get(name, '')
+                data[name] = choices.get(name, {}).get(_normalize(value), value)
+
+            form = form_class(data)
+            if not form.is_valid():
+                result.errors.append((number, _form_errors(form)))
+                continue
+            pending.append((number, form.instance))
+            if len(pending) >= chunk_size:
+                flush()
+        if pending:
+            flush()
+
+        if buckets:
+            refresh_summaries(buckets)
+
+    for canteen_id, month in buckets:
+        invalidate_reports(canteen_id, month)
+    result.errors.sort()
+    return result
+
+
+def error_report_rows(result):
+    """Error report CSV ki rows (header ke saath)."""
+    yield ['Row', 'Error']
+    for number, message in result.errors:
+        yield [number, message]
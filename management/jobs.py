@@ -0,0 +1,204 @@
+# management/jobs.py
+
+# ==========================================
+# Background Export Jobs
+# ==========================================
+# View sirf ExportJob row banata hai (PENDING). `python manage.py
+# run_export_worker` use process pool me chala ke file MEDIA_ROOT/exports/ me
+# likhta hai. Koi broker nahi - queue wahi SQLite table hai.
+#
+# Cache: same kind + filters ka DONE job dobara use hota hai, jab tak us range
+# ka data nahi badla. "Data badla?" ka hisaab MonthlyCanteenSummary se:
+# har DailyEntry/Expense/Salary edit us mahine ki summary row ka updated_on
+# badal deta hai (management/signals.py).
+#
+# Job row me sirf worker ka parent process likhta hai (claim, progress, DONE/
+# FAILED). Child export ke dauraan `.iterator()` se padh raha hota hai - usi
+# beech wahi connection UPDATE kare to SQLite "database is locked" deta hai
+# (do jobs ek dusre ke read lock par atak jaate hain). Child progress queue me
+# bhejta hai aur result (fields) return karta hai.
+
+import hashlib
+import json
+import os
+from datetime import date
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from openpyxl import Workbook
+
+from .exports import (
+    canteen_excel_filename, consolidated_excel_filename, expense_rows, filtered_expenses,
+    write_canteen_sheet, write_consolidated_workbook, write_csv,
+)
+from .models import Canteen, ExportJob, MonthlyCanteenSummary
+from .reports import _as_date
+
+
+EXPORT_DIR = 'exports'
+
+
+def export_cache_key(kind, params):
+    payload = json.dumps([kind, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def export_params(kind, canteen_id=None, start_date=None, end_date=None, category=None):
+    """Form/GET values se job params (dates hamesha poori, taaki cache key same bane)."""
+    today = date.today()
+    params = {
+        'start_date': str(start_date or today.replace(day=1)),
+        'end_date': str(end_date or today),
+    }
+    if canteen_id and kind != 'CONSOLIDATED_EXCEL':
+        params['canteen_id'] = int(canteen_id)
+    if kind == 'EXPENSE_CSV' and category:
+        params['category'] = category
+    return params
+
+
+def _data_version(params):
+    """Range ke summary rows ka (count, max updated_on) - data badla to ye badlega."""
+    rows = MonthlyCanteenSummary.objects.filter(
+        month__gte=_as_date(params['start_date']).replace(day=1),
+        month__lte=_as_date(params['end_date']),
+    )
+    if params.get('canteen_id'):
+        rows = rows.filter(canteen_id=params['canteen_id'])
+    version = rows.aggregate(rows=Count('pk'), updated=Max('updated_on'))
+    return f"{version['rows']}:{version['updated'].isoformat() if version['updated'] else ''}"
+
+
+def _file_exists(job):
+    return bool(job.file) and os.path.exists(job.file.path)
+
+
+def queue_export(kind, params, user=None):
+    """
+    Export job queue karta hai. Same filters wala job pehle se chal raha ho
+    ya uski file abhi bhi sahi ho to wahi job return hota hai.
+    """
+    cache_key = export_cache_key(kind, params)
+    data_version = _data_version(params)
+
+    for job in ExportJob.objects.filter(cache_key=cache_key).exclude(status='FAILED'):
+        if job.status in ('PENDING', 'RUNNING'):
+            return job
+        if job.params.get('data_version') == data_version and _file_exists(job):
+            return job
+
+    return ExportJob.objects.create(
+        kind=kind,
+        params={**params, 'data_version': data_version},
+        cache_key=cache_key,
+        created_by=user if user and user.is_authenticated else None,
+    )
+
+
+def claim_job(job_id):
+    """PENDING -> RUNNING; do worker ek hi job na utha lein (conditional UPDATE)."""
+    return ExportJob.objects.filter(pk=job_id, status='PENDING').update(
+        status='RUNNING', progress=0, started_at=timezone.now(),
+    ) == 1
+
+
+def reset_interrupted_jobs():
+    """Worker beech me band hua tha to uske RUNNING jobs dobara queue me."""
+    return ExportJob.objects.filter(status='RUNNING').update(status='PENDING', progress=0)
+
+
+def _progress_reporter(job_id, updates):
+    """Child ka progress(done, total) - DB nahi, `updates` queue me (job_id, fields)."""
+    last = 0
+
+    def progress(done, total):
+        nonlocal last
+        if not total or updates is None:
+            return
+        percent = min(99, done * 100 // total)
+        # Har row par message nahi - 5% ke steps me
+        if percent >= last + 5:
+            last = percent
+            updates.put((job_id, {'progress': percent}))
+    return progress
+
+
+def save_job_update(job_id, fields):
+    """Parent process: child se aaye progress / result fields job row me."""
+    jobs = ExportJob.objects.filter(pk=job_id)
+    if 'status' not in fields:
+        jobs = jobs.filter(status='RUNNING') # der se aaya progress DONE job ko na badle
+    return jobs.update(**fields)
+
+
+# ------------------------------------------
+# Export builders: (job, path, progress) -> download filename
+# ------------------------------------------
+
+def _build_canteen_excel(job, path, progress):
+    params = job.params
+    canteen = Canteen.objects.get(pk=params['canteen_id'])
+    start_date, end_date = _as_date(params['start_date']), _as_date(params['end_date'])
+
+    wb = Workbook(write_only=True)
+    write_canteen_sheet(wb, canteen, start_date, end_date, progress=progress)
+    wb.save(path)
+    return canteen_excel_filename(canteen, start_date, end_date)
+
+
+def _build_expense_csv(job, path, progress):
+    params = job.params
+    expenses = filtered_expenses(
+        _as_date(params['start_date']), _as_date(params['end_date']),
+        canteen_id=params.get('canteen_id'),
+        category=params.get('category'),
+    )
+    with open(path, 'w', newline='', encoding='utf-8') as fileobj:
+        write_csv(fileobj, expense_rows(expenses), total=expenses.count(), progress=progress)
+    return f"Expense_Report_{params['start_date']}_to_{params['end_date']}.csv"
+
+
+def _build_consolidated_excel(job, path, progress):
+    # Canteen sheets ka data is job ke andar ek aur process pool me banta hai
+    start_date, end_date = _as_date(job.params['start_date']), _as_date(job.params['end_date'])
+    write_consolidated_workbook(path, start_date, end_date, progress=progress)
+    return consolidated_excel_filename(start_date, end_date)
+
+
+EXPORT_BUILDERS = {
+    'CANTEEN_EXCEL': ('xlsx', _build_canteen_excel),
+    'EXPENSE_CSV': ('csv', _build_expense_csv),
+    'CONSOLIDATED_EXCEL': ('xlsx', _build_consolidated_excel),
+}
+
+
+def run_export_job(job_id, updates=None):
+    """
+    Worker process me chalta hai: file likhta hai, DB me kuch nahi. (job_id,
+    fields) return karta hai - parent save_job_update() se DONE/FAILED likhta hai.
+    """
+    job = ExportJob.objects.get(pk=job_id)
+    extension, build = EXPORT_BUILDERS[job.kind]
+
+    name = f"{EXPORT_DIR}/{job.cache_key[:16]}-{job.pk}.{extension}"
+    path = os.path.join(settings.MEDIA_ROOT, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = path + '.part'
+
+    try:
+        filename = build(job, partial_path, _progress_reporter(job.pk, updates))
+        # Poori file likhne ke baad hi asli naam - adhuri file kabhi download na ho
+        os.replace(partial_path, path)
+    except Exception as exc:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        return job.pk, {
+            'status': 'FAILED', 'error': f"{type(exc).__name__}: {exc}", 'finished_at': timezone.now(),
+        }
+
+    return job.pk, {
+        'status': 'DONE', 'progress': 100, 'file': name, 'filename': filename, 'error': '',
+        'finished_at': timezone.now(),
+    }
+
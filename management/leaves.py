@@ -0,0 +1,95 @@
+# management/leaves.py
+
+# ==========================================
+# Leave Interval Index
+# ==========================================
+# Staff ki saari leaves ek baar load karke sorted intervals me rakhte hain.
+# "[a, b] me kitne leave din the (paid / unpaid)?" ka jawab binary search se
+# O(log n) me milta hai - mahine ki boundary cross karne wali leave ke din
+# dono mahino me sahi se bant jaate hain.
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from .models import StaffLeave
+
+
+class _Intervals:
+    """Ek hi type (paid ya unpaid) ke merged, sorted [start, end] intervals."""
+
+    def __init__(self, periods):
+        self.starts, self.ends, self.prefix = [], [], [0]
+
+        merged = []
+        for start_date, end_date in sorted(periods):
+            if merged and start_date.toordinal() <= merged[-1][1].toordinal() + 1:
+                # Overlap ya lagatar din - ek hi interval (ek din do baar na gine)
+                if end_date > merged[-1][1]:
+                    merged[-1][1] = end_date
+            else:
+                merged.append([start_date, end_date])
+
+        for start_date, end_date in merged:
+            self.starts.append(start_date)
+            self.ends.append(end_date)
+            self.prefix.append(self.prefix[-1] + (end_date - start_date).days + 1)
+
+    def days_between(self, start_date, end_date):
+        if start_date > end_date:
+            return 0
+        first = bisect_left(self.ends, start_date)    # pehla interval jo start ke baad khatam ho
+        last = bisect_right(self.starts, end_date)    # aakhri interval jo end se pehle shuru ho
+        if first >= last:
+            return 0
+
+        days = self.prefix[last] - self.prefix[first]
+        # Kinaron wale intervals ko [start, end] tak kaat do
+        if self.starts[first] < start_date:
+            days -= (start_date - self.starts[first]).days
+        if self.ends[last - 1] > end_date:
+            days -= (self.ends[last - 1] - end_date).days
+        return days
+
+
+class LeaveIndex:
+    def __init__(self, leaves=()):
+        """leaves: (start_date, end_date, is_paid_leave) tuples"""
+        paid, unpaid = [], []
+        for start_date, end_date, is_paid in leaves:
+            if end_date < start_date:
+                continue
+            (paid if is_paid else unpaid).append((start_date, end_date))
+        self._paid = _Intervals(paid)
+        self._unpaid = _Intervals(unpaid)
+
+    def leave_days(self, start_date, end_date):
+        """[start_date, end_date] me (paid_days, unpaid_days)."""
+        return (
+            self._paid.days_between(start_date, end_date),
+            self._unpaid.days_between(start_date, end_date),
+        )
+
+    @classmethod
+    def for_staff_member(cls, staff, start_date=None, end_date=None):
+        leaves = StaffLeave.objects.filter(staff=staff)
+        if start_date is not None:
+            leaves = leaves.filter(end_date__gte=start_date)
+        if end_date is not None:
+            leaves = leaves.filter(start_date__lte=end_date)
+        return cls(leaves.values_list('start_date', 'end_date', 'is_paid_leave'))
+
+    @classmethod
+    def for_staff(cls, staff_ids, start_date, end_date):
+        """
+        {staff_id: LeaveIndex} - [start, end] se overlap karne wali saari
+        leaves ek hi query me. staff_ids list ya queryset ho sakta hai.
+        """
+        grouped = defaultdict(list)
+        leaves = StaffLeave.objects.filter(
+            staff__in=staff_ids,
+            start_date__lte=end_date,
+            end_date__gte=start_date,
+        ).values_list('staff', 'start_date', 'end_date', 'is_paid_leave')
+        for staff_id, leave_start, leave_end, is_paid in leaves:
+            grouped[staff_id].append((leave_start, leave_end, is_paid))
+        return defaultdict(cls, {staff_id: cls(items) for staff_id, items in grouped.items()})
@@ -0,0 +1,124 @@
+# management/ledger.py
+
+# ==========================================
+# Staff Ledger (Bank Passbook Style)
+# ==========================================
+# Har mahine ki 1st ko salary credit (leave kaat ke), har payment debit.
+# Pehle har request par joining se aaj tak har mahine ki ek StaffLeave query
+# chalti thi. Ab:
+#   - payments aur leaves ek-ek query me aate hain (leaves LeaveIndex me)
+#   - band mahino ka closing balance StaffLedgerCheckpoint me save hota hai
+#   - date filter wale view nearest checkpoint se shuru hote hain
+
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+
+from .leaves import LeaveIndex
+from .models import SalaryPayment, StaffLedgerCheckpoint
+from .reports import month_range
+
+
+def _salary_credit(staff, leave_days):
+    daily_rate = staff.monthly_salary / 30
+    return round(staff.monthly_salary - daily_rate * leave_days, 2)
+
+
+def staff_ledger(staff, start_date=None, end_date=None, payment_label="Payment Taken"):
+    """
+    (ledger_rows, overall_balance) return karta hai.
+    ledger_rows purane se naye order me, [start_date, end_date] filter ke saath.
+    """
+    today = date.today()
+    first_month = (staff.joining_date or date(today.year, 1, 1)).replace(day=1)
+    current_month = today.replace(day=1)
+
+    # 1. Checkpoints: filter ho to start se pehle wala sabse nazdeeki checkpoint
+    checkpoints = dict(
+        StaffLedgerCheckpoint.objects.filter(staff=staff).values_list('month', 'closing_balance')
+    )
+    from_month = first_month
+    opening_balance = Decimal('0')
+    if start_date:
+        earlier = [m for m in checkpoints if first_month <= m < start_date.replace(day=1)]
+        if earlier:
+            base_month = max(earlier)
+            opening_balance = checkpoints[base_month]
+            from_month = base_month + relativedelta(months=1)
+
+    # 2. Payments aur Leaves (from_month ke baad wale) - ek-ek query
+    payments = SalaryPayment.objects.filter(staff=staff).order_by('date', 'id')
+    if from_month != first_month:
+        payments = payments.filter(date__gte=from_month)
+    leaves = LeaveIndex.for_staff_member(staff, start_date=from_month)
+
+    all_transactions = []
+    for pay_date, payment_type, amount in payments.values_list('date', 'payment_type', 'amount'):
+        all_transactions.append({
+            'date': pay_date,
+            'description': f"{payment_label} ({payment_type})",
+            'credit': 0,
+            'debit': amount,
+            'type': 'debit'
+        })
+
+    # 3. Monthly Salary (Credit) - Salary on 1st
+    current_date = from_month
+    while current_date <= current_month:
+        # Sirf unpaid leave ke din kat-te hain (Paid Leave = "Don't Cut Salary")
+        _, unpaid_days = leaves.leave_days(*month_range(current_date))
+        all_transactions.append({
+            'date': current_date,
+            'description': f"Salary Credited ({current_date.strftime('%B %Y')})",
+            'credit': _salary_credit(staff, unpaid_days),
+            'debit': 0,
+            'type': 'credit'
+        })
+        current_date += relativedelta(months=1)
+
+    # 4. Sort (Oldest first, same din credit pehle)
+    all_transactions.sort(key=lambda x: (x['date'], 0 if x['type'] == 'credit' else 1))
+
+    # 5. Running balance + band mahino ke naye checkpoints
+    running_balance = opening_balance
+    new_checkpoints = []
+    month = from_month
+    month_end = month_range(month)[1]
+    final_ledger = []
+
+    def close_months_until(trans_date):
+        nonlocal month, month_end
+        while month < current_month and (trans_date is None or trans_date > month_end):
+            if month not in checkpoints:
+                checkpoints[month] = running_balance
+                new_checkpoints.append(StaffLedgerCheckpoint(
+                    staff=staff, month=month, closing_balance=running_balance
+                ))
+            month += relativedelta(months=1)
+            month_end = month_range(month)[1]
+
+    for trans in all_transactions:
+        close_months_until(trans['date'])
+        running_balance = running_balance + trans['credit'] - trans['debit']
+        trans['balance'] = running_balance
+
+        if start_date and trans['date'] < start_date:
+            continue
+        if end_date and trans['date'] > end_date:
+            continue
+        final_ledger.append(trans)
+    close_months_until(None)
+
+    if new_checkpoints:
+        StaffLedgerCheckpoint.objects.bulk_create(new_checkpoints, ignore_conflicts=True)
+
+    return final_ledger, running_balance
+
+
+def invalidate_ledger(staff_id, from_date):
+    """from_date ke mahine aur uske baad ke checkpoints hata deta hai."""
+    checkpoints = StaffLedgerCheckpoint.objects.filter(staff_id=staff_id)
+    if from_date is not None:
+        checkpoints = checkpoints.filter(month__gte=from_date.replace(day=1))
+    checkpoints.delete()
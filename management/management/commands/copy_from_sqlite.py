@@ -0,0 +1,119 @@
+# management/management/commands/copy_from_sqlite.py
+
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers import sort_dependencies
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.connection import ConnectionDoesNotExist
+
+
+# Ye tables `migrate` khud bhar deta hai - target ke rows hata ke source wale
+# (same IDs) daalte hain, taaki admin log / permissions ke foreign keys sahi rahein.
+REGENERATED_MODELS = (ContentType, Permission)
+
+
+def _copy_order():
+    """Saare models foreign key order me, phir M2M ki auto through tables."""
+    app_list = [(app_config, None) for app_config in apps.get_app_configs()]
+    models = [
+        model for model in sort_dependencies(app_list, allow_cycles=True)
+        if model._meta.managed and not model._meta.proxy
+    ]
+    through = [
+        field.remote_field.through
+        for model in models
+        for field in model._meta.local_many_to_many
+        if field.remote_field.through._meta.auto_created
+    ]
+    return models + through
+
+
+@contextmanager
+def _source_dates(model):
+    """
+    bulk_create auto_now / auto_now_add fields (ExportJob.created_at, ...) ko
+    abhi ka time de deta hai - copy ke dauraan band, taaki source ki dates rahein.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Purane SQLite database (DATABASES['sqlite']) ka saara data naye, migrate "
+        "kiye hue database (jaise PostgreSQL) me copy karta hai - IDs wahi rehti hain. "
+        "Target khali hona chahiye."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default='sqlite', help="Source database alias")
+        parser.add_argument('--target', default=DEFAULT_DB_ALIAS, help="Target database alias")
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        source, target = options['source'], options['target']
+        try:
+            connections[source], connections[target]
+        except ConnectionDoesNotExist as error:
+            raise CommandError(f"{error} (DB_ENGINE=postgres ke saath 'sqlite' alias banta hai).")
+        if source == target:
+            raise CommandError("Source aur target alag hone chahiye.")
+
+        models = _copy_order()
+        filled = [
+            model._meta.label for model in models
+            if model not in REGENERATED_MODELS and model._base_manager.using(target).exists()
+        ]
+        if filled:
+            raise CommandError(f"Target database khali nahi hai: {', '.join(filled)}")
+
+        batch_size = options['batch_size']
+        with transaction.atomic(using=target):
+            for model in REGENERATED_MODELS:
+                model._base_manager.using(target).all().delete()
+
+            for model in models:
+                count = self.copy(model, source, target, batch_size)
+                if count:
+                    self.stdout.write(f"  {model._meta.label:<40} {count:>10,}")
+
+            # Explicit IDs daale hain - PostgreSQL sequences ko max(id) ke aage le jao
+            connection = connections[target]
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+
+        ContentType.objects.clear_cache()
+        self.stdout.write(self.style.SUCCESS(f"{len(models)} tables '{source}' se '{target}' me copy ho gayi."))
+
+    def copy(self, model, source, target, batch_size):
+        rows = model._base_manager.using(source).order_by('pk').iterator(chunk_size=batch_size)
+        manager = model._base_manager.using(target)
+        count = 0
+        batch = []
+        with _source_dates(model):
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    manager.bulk_create(batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                manager.bulk_create(batch)
+                count += len(batch)
+        return count
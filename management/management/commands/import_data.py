@@ -0,0 +1,48 @@
+# management/management/commands/import_data.py
+
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management.imports import IMPORT_CHUNK_SIZE, IMPORT_KINDS, ImportFileError, error_report_rows, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "CSV/XLSX file se Expenses ya Daily Entries import karta hai (web wale Import "
+        "page jaisa). Galat rows ki report --errors file me."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(IMPORT_KINDS))
+        parser.add_argument('path')
+        parser.add_argument('--dry-run', action='store_true', help="Sirf check, kuch save nahi")
+        parser.add_argument('--errors', help="Error report CSV yahan likho")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"File nahi mili: {path}")
+
+        try:
+            with path.open('rb') as file:
+                result = import_rows(
+                    options['kind'], read_rows(file, path.name),
+                    dry_run=options['dry_run'], chunk_size=options['chunk_size'],
+                )
+        except ImportFileError as error:
+            raise CommandError(str(error))
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='') as report:
+                csv.writer(report).writerows(error_report_rows(result))
+        else:
+            for number, message in result.errors[:20]:
+                self.stderr.write(f"  Row {number}: {message}")
+
+        saved = f"{result.valid} sahi (dry run)" if result.dry_run else f"{result.created} saved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{IMPORT_KINDS[options['kind']].label}: {result.rows} rows, {saved}, {len(result.errors)} errors."
+        ))
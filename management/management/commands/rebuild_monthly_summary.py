@@ -0,0 +1,13 @@
+# management/management/commands/rebuild_monthly_summary.py
+
+from django.core.management.base import BaseCommand
+
+from management.summary import rebuild_all_summaries
+
+
+class Command(BaseCommand):
+    help = "MonthlyCanteenSummary table ko raw DailyEntry/Expense/SalaryPayment data se dobara banata hai."
+
+    def handle(self, *args, **options):
+        count = rebuild_all_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Monthly summary rebuilt: {count} rows."))
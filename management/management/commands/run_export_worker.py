@@ -0,0 +1,94 @@
+# management/management/commands/run_export_worker.py
+
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.utils import timezone
+
+from management.jobs import claim_job, reset_interrupted_jobs, run_export_job, save_job_update
+from management.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = (
+        "PENDING export jobs ko process pool me chalata hai (files MEDIA_ROOT/exports/ me). "
+        "Ek machine par ek hi worker chalayein."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                            help="Ek saath kitne exports ban sakte hain")
+        parser.add_argument('--poll', type=float, default=2.0,
+                            help="Naye jobs ke liye kitne second me check kare")
+        parser.add_argument('--once', action='store_true',
+                            help="Queue khali hone par band ho jao (cron ke liye)")
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        reset = reset_interrupted_jobs()
+        if reset:
+            self.stdout.write(f"{reset} adhure job(s) dobara queue me daale.")
+
+        # Children DB me nahi likhte (management/jobs.py) - progress is queue se aata
+        # hai, aur job row me sirf yahi process likhta hai
+        with multiprocessing.Manager() as manager, \
+                ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            updates = manager.Queue()
+            running = {} # future -> job_id
+            unsaved = {} # job_id -> fields jo abhi DB me nahi likhe ja sake
+
+            while True:
+                # 1. Children ka progress (result aa chuka ho to purana progress chhod do)
+                while True:
+                    try:
+                        job_id, fields = updates.get_nowait()
+                    except queue.Empty:
+                        break
+                    if 'status' not in unsaved.get(job_id, {}):
+                        unsaved.setdefault(job_id, {}).update(fields)
+
+                # 2. Khatam hue jobs ka result
+                for future in [f for f in running if f.done()]:
+                    job_id = running.pop(future)
+                    try:
+                        _, fields = future.result()
+                    except Exception as exc:
+                        # Builder ke bahar ki galti (job delete, process crash) - job ko FAILED karo
+                        fields = {'status': 'FAILED', 'error': str(exc), 'finished_at': timezone.now()}
+                    unsaved[job_id] = fields
+                    self.stdout.write(f"Export job #{job_id}: {fields['status']}")
+
+                # 3. DB writes. Lock na mile (children lambi read kar rahe hain) to
+                # agle round me dobara - job RUNNING me atka nahi rehta
+                busy = False
+                try:
+                    for job_id in list(unsaved):
+                        save_job_update(job_id, unsaved[job_id])
+                        del unsaved[job_id]
+
+                    free = workers - len(running)
+                    pending = list(
+                        ExportJob.objects.filter(status='PENDING').order_by('created_at')
+                        .values_list('pk', flat=True)[:free]
+                    ) if free else []
+
+                    for job_id in pending:
+                        if claim_job(job_id):
+                            # Fork se pehle connection band - child ko apna naya SQLite connection mile
+                            connections.close_all()
+                            running[pool.submit(run_export_job, job_id, updates)] = job_id
+                except OperationalError as exc:
+                    self.stderr.write(f"Database busy, dobara koshish: {exc}")
+                    busy, pending = True, []
+
+                if options['once'] and not running and not pending and not unsaved and not busy:
+                    break
+                time.sleep(options['poll'] if not pending or busy else 0.1)
+
+        self.stdout.write(self.style.SUCCESS("Export worker band."))
@@ -0,0 +1,275 @@
+# management/management/commands/seed_scale.py
+
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from management.models import Canteen, DailyEntry, Expense, SalaryPayment, Staff, StaffLeave
+from management.summary import rebuild_all_summaries
+
+
+SEED_PREFIX = "Seed Canteen"
+
+# Category -> (min, max) amount (₹) aur description
+EXPENSE_PROFILE = {
+    'Kirana': (500, 5000, "Kirana saman"),
+    'Gas': (900, 2200, "Gas cylinder"),
+    'Vegetables': (300, 2500, "Sabzi mandi"),
+    'Milk': (200, 1500, "Doodh"),
+    'Auto': (50, 400, "Auto bhada"),
+    'Wood': (200, 1000, "Lakdi"),
+    'Disposable': (100, 800, "Plate, glass"),
+    'Coka and Namkeen, Biscuit': (200, 1200, "Cold drink, namkeen"),
+    'Other': (50, 2000, "Misc kharcha"),
+}
+PAYMENT_MODES = ['Online'] * 6 + ['Cash'] * 3 + ['Pending']
+LEAVE_REASONS = ["Ghar par kaam", "Tabiyat kharab", "Shaadi", "Gaon jaana", None]
+
+
+def _batches(objects, size):
+    iterator = iter(objects)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _days(start_date, end_date):
+    current = start_date
+    while current <= end_date:
+        yield current
+        current += timedelta(days=1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Scale testing ke liye nakli data (canteens, staff, daily entries, expenses, "
+        "salary, leaves) bulk insert se banata hai. Same --seed aur --end-date par "
+        "hamesha same data. Khali/scratch database par chalayein. "
+        "~1M rows: --canteens 50 --years 5 --expenses-per-day 10"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--canteens', type=int, default=20)
+        parser.add_argument('--staff', type=int, default=15, help="Har canteen me staff")
+        parser.add_argument('--years', type=int, default=3, help="Kitne saal ki DailyEntry/Expense")
+        parser.add_argument('--expenses-per-day', type=int, default=len(EXPENSE_PROFILE),
+                            help="Har canteen me roz kitne expense (categories ghoom ke aati hain)")
+        parser.add_argument('--leaves-per-year', type=int, default=6, help="Har staff ki saal me leaves")
+        parser.add_argument('--end-date', default=None, help="YYYY-MM-DD (default: aaj)")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if Canteen.objects.filter(name__startswith=SEED_PREFIX).exists():
+            raise CommandError("Seed data pehle se maujood hai - naye/khali database par chalayein.")
+
+        end_date = date.today()
+        if options['end_date']:
+            end_date = datetime.strptime(options['end_date'], "%Y-%m-%d").date()
+        start_date = end_date - relativedelta(years=options['years']) + timedelta(days=1)
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+        counts = {}
+
+        # Ek hi transaction - SQLite par har batch ka alag commit sabse mehnga hota hai.
+        # DEBUG=True me Django har INSERT ka SQL yaad rakhta hai - seeding ke dauraan band.
+        with override_settings(DEBUG=False), transaction.atomic():
+            canteens = Canteen.objects.bulk_create(self.canteens(options['canteens']))
+            counts['Canteen'] = len(canteens)
+            staff = Staff.objects.bulk_create(self.staff(canteens, options['staff'], start_date, end_date))
+            counts['Staff'] = len(staff)
+
+            counts['DailyEntry'] = self.insert(DailyEntry, self.daily_entries(canteens, start_date, end_date))
+            counts['Expense'] = self.insert(
+                Expense, self.expenses(canteens, start_date, end_date, options['expenses_per_day'])
+            )
+            counts['SalaryPayment'] = self.insert(SalaryPayment, self.payments(staff, end_date))
+            counts['StaffLeave'] = self.insert(
+                StaffLeave, self.leaves(staff, end_date, options['leaves_per_year'])
+            )
+        inserted = time.perf_counter() - started
+
+        # Bulk insert signals nahi bhejta, isliye summary table ek baar me dobara
+        summaries = rebuild_all_summaries()
+
+        for model_name, count in counts.items():
+            self.stdout.write(f"  {model_name:<14} {count:>10,}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(counts.values()):,} rows {inserted:.1f}s me bane "
+            f"({start_date} se {end_date}); {summaries} monthly summary rows "
+            f"(kul {time.perf_counter() - started:.1f}s)."
+        ))
+
+    def insert(self, model, rows):
+        """
+        Rows (field attname -> value dicts) seedha executemany se daalta hai.
+        bulk_create har row ke har field ka SQL alag compile karta hai - 1M rows
+        par wahi sabse mehnga tha. Jo field row me nahi, uska model default.
+        """
+        fields = [f for f in model._meta.concrete_fields if not f.primary_key]
+        defaults = {f.attname: f.get_default() for f in fields}
+        quote = connection.ops.quote_name
+        sql = "INSERT INTO %s (%s) VALUES (%s)" % (
+            quote(model._meta.db_table),
+            ", ".join(quote(f.column) for f in fields),
+            ", ".join(["%s"] * len(fields)),
+        )
+
+        count = 0
+        with connection.cursor() as cursor:
+            for batch in _batches(rows, self.batch_size):
+                cursor.executemany(sql, [
+                    [row.get(name, default) for name, default in defaults.items()]
+                    for row in batch
+                ])
+                count += len(batch)
+        return count
+
+    # ------------------------------------------
+    # Generators (rng order fix hai, isliye data deterministic).
+    # Canteen/Staff model objects (pk chahiye), baaki tables ke plain dicts.
+    # ------------------------------------------
+
+    def canteens(self, total):
+        for n in range(1, total + 1):
+            billing = 'MONTHLY' if n % 3 == 0 else 'DAILY'
+            yield Canteen(
+                name=f"{SEED_PREFIX} {n:03d}",
+                location=f"Site {n:03d}",
+                billing_type=billing,
+                daily_lunch_count=self.rng.randint(50, 400),
+                daily_dinner_count=self.rng.randint(20, 200),
+            )
+
+    def staff(self, canteens, per_canteen, start_date, end_date):
+        rng = self.rng
+        for canteen in canteens:
+            for n in range(per_canteen):
+                if n == 0:
+                    role, salary = 'Manager', rng.randrange(25000, 35001, 500)
+                elif n <= 3:
+                    role, salary = 'Cook', rng.randrange(15000, 22001, 500)
+                else:
+                    role, salary = 'Helper', rng.randrange(9000, 13001, 500)
+
+                joining = start_date + timedelta(days=rng.randrange(365))
+                leaving = None
+                if rng.random() < 0.1:
+                    leaving = joining + timedelta(days=rng.randrange(90, 720))
+                    if leaving >= end_date:
+                        leaving = None
+
+                yield Staff(
+                    canteen=canteen,
+                    name=f"Seed Staff {canteen.name[-3:]}-{n + 1:02d}",
+                    role=role,
+                    phone=f"9{rng.randrange(10 ** 9):09d}",
+                    joining_date=joining,
+                    monthly_salary=Decimal(salary),
+                    is_active=leaving is None,
+                    leaving_date=leaving,
+                )
+
+    def daily_entries(self, canteens, start_date, end_date):
+        rng = self.rng
+        for canteen in canteens:
+            monthly = canteen.billing_type == 'MONTHLY'
+            for day in _days(start_date, end_date):
+                lunch = max(0, canteen.daily_lunch_count + rng.randint(-30, 30))
+                dinner = max(0, canteen.daily_dinner_count + rng.randint(-20, 20))
+                nasta = rng.randint(20, 150)
+                tea = rng.randint(50, 400)
+                sales = lunch * 80 + dinner * 80 + nasta * 30 + tea * 10
+                online = sales * rng.randint(20, 50) // 100
+                yield dict(
+                    canteen_id=canteen.pk,
+                    date=day,
+                    lunch_qty=lunch,
+                    dinner_qty=dinner,
+                    nasta_qty=nasta,
+                    tea_qty=tea,
+                    normal_token_qty=rng.randint(50, 300) if monthly else 0,
+                    special_token_qty=rng.randint(0, 40) if monthly else 0,
+                    guest_token_qty=rng.randint(0, 15) if monthly else 0,
+                    cash_received=Decimal(sales - online),
+                    online_received=Decimal(online),
+                )
+
+    def expenses(self, canteens, start_date, end_date, per_day):
+        rng = self.rng
+        categories = list(EXPENSE_PROFILE)
+        for canteen in canteens:
+            for day in _days(start_date, end_date):
+                # Har din categories ghoom ke aati hain, taaki saari categories me data ho
+                offset = rng.randrange(len(categories))
+                for n in range(per_day):
+                    category = categories[(offset + n) % len(categories)]
+                    low, high, description = EXPENSE_PROFILE[category]
+                    yield dict(
+                        canteen_id=canteen.pk,
+                        date=day,
+                        category=category,
+                        description=description,
+                        amount=Decimal(rng.randrange(low, high + 1, 10)),
+                        payment_mode=rng.choice(PAYMENT_MODES),
+                    )
+
+    def payments(self, staff_members, end_date):
+        rng = self.rng
+        for staff in staff_members:
+            last_day = staff.leaving_date or end_date
+            month = staff.joining_date.replace(day=1)
+            while month <= last_day:
+                # Beech mahine advance (kabhi-kabhi)
+                if rng.random() < 0.3:
+                    advance_date = month + timedelta(days=rng.randint(9, 19))
+                    if staff.joining_date <= advance_date <= last_day:
+                        yield dict(
+                            staff_id=staff.pk, date=advance_date, payment_type='Advance',
+                            amount=Decimal(rng.randrange(1000, 5001, 500)),
+                        )
+                # Pichle mahine ki salary agle mahine ki 1-7 tarikh ko
+                salary_date = month + relativedelta(months=1) + timedelta(days=rng.randint(0, 6))
+                if salary_date <= last_day:
+                    yield dict(
+                        staff_id=staff.pk, date=salary_date, payment_type='Monthly',
+                        amount=staff.monthly_salary, notes=f"Salary {month:%B %Y}",
+                    )
+                # Diwali bonus
+                if month.month == 10 and rng.random() < 0.8:
+                    bonus_date = month + timedelta(days=rng.randint(14, 27))
+                    if staff.joining_date <= bonus_date <= last_day:
+                        yield dict(
+                            staff_id=staff.pk, date=bonus_date, payment_type='Bonus',
+                            amount=(staff.monthly_salary / 2).quantize(Decimal('1')),
+                        )
+                month += relativedelta(months=1)
+
+    def leaves(self, staff_members, end_date, per_year):
+        rng = self.rng
+        for staff in staff_members:
+            last_day = staff.leaving_date or end_date
+            year_start = staff.joining_date
+            while year_start < last_day:
+                for _ in range(per_year):
+                    start = year_start + timedelta(days=rng.randrange(365))
+                    end = start + timedelta(days=rng.randint(0, 2))
+                    if end > last_day:
+                        continue
+                    yield dict(
+                        staff_id=staff.pk, start_date=start, end_date=end,
+                        reason=rng.choice(LEAVE_REASONS),
+                        is_paid_leave=rng.random() < 0.4,
+                    )
+                year_start += relativedelta(years=1)
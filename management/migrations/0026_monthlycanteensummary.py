@@ -0,0 +1,103 @@
+# Generated by Django 6.0 on 2026-10-18 08:16
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+
+MEAL_FIELDS = [
+    'tea_qty', 'nasta_qty', 'lunch_qty', 'dinner_qty',
+    'normal_token_qty', 'special_token_qty', 'guest_token_qty',
+]
+
+
+def build_summaries(apps, schema_editor):
+    # Purane data se summary table bhar do. Sirf historical models - live
+    # management.summary / models badle to bhi `migrate` shuru se chalta rahe.
+    Summary = apps.get_model('management', 'MonthlyCanteenSummary')
+    DailyEntry = apps.get_model('management', 'DailyEntry')
+    Expense = apps.get_model('management', 'Expense')
+    SalaryPayment = apps.get_model('management', 'SalaryPayment')
+
+    rows = {}
+
+    def row(canteen_id, month):
+        if (canteen_id, month) not in rows:
+            rows[canteen_id, month] = Summary(
+                canteen_id=canteen_id, month=month, expense_by_category={}, expense_by_mode={},
+            )
+        return rows[canteen_id, month]
+
+    def add(bucket, key, amount):
+        bucket[key] = str(Decimal(bucket.get(key, '0')) + amount)
+
+    income = DailyEntry.objects.annotate(m=TruncMonth('date')).values('canteen', 'm').annotate(
+        cash=Sum('cash_received'), online=Sum('online_received'),
+        **{name: Sum(name) for name in MEAL_FIELDS}
+    ).order_by()
+    for item in income:
+        summary = row(item['canteen'], item['m'])
+        for name in MEAL_FIELDS:
+            setattr(summary, name, item[name] or 0)
+        summary.cash_received = item['cash'] or Decimal('0')
+        summary.online_received = item['online'] or Decimal('0')
+
+    expenses = Expense.objects.annotate(m=TruncMonth('date')).values(
+        'canteen', 'm', 'category', 'payment_mode'
+    ).annotate(total=Sum('amount')).order_by()
+    for item in expenses:
+        summary = row(item['canteen'], item['m'])
+        amount = item['total'] or Decimal('0')
+        summary.expense_total += amount
+        add(summary.expense_by_category, item['category'], amount)
+        add(summary.expense_by_mode, item['payment_mode'], amount)
+
+    salaries = SalaryPayment.objects.annotate(m=TruncMonth('date')).values(
+        'staff__canteen', 'm'
+    ).annotate(total=Sum('amount')).order_by()
+    for item in salaries:
+        row(item['staff__canteen'], item['m']).salary_total = item['total'] or Decimal('0')
+
+    Summary.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0025_staff_is_active_staff_leaving_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCanteenSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Month')),
+                ('tea_qty', models.IntegerField(default=0, verbose_name='Tea Qty')),
+                ('nasta_qty', models.IntegerField(default=0, verbose_name='Nasta Qty')),
+                ('lunch_qty', models.IntegerField(default=0, verbose_name='Lunch Qty')),
+                ('dinner_qty', models.IntegerField(default=0, verbose_name='Dinner Qty')),
+                ('normal_token_qty', models.IntegerField(default=0, verbose_name='Normal Token Qty')),
+                ('special_token_qty', models.IntegerField(default=0, verbose_name='Special Token Qty')),
+                ('guest_token_qty', models.IntegerField(default=0, verbose_name='Guest Token Qty')),
+                ('cash_received', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Cash Income')),
+                ('online_received', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Online Income')),
+                ('expense_total', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Total Expense')),
+                ('salary_total', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Total Salary Paid')),
+                ('expense_by_category', models.JSONField(default=dict, verbose_name='Expense by Category')),
+                ('expense_by_mode', models.JSONField(default=dict, verbose_name='Expense by Payment Mode')),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('canteen', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='management.canteen', verbose_name='Canteen')),
+            ],
+            options={
+                'verbose_name': 'Monthly Canteen Summary',
+                'verbose_name_plural': 'Monthly Canteen Summaries',
+                'ordering': ['month'],
+                'unique_together': {('canteen', 'month')},
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-18 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0026_monthlycanteensummary'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='payroll',
+            options={'ordering': ['month', 'staff__name']},
+        ),
+        migrations.AddField(
+            model_name='payroll',
+            name='computed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='payroll',
+            name='is_stale',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterUniqueTogether(
+            name='payroll',
+            unique_together={('staff', 'month')},
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 08:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0027_payroll_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaffLedgerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Month')),
+                ('closing_balance', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Closing Balance')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('staff', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='management.staff', verbose_name='Staff Member')),
+            ],
+            options={
+                'verbose_name': 'Staff Ledger Checkpoint',
+                'verbose_name_plural': 'Staff Ledger Checkpoints',
+                'ordering': ['month'],
+                'unique_together': {('staff', 'month')},
+            },
+        ),
+    ]
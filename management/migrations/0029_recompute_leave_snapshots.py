@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 08:40
+
+from django.db import migrations
+
+
+def recompute_leave_snapshots(apps, schema_editor):
+    # Leave ab mahine ki boundary par bant-ti hai (LeaveIndex), isliye purane
+    # payslips aur ledger checkpoints dobara calculate hone chahiye
+    Payroll = apps.get_model('management', 'Payroll')
+    StaffLedgerCheckpoint = apps.get_model('management', 'StaffLedgerCheckpoint')
+    Payroll.objects.update(is_stale=True)
+    StaffLedgerCheckpoint.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0028_staffledgercheckpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_leave_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0030_exportjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='kind',
+            field=models.CharField(choices=[('CANTEEN_EXCEL', 'Canteen Excel Report'), ('EXPENSE_CSV', 'Expense CSV'), ('CONSOLIDATED_EXCEL', 'All Canteens Excel (Consolidated)')], max_length=20, verbose_name='Export Type'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0031_exportjob_consolidated'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['canteen', 'date'], name='expense_canteen_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['date', 'category'], name='expense_date_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salarypayment',
+            index=models.Index(fields=['staff', 'date', 'payment_type'], name='salary_staff_date_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staffleave',
+            index=models.Index(fields=['staff', 'start_date', 'end_date', 'is_paid_leave'], name='leave_staff_dates_idx'),
+        ),
+    ]
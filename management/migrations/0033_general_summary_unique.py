@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 11:05
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def drop_duplicate_general_rows(apps, schema_editor):
+    # Ek saath hue refresh se bani General (canteen=NULL) duplicate rows - har
+    # row poora hisaab hai, isliye sabse nayi rakh ke baaki hata do
+    Summary = apps.get_model('management', 'MonthlyCanteenSummary')
+    duplicates = Summary.objects.filter(canteen__isnull=True).values('month').annotate(
+        rows=Count('id'), newest=Max('id')
+    ).filter(rows__gt=1).order_by()
+    for item in duplicates:
+        Summary.objects.filter(canteen__isnull=True, month=item['month']).exclude(pk=item['newest']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0032_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_general_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='monthlycanteensummary',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('canteen__isnull', True)), fields=('month',), name='unique_general_summary_month',
+            ),
+        ),
+    ]
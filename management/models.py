@@ -1,5 +1,6 @@
 # management/models.py
 
+from django.conf import settings
 from django.db import models
 from datetime import date
 
@@ -42,6 +43,34 @@ class Canteen(models.Model):
 
 # management/models.py (Canteen class के नीचे)
 
+# ==========================================
+# Queryset builders (eager loading ek jagah)
+# ==========================================
+# List/report pages related object (canteen.name, staff.name) har row par
+# padhte hain. View seedha .objects.filter() na karke yahan ke builders use
+# karein, taaki JOIN (select_related) aur zaroori columns (only) hamesha lagein.
+
+class StaffQuerySet(models.QuerySet):
+    # Staff list, ex-staff, payroll pages me yahi fields dikhte hain
+    LIST_FIELDS = (
+        'name', 'role', 'photo', 'joining_date', 'monthly_salary',
+        'is_active', 'leaving_date', 'canteen__name',
+    )
+
+    def with_canteen(self):
+        # __str__ bhi canteen.name padhta hai (form dropdowns, admin)
+        return self.select_related('canteen')
+
+    def for_list(self):
+        return self.with_canteen().only(*self.LIST_FIELDS)
+
+    def active(self):
+        return self.filter(is_active=True)
+
+    def former(self):
+        return self.filter(is_active=False)
+
+
 class Staff(models.Model):
     ROLES = [
         ('Manager', 'Manager'),
@@ -66,6 +95,8 @@ class Staff(models.Model):
     photo = models.ImageField(upload_to='staff_photos/', null=True, blank=True, verbose_name="Staff Photo")
     aadhar_card = models.ImageField(upload_to='staff_aadhar/', null=True, blank=True, verbose_name="Aadhar Card Photo")
     # ----------------------
+
+    objects = StaffQuerySet.as_manager()
     
     def __str__(self):
         return f"{self.name} ({self.role}) - {self.canteen.name if self.canteen else 'Unassigned'}"
@@ -81,6 +112,15 @@ class Staff(models.Model):
 
 
 
+class StaffLeaveQuerySet(models.QuerySet):
+
+    def for_report(self):
+        # Leave history: staff ka naam/role JOIN se
+        return self.select_related('staff').only(
+            'start_date', 'end_date', 'reason', 'is_paid_leave', 'staff__name', 'staff__role',
+        )
+
+
 class StaffLeave(models.Model):
     staff = models.ForeignKey(
         Staff, 
@@ -95,6 +135,8 @@ class StaffLeave(models.Model):
     reason = models.TextField(null=True, blank=True, verbose_name="Reason for Leave")
     is_paid_leave = models.BooleanField(default=False, verbose_name="Paid Leave (Don't Cut Salary)")
 
+    objects = StaffLeaveQuerySet.as_manager()
+
     def total_days(self):
         """Calculates the total number of days in the leave period (inclusive)"""
         if self.start_date and self.end_date:
@@ -112,6 +154,10 @@ class StaffLeave(models.Model):
     class Meta:
         verbose_name = "Staff Leave (Period)"
         verbose_name_plural = "Staff Leaves (Periods)"
+        indexes = [
+            # Ledger/Payroll: staff ki leaves jo [start, end] se overlap karein (covering - table tak jaana nahi padta)
+            models.Index(fields=['staff', 'start_date', 'end_date', 'is_paid_leave'], name='leave_staff_dates_idx'),
+        ]
 
 
 # management/models.py (StaffLeave class के नीचे)
@@ -168,6 +214,12 @@ class Expense(models.Model):
         verbose_name = "Expense Entry"
         verbose_name_plural = "Expenses"
         ordering = ['-date']
+        indexes = [
+            # Canteen reports/Excel: canteen + date range
+            models.Index(fields=['canteen', 'date'], name='expense_canteen_date_idx'),
+            # Dashboard/CSV export: sirf date range (category-wise total)
+            models.Index(fields=['date', 'category'], name='expense_date_category_idx'),
+        ]
 # management/models.py (Expense class के नीचे)
 
 class SalaryPayment(models.Model):
@@ -197,10 +249,26 @@ class SalaryPayment(models.Model):
         verbose_name = "Salary/Advance Payment"
         verbose_name_plural = "Salary Payments" 
         ordering = ['-date']
+        indexes = [
+            # Ledger/Payroll: staff ke payments date order me, type-wise total
+            models.Index(fields=['staff', 'date', 'payment_type'], name='salary_staff_date_type_idx'),
+        ]
 
 
 # management/models.py (SalaryPayment class के नीचे)
 
+class DailyEntryQuerySet(models.QuerySet):
+    REPORT_FIELDS = (
+        'date', 'tea_qty', 'nasta_qty', 'lunch_qty', 'dinner_qty',
+        'normal_token_qty', 'special_token_qty', 'guest_token_qty',
+        'cash_received', 'online_received', 'canteen__name',
+    )
+
+    def for_report(self):
+        # Report tables: canteen ka naam JOIN se, sirf dikhne wale columns
+        return self.select_related('canteen').only(*self.REPORT_FIELDS)
+
+
 class DailyEntry(models.Model):
     # 1. Foreign Key
     canteen = models.ForeignKey(
@@ -242,6 +310,8 @@ class DailyEntry(models.Model):
     verbose_name="Online Payment Received"
     )
 
+    objects = DailyEntryQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.canteen.name} - Entry on {self.date}"
 
@@ -268,7 +338,155 @@ class Payroll(models.Model):
     
     generated_on = models.DateField(auto_now_add=True)
 
+    # Snapshot kab bana, aur kya tab se leave/payment badla hai (signals set karte hain)
+    computed_at = models.DateTimeField(null=True, blank=True)
+    is_stale = models.BooleanField(default=False)
+
     def __str__(self):
         return f"Payslip: {self.staff.name} - {self.month.strftime('%B %Y')}"
 
+    # Template (payroll_dashboard.html) ke purane naam
+    @property
+    def per_day(self):
+        if not self.total_days:
+            return 0
+        return round(self.base_salary / self.total_days, 2)
+
+    @property
+    def deduction(self):
+        return self.deduction_amount
+
+    @property
+    def present_days(self):
+        return self.working_days
+
+    class Meta:
+        unique_together = ('staff', 'month') # Ek staff ka ek mahine me ek hi payslip
+        ordering = ['month', 'staff__name']
+
+
+
+
+# ==========================================
+# Monthly Summary (Pre-aggregated Report Table)
+# ==========================================
+# Har canteen ke har mahine ka ek row. Signals (management/signals.py) isse
+# DailyEntry / Expense / SalaryPayment ke save/delete par update rakhte hain.
+# Poora table dobara banana ho to: python manage.py rebuild_monthly_summary
+
+class MonthlyCanteenSummary(models.Model):
+    # canteen NULL = "General" kharche (bina canteen wale Expense / Staff)
+    canteen = models.ForeignKey(
+        Canteen,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name="Canteen"
+    )
+    month = models.DateField(verbose_name="Month") # Hamesha 1st tarikh (e.g. 1st Dec 2025)
+
+    # Meals (DailyEntry wale hi naam)
+    tea_qty = models.IntegerField(default=0, verbose_name="Tea Qty")
+    nasta_qty = models.IntegerField(default=0, verbose_name="Nasta Qty")
+    lunch_qty = models.IntegerField(default=0, verbose_name="Lunch Qty")
+    dinner_qty = models.IntegerField(default=0, verbose_name="Dinner Qty")
+    normal_token_qty = models.IntegerField(default=0, verbose_name="Normal Token Qty")
+    special_token_qty = models.IntegerField(default=0, verbose_name="Special Token Qty")
+    guest_token_qty = models.IntegerField(default=0, verbose_name="Guest Token Qty")
+
+    # Income
+    cash_received = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Cash Income")
+    online_received = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Online Income")
+
+    # Outflow
+    expense_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Total Expense")
+    salary_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Total Salary Paid")
+    # {"Kirana": "1200.00", ...} aur {"Cash": "500.00", "Pending": ...}
+    expense_by_category = models.JSONField(default=dict, verbose_name="Expense by Category")
+    expense_by_mode = models.JSONField(default=dict, verbose_name="Expense by Payment Mode")
+
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        name = self.canteen.name if self.canteen else 'General'
+        return f"{name} - {self.month.strftime('%B %Y')}"
+
+    class Meta:
+        verbose_name = "Monthly Canteen Summary"
+        verbose_name_plural = "Monthly Canteen Summaries"
+        unique_together = ('canteen', 'month')
+        constraints = [
+            # unique_together NULL canteen (General) par kaam nahi karta - NULL != NULL
+            models.UniqueConstraint(
+                fields=['month'], condition=models.Q(canteen__isnull=True), name='unique_general_summary_month',
+            ),
+        ]
+        ordering = ['month']
+
+
+# ==========================================
+# Staff Ledger Checkpoints (Passbook ka closing balance)
+# ==========================================
+# Har band (closed) mahine ke end ka balance. Ledger isse shuru karke sirf
+# aage ke mahine calculate karta hai. Payment/Leave badalne par us mahine aur
+# uske baad ke checkpoints delete ho jaate hain (management/signals.py).
+
+class StaffLedgerCheckpoint(models.Model):
+    staff = models.ForeignKey(Staff, on_delete=models.CASCADE, verbose_name="Staff Member")
+    month = models.DateField(verbose_name="Month") # 1st tarikh
+    closing_balance = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Closing Balance")
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.staff.name} - {self.month.strftime('%B %Y')}: {self.closing_balance}"
+
+    class Meta:
+        verbose_name = "Staff Ledger Checkpoint"
+        verbose_name_plural = "Staff Ledger Checkpoints"
+        unique_together = ('staff', 'month')
+        ordering = ['month']
+
+
+# ==========================================
+# Background Export Jobs (run_export_worker command chalata hai)
+# ==========================================
+# Bada Excel/CSV export request ke andar nahi banta - job PENDING me save hota
+# hai, worker process file MEDIA_ROOT/exports/ me likhta hai. Same filters
+# wala export dobara maanga to purani file hi mil jaati hai (cache_key).
+
+class ExportJob(models.Model):
+    KIND_CHOICES = [
+        ('CANTEEN_EXCEL', 'Canteen Excel Report'),
+        ('EXPENSE_CSV', 'Expense CSV'),
+        ('CONSOLIDATED_EXCEL', 'All Canteens Excel (Consolidated)'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Export Type")
+    # {"canteen_id": 1, "start_date": "2025-01-01", "end_date": "2025-12-31", ...}
+    params = models.JSONField(default=dict, verbose_name="Filters")
+    cache_key = models.CharField(max_length=64, db_index=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    progress = models.PositiveSmallIntegerField(default=0) # 0-100 %
+    file = models.FileField(upload_to='exports/', blank=True, verbose_name="Export File")
+    filename = models.CharField(max_length=200, blank=True) # Download ke waqt ka naam
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
 
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+
+    class Meta:
+        verbose_name = "Export Job"
+        verbose_name_plural = "Export Jobs"
+        ordering = ['-created_at']
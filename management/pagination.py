@@ -0,0 +1,101 @@
+# management/pagination.py
+
+# ==========================================
+# Keyset Pagination (lambi report tables)
+# ==========================================
+# OFFSET wale page me DB ko pichhle saare rows skip karne padte hain. Yahan
+# "aakhri dikhaye row ke baad wale" rows maangte hain:
+#     WHERE (date, id) < (last_date, last_id) ORDER BY date DESC, id DESC LIMIT n+1
+# Har page ek hi chhoti query hai, range kitni bhi lambi ho.
+#
+# Cursor URL me jaata hai: "2025-03-04_812" (date, id) ya sirf "2025-03-04"
+# jab ek date par ek hi row ho (jaise din-wise expense totals). Galat cursor
+# par 404.
+
+from dataclasses import dataclass
+from datetime import date
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+
+
+# SQLite/PostgreSQL bigint ki hadd
+MAX_ID = 2 ** 63
+
+
+@dataclass
+class KeysetPage:
+    rows: list
+    next_cursor: str = None
+    next_url: str = None # view set karta hai (next_page_url)
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+
+def page_size():
+    return getattr(settings, 'REPORT_PAGE_SIZE', 50)
+
+
+def _value(row, field):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+def encode_cursor(row, fields):
+    return '_'.join(str(_value(row, field)) for field in fields)
+
+
+def decode_cursor(cursor, fields):
+    """
+    Pehla field date, baaki integers. Cursor na ho to None (pehla page).
+    Galat cursor par 404 - pehla page dobara dena "Load more" me rows
+    duplicate kar deta, aur bahut bada number DB driver par 500.
+    """
+    if not cursor:
+        return None
+    parts = cursor.split('_')
+    try:
+        values = [date.fromisoformat(parts[0])] + [int(part) for part in parts[1:]]
+    except ValueError:
+        values = None
+    if values is None or len(values) != len(fields) or not all(0 <= n < MAX_ID for n in values[1:]):
+        raise Http404("Galat cursor")
+    return values
+
+
+def _after(fields, values):
+    # (a, b) < (x, y)  =>  a < x OR (a = x AND b < y)
+    condition = Q()
+    for n, field in enumerate(fields):
+        equal = {f: v for f, v in zip(fields[:n], values[:n])}
+        condition |= Q(**equal, **{f'{field}__lt': values[n]})
+    return condition
+
+
+def keyset_page(queryset, fields, cursor=None, size=None):
+    """
+    queryset ko fields ke ulte order (naye pehle) me ek page. fields ka
+    combination unique hona chahiye, jaise ('date', 'id').
+    """
+    size = size or page_size()
+    values = decode_cursor(cursor, fields)
+    if values is not None:
+        queryset = queryset.filter(_after(fields, values))
+
+    rows = list(queryset.order_by(*[f'-{field}' for field in fields])[:size + 1])
+    if len(rows) <= size:
+        return KeysetPage(rows)
+    rows = rows[:size]
+    return KeysetPage(rows, encode_cursor(rows[-1], fields))
+
+
+def next_page_url(base_url, params, page):
+    """'Load more' button ka URL - filters wahi, bas naya cursor."""
+    if not page.has_more:
+        return None
+    query = {key: value for key, value in params.items() if value not in (None, '')}
+    query['cursor'] = page.next_cursor
+    return f"{base_url}?{urlencode(query)}"
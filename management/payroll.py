@@ -0,0 +1,178 @@
+# management/payroll.py
+
+# ==========================================
+# Payroll Computation (Saare staff ek saath)
+# ==========================================
+# Pehle har staff ke liye 3 alag queries chalti thi (advance, is mahine ka
+# payment, leaves). Ab poore mahine ka data 3 queries me aata hai:
+#   1. Staff (canteen ke saath, Staff.objects.for_list())
+#   2. SalaryPayment - staff-wise conditional SUM
+#   3. StaffLeave    - mahine se overlap karne wali leaves (LeaveIndex)
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .leaves import LeaveIndex
+from .models import Payroll, SalaryPayment, Staff
+from .reports import month_range
+
+
+@dataclass
+class StaffPayroll:
+    staff: Staff
+    month_start: object
+    total_advance_paid: Decimal = Decimal('0')
+    paid_this_month: Decimal = Decimal('0')
+    paid_leave_days: int = 0
+    unpaid_leave_days: int = 0
+
+    @property
+    def canteen_name(self):
+        return self.staff.canteen.name if self.staff.canteen else 'N/A'
+
+    @property
+    def monthly_salary(self):
+        return self.staff.monthly_salary
+
+    @property
+    def leaves_this_month(self):
+        return self.paid_leave_days + self.unpaid_leave_days
+
+
+def payroll_for_month(month_date, staff_members=None):
+    """
+    Mahine ka payroll data saare staff ke liye, staff order ke hisaab se list.
+    staff_members na diya ho to saare staff (canteen, name order me).
+    """
+    first_day, last_day = month_range(month_date)
+
+    if staff_members is None:
+        staff_members = Staff.objects.all().order_by('canteen__name', 'name')
+    # Payment/Leave queries me staff ko subquery ki tarah use karte hain
+    staff_ids = staff_members.values('pk')
+    staff_members = list(staff_members.for_list())
+
+    # 1. Payments: lifetime advance + is mahine ka total, ek hi GROUP BY me
+    payments = {
+        row['staff']: row
+        for row in SalaryPayment.objects.filter(staff__in=staff_ids).values('staff').annotate(
+            total_advance=Sum('amount', filter=Q(payment_type='Advance')),
+            paid_this_month=Sum('amount', filter=Q(date__range=[first_day, last_day])),
+        ).order_by()
+    }
+
+    # 2. Leaves: mahine se overlap karne wali saari leaves ek query me
+    leaves = LeaveIndex.for_staff(staff_ids, first_day, last_day)
+
+    results = []
+    for staff in staff_members:
+        item = StaffPayroll(staff=staff, month_start=first_day)
+
+        payment = payments.get(staff.pk)
+        if payment:
+            item.total_advance_paid = payment['total_advance'] or Decimal('0')
+            item.paid_this_month = payment['paid_this_month'] or Decimal('0')
+
+        item.paid_leave_days, item.unpaid_leave_days = leaves[staff.pk].leave_days(first_day, last_day)
+
+        results.append(item)
+    return results
+
+
+# ==========================================
+# Payroll Run (Payroll table me frozen snapshot)
+# ==========================================
+# Har mahine ka payslip Payroll table me save hota hai. Dobara kholne par
+# sirf wahi staff recompute hote hain:
+#   - jinka payslip abhi bana hi nahi
+#   - jinke leave/payment badle (signals `is_stale=True` kar dete hain)
+#   - jinki monthly_salary snapshot ke base_salary se alag hai
+
+PAYROLL_FIELDS = [
+    'total_days', 'working_days', 'paid_leaves', 'unpaid_leaves',
+    'base_salary', 'deduction_amount', 'net_salary', 'computed_at', 'is_stale',
+]
+
+
+def _needs_recompute(staff, payslip):
+    return payslip is None or payslip.is_stale or payslip.base_salary != staff.monthly_salary
+
+
+def run_payroll(month_date, staff_members=None):
+    """
+    Mahine ka payroll (Payroll objects ki list, staff order me).
+    Jo payslips up-to-date hain wo seedhe table se aate hain.
+    """
+    first_day, last_day = month_range(month_date)
+    num_days = last_day.day
+
+    if staff_members is None:
+        staff_members = Staff.objects.all()
+    staff_ids = staff_members.values('pk')
+    staff_members = list(staff_members)
+
+    existing = {
+        payslip.staff_id: payslip
+        for payslip in Payroll.objects.filter(month=first_day, staff__in=staff_ids)
+    }
+    stale_staff = [s for s in staff_members if _needs_recompute(s, existing.get(s.pk))]
+
+    if stale_staff:
+        # Mahine se overlap karne wali leaves (paid/unpaid alag), ek query me
+        leaves = LeaveIndex.for_staff([s.pk for s in stale_staff], first_day, last_day)
+        now = timezone.now()
+        to_create, to_update = [], []
+
+        for staff in stale_staff:
+            paid_leaves, unpaid_leaves = leaves[staff.pk].leave_days(first_day, last_day)
+            # Per Day Salary = Monthly / Total Days (e.g. 15000 / 30 = 500)
+            per_day_salary = staff.monthly_salary / num_days
+            deduction = unpaid_leaves * per_day_salary
+
+            payslip = existing.get(staff.pk) or Payroll(staff=staff, month=first_day)
+            payslip.total_days = num_days
+            # Paid leave ko hum working day hi mante hain salary ke hisab se
+            payslip.working_days = num_days - unpaid_leaves
+            payslip.paid_leaves = paid_leaves
+            payslip.unpaid_leaves = unpaid_leaves
+            payslip.base_salary = staff.monthly_salary
+            payslip.deduction_amount = round(deduction, 2)
+            payslip.net_salary = round(staff.monthly_salary - deduction, 2)
+            payslip.computed_at = now
+            payslip.is_stale = False
+
+            if payslip.pk:
+                to_update.append(payslip)
+            else:
+                to_create.append(payslip)
+            existing[staff.pk] = payslip
+
+        with transaction.atomic():
+            # Page GET par bhi chalta hai - do request ek saath ek hi mahina bana
+            # sakti hain. Dusri ne payslip pehle daal diya ho to IntegrityError ki
+            # jagah wahi row update (dono ka hisaab same data se, same result).
+            Payroll.objects.bulk_create(
+                to_create, batch_size=500,
+                update_conflicts=True, unique_fields=['staff', 'month'], update_fields=PAYROLL_FIELDS,
+            )
+            Payroll.objects.bulk_update(to_update, PAYROLL_FIELDS, batch_size=500)
+
+    results = []
+    for staff in staff_members:
+        payslip = existing[staff.pk]
+        payslip.staff = staff # Template me p.staff.name ke liye dobara query na ho
+        results.append(payslip)
+    return results
+
+
+def mark_payroll_stale(staff_id, start_date, end_date):
+    """[start, end] se overlap karne wale mahino ke payslips ko stale mark karta hai."""
+    Payroll.objects.filter(
+        staff_id=staff_id,
+        month__gte=start_date.replace(day=1),
+        month__lte=end_date,
+    ).update(is_stale=True)
@@ -0,0 +1,218 @@
+# management/perf.py
+
+# ==========================================
+# Query / Latency Instrumentation
+# ==========================================
+# Har request ke liye: kitni SQL queries, unka total time, view ka time aur
+# response size. Data 'management.perf' logger se rotating log file me JSON
+# lines ki tarah jaata hai (settings.LOGGING), aur /management/_perf/ page
+# usi file se view-wise percentiles dikhata hai.
+#
+# Query budget: settings.PERF_QUERY_BUDGETS = {'payroll_summary': 5, ...}
+# (url name -> max queries). Budget se zyada hua to production me warning,
+# tests me QueryBudgetExceeded (PerfBudgetTestRunner strict mode on karta hai).
+
+import json
+import logging
+import os
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.test.runner import DiscoverRunner
+from django.utils import timezone
+
+
+perf_logger = logging.getLogger('management.perf')
+budget_logger = logging.getLogger('management.budget')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    """connection.execute_wrapper - har query ginta hai aur uska time jodta hai."""
+
+    def __init__(self):
+        self.count = 0
+        self.sql_time = 0.0 # seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.sql_time += time.perf_counter() - start
+
+    @contextmanager
+    def active(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+
+@contextmanager
+def track_queries(budget=None, label="block"):
+    """
+    Code ke kisi bhi hisse ki queries ginne ke liye:
+
+        with track_queries(budget=3) as stats:
+            payroll_for_month(today)
+        stats.count, stats.sql_time
+    """
+    stats = QueryStats()
+    with stats.active():
+        yield stats
+    if budget is not None:
+        check_budget(label, stats.count, budget)
+
+
+def query_budget(view_name):
+    return getattr(settings, 'PERF_QUERY_BUDGETS', {}).get(view_name)
+
+
+def check_budget(name, count, budget):
+    if budget is None or count <= budget:
+        return
+    message = f"Query budget exceeded for {name}: {count} queries (budget {budget})"
+    if getattr(settings, 'PERF_BUDGET_STRICT', False):
+        raise QueryBudgetExceeded(message)
+    budget_logger.warning(message)
+
+
+def _record(view_name, request, status, stats, view_time, size):
+    perf_logger.info(json.dumps({
+        'ts': timezone.now().isoformat(timespec='seconds'),
+        'view': view_name,
+        'method': request.method,
+        'path': request.path,
+        'status': status,
+        'queries': stats.count,
+        'sql_ms': round(stats.sql_time * 1000, 2),
+        'view_ms': round(view_time * 1000, 2),
+        'bytes': size,
+    }))
+    check_budget(view_name, stats.count, query_budget(view_name))
+
+
+class QueryPerfMiddleware:
+    """
+    management app ke views ko measure karta hai. Session/auth ki queries bhi
+    ginti me aati hain (wo bhi request ka hi kharcha hain).
+    StreamingHttpResponse (CSV export) ki queries stream khatam hone par gini jaati hain.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        start = time.perf_counter()
+        with stats.active():
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None or not match.func.__module__.startswith('management.'):
+            return response
+        view_name = match.url_name or match.view_name
+
+        if response.streaming and not hasattr(response, 'file_to_stream'):
+            response.streaming_content = self._measure_stream(
+                response.streaming_content, view_name, request, response.status_code, stats, start
+            )
+        else:
+            if response.streaming:
+                size = int(response.get('Content-Length') or 0) or None # FileResponse
+            else:
+                size = len(response.content)
+            _record(view_name, request, response.status_code, stats, time.perf_counter() - start, size)
+        return response
+
+    def _measure_stream(self, content, view_name, request, status, stats, start):
+        size = 0
+        with stats.active():
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        _record(view_name, request, status, stats, time.perf_counter() - start, size)
+
+
+# ------------------------------------------
+# /management/_perf/ ke liye log padhna
+# ------------------------------------------
+
+def percentile(values, pct):
+    """Nearest-rank percentile (values sorted honi chahiye)."""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * pct // 100)) # ceil
+    return values[int(rank) - 1]
+
+
+def _log_files():
+    path = getattr(settings, 'PERF_LOG_FILE', None)
+    if not path:
+        return []
+    # Rotated files (.N ... .1) pehle, taaki purane se naye order me padhe
+    backups = [f"{path}.{n}" for n in range(getattr(settings, 'PERF_LOG_BACKUPS', 0), 0, -1)]
+    return [p for p in backups + [str(path)] if os.path.exists(p)]
+
+
+def read_perf_log():
+    for path in _log_files():
+        with open(path, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def view_percentiles(records):
+    """Har view ke liye count, p50/p95/p99 (time, queries) aur budget."""
+    grouped = {}
+    for record in records:
+        grouped.setdefault(record['view'], []).append(record)
+
+    rows = []
+    for view_name, items in grouped.items():
+        view_ms = sorted(r['view_ms'] for r in items)
+        sql_ms = sorted(r['sql_ms'] for r in items)
+        queries = sorted(r['queries'] for r in items)
+        budget = query_budget(view_name)
+        rows.append({
+            'view': view_name,
+            'requests': len(items),
+            'p50_ms': percentile(view_ms, 50),
+            'p95_ms': percentile(view_ms, 95),
+            'p99_ms': percentile(view_ms, 99),
+            'p95_sql_ms': percentile(sql_ms, 95),
+            'p50_queries': percentile(queries, 50),
+            'max_queries': queries[-1],
+            'budget': budget,
+            'over_budget': budget is not None and queries[-1] > budget,
+        })
+    rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+    return rows
+
+
+# ------------------------------------------
+# Test runner: budgets strict + perf log file me test requests nahi
+# ------------------------------------------
+
+class PerfBudgetTestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._perf_handlers = perf_logger.handlers
+        perf_logger.handlers = [logging.NullHandler()]
+        settings.PERF_BUDGET_STRICT = True
+
+    def teardown_test_environment(self, **kwargs):
+        perf_logger.handlers = self._perf_handlers
+        settings.PERF_BUDGET_STRICT = False
+        super().teardown_test_environment(**kwargs)
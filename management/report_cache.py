@@ -0,0 +1,148 @@
+# management/report_cache.py
+
+# ==========================================
+# Report Cache (canteen_summary_report, consumption_report)
+# ==========================================
+# Report ka rendered HTML (sirf page ka content hissa - usme user/csrf kuch
+# nahi) Django cache framework me rakhte hain, settings.CACHES['reports'].
+#
+# Invalidation "version counters" se (alag cache, CACHES['report_versions'] -
+# HTML ke cull me counters na udein): har (canteen, month) ka ek counter, aur
+# har canteen ka ek generation counter. Report ki cache key me range ke saare
+# mahino ke counters hote hain. Signals (management/signals.py) sirf badle hue
+# (canteen, month) ka counter badhate hain - baaki mahino/canteens ki reports
+# cache me bani rehti hain. Band mahine ki report seedha cache se aati hai.
+#
+# Yahi counters browser ke conditional GET (ETag / 304) me bhi lagte hain -
+# report_etag(), canteens_version().
+#
+# Dhyan dein: bulk_create / queryset.update() signals nahi bhejte - aise code
+# ko khud invalidate_reports() bulana hoga.
+
+import hashlib
+import time
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.shortcuts import render
+from django.template.loader import render_to_string
+
+
+# "Sab canteens" wali reports (consumption_report bina filter) ka namespace
+ALL_CANTEENS = '*'
+
+
+def report_cache():
+    return caches[getattr(settings, 'REPORT_CACHE_ALIAS', 'reports')]
+
+
+def version_cache():
+    return caches[getattr(settings, 'REPORT_VERSION_CACHE_ALIAS', 'report_versions')]
+
+
+def _months(start_date, end_date):
+    month = start_date.replace(day=1)
+    while month <= end_date:
+        yield month
+        month += relativedelta(months=1)
+
+
+def _generation_key(canteen_id):
+    return f"report-gen:{canteen_id}"
+
+
+def _month_key(canteen_id, month):
+    return f"report-ver:{canteen_id}:{month:%Y-%m}"
+
+
+def _new_version():
+    # Counter cache se nikal gaya (restart) to 0 se shuru na ho, warna
+    # purani key dobara match ho sakti hai
+    return time.time_ns()
+
+
+def _bump(cache, keys):
+    # incr() nahi: file cache me wo get + set hai, do processes ek saath
+    # badhayein to dono same number likhte hain. Naya time_ns har baar alag.
+    cache.set_many({key: _new_version() for key in keys}, None)
+
+
+def _versions(cache, keys):
+    found = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def report_version(canteen_id, start_date, end_date):
+    """Range ke saare (canteen, month) counters ka hash - data badla to ye badlega."""
+    canteen_id = ALL_CANTEENS if canteen_id is None else canteen_id
+    keys = [_generation_key(canteen_id)]
+    keys += [_month_key(canteen_id, month) for month in _months(start_date, end_date)]
+    versions = _versions(version_cache(), keys)
+    return hashlib.md5(':'.join(map(str, versions)).encode()).hexdigest()
+
+
+def canteens_version():
+    """Canteen list (naam, billing type) ka counter - koi canteen bani/badli/hati to badlega."""
+    return _versions(version_cache(), [_generation_key(ALL_CANTEENS)])[0]
+
+
+def report_etag(request, view_name, canteen_id, start_date, end_date, extra=()):
+    """
+    Conditional GET (If-None-Match) ka ETag - wahi counters jo cache key me,
+    to data na badla ho to 304, koi aggregate query nahi. Page me user ka
+    nav/naam hai, isliye user bhi ETag me.
+    """
+    version = report_version(canteen_id, start_date, end_date)
+    parts = [view_name, request.user.pk, canteen_id, start_date, end_date, *extra, version]
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def invalidate_reports(canteen_id, start_date, end_date=None):
+    """Ek canteen (None = General) ke in mahino ki reports purani kar do."""
+    months = list(_months(start_date, end_date or start_date))
+    keys = [_month_key(canteen_id, month) for month in months]
+    keys += [_month_key(ALL_CANTEENS, month) for month in months]
+    _bump(version_cache(), keys)
+
+
+def invalidate_canteen_reports(canteen_id):
+    """Canteen khud badli (naam, billing type) ya delete hui - uski saari reports."""
+    _bump(version_cache(), [_generation_key(canteen_id), _generation_key(ALL_CANTEENS)])
+
+
+# Page template me report ki jagah (base.html, nav waghaira har request par bante hain)
+REPORT_PLACEHOLDER = '<!-- report-body -->'
+
+
+def report_html(view_name, template_name, canteen_id, start_date, end_date, build_context, extra=()):
+    """Report (ya uske rows fragment) ka HTML bytes - cache se, ya bana ke."""
+    cache = report_cache()
+    version = report_version(canteen_id, start_date, end_date)
+    key = ':'.join(map(str, ['report', view_name, canteen_id, start_date, end_date, *extra, version]))
+
+    html = cache.get(key)
+    if html is None:
+        # request ke bina render - cached HTML me kisi user ka data na jaaye.
+        # UTF-8 bytes me rakhte hain: saal bhar ki report MBs ki hoti hai, aur
+        # str ko pickle se nikalna (decode) bytes se kai guna dheema hai.
+        html = render_to_string(template_name, build_context()).encode()
+        cache.set(key, html, getattr(settings, 'REPORT_CACHE_TIMEOUT', 60 * 60 * 24))
+    return html
+
+
+def cached_report(request, page_template, context, view_name, template_name,
+                  canteen_id, start_date, end_date, build_context, extra=()):
+    """
+    Report page: report ka HTML cache se (ya build_context() se bana ke),
+    baaki page har baar. canteen_id=None ka matlab sab canteens.
+    extra: key me aur filters (jaise page).
+    """
+    html = report_html(view_name, template_name, canteen_id, start_date, end_date, build_context, extra)
+    response = render(request, page_template, {**context, 'report_html': REPORT_PLACEHOLDER})
+    response.content = response.content.replace(REPORT_PLACEHOLDER.encode(), html, 1)
+    return response
@@ -0,0 +1,467 @@
+# management/reports.py
+
+# ==========================================
+# Financial Rollup (Dashboard, Reports, Excel)
+# ==========================================
+# Pehle har page 5-7 alag aggregate queries chalata tha. Yahan sab kuch
+# 2-3 queries me nikal lete hain:
+#   1. Poore mahine: MonthlyCanteenSummary rows (management/summary.py)
+#   2. Adhure din: DailyEntry ka ek aggregate (cash, online, saare meal counts)
+#   3. Ek UNION ALL query: adhure din ke expense category-wise + salary + counts
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import CharField, Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Cast, TruncMonth
+
+from .models import Canteen, DailyEntry, Expense, MonthlyCanteenSummary, SalaryPayment, Staff
+
+
+CONSUMPTION_FIELDS = {
+    'total_tea': 'tea_qty',
+    'total_nasta': 'nasta_qty',
+    'total_lunch': 'lunch_qty',
+    'total_dinner': 'dinner_qty',
+    'total_normal': 'normal_token_qty',
+    'total_special': 'special_token_qty',
+    'total_guest': 'guest_token_qty',
+}
+
+
+@dataclass
+class FinancialRollup:
+    start_date: date
+    end_date: date
+    canteen: Canteen = None
+
+    total_cash: Decimal = Decimal('0')
+    total_online: Decimal = Decimal('0')
+    expense_total: Decimal = Decimal('0')
+    salary_total: Decimal = Decimal('0')
+
+    # [(category, amount), ...] bade amount pehle
+    categories: list = field(default_factory=list)
+    # Template ke purane keys: total_tea, total_lunch, ..., total_cash, total_online
+    consumption: dict = field(default_factory=dict)
+
+    total_canteens: int = 0
+    total_staff: int = 0
+
+    @property
+    def total_income(self):
+        return self.total_cash + self.total_online
+
+    @property
+    def total_outflow(self):
+        # Dashboard ke liye: Expense + Staff Salary
+        return self.expense_total + self.salary_total
+
+    @property
+    def net_profit(self):
+        return self.total_income - self.total_outflow
+
+    @property
+    def canteen_profit(self):
+        # Canteen reports salary ko expense me nahi ginte
+        return self.total_income - self.expense_total
+
+    def pie_chart(self):
+        labels = [category for category, _ in self.categories]
+        data = [float(amount) for _, amount in self.categories]
+        if self.salary_total > 0:
+            labels.append('Staff Salary')
+            data.append(float(self.salary_total))
+        return labels, data
+
+
+def month_range(month_date):
+    """Kisi bhi date ke mahine ki (1st, last) date return karta hai."""
+    first_day = month_date.replace(day=1)
+    last_day = first_day + relativedelta(months=1) - timedelta(days=1)
+    return first_day, last_day
+
+
+class MonthStart(TruncMonth):
+    """
+    Mahine ki pehli date, GROUP BY ke liye. PostgreSQL par TruncMonth hi hai
+    (date_trunc('month', ...)). SQLite par TruncMonth har row ke liye Django
+    ka Python function (django_date_trunc) chalata hai - yahan SQLite ka
+    built-in date(..., 'start of month').
+    """
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return f"date({sql}, 'start of month')", params
+
+
+def split_range(start_date, end_date):
+    """
+    [start, end] ko do hisso me todta hai:
+      - poore mahine (first_month, last_month) jo summary table se padhe ja sakte hain
+      - bache hue adhure din [(a, b), ...] jo raw tables se aayenge
+    """
+    first_full = start_date
+    if start_date.day != 1:
+        first_full = month_range(start_date)[1] + timedelta(days=1)
+
+    last_full = end_date
+    if end_date != month_range(end_date)[1]:
+        last_full = end_date.replace(day=1) - timedelta(days=1)
+
+    if first_full > last_full:
+        return None, [(start_date, end_date)]
+
+    raw_ranges = []
+    if start_date < first_full:
+        raw_ranges.append((start_date, first_full - timedelta(days=1)))
+    if last_full < end_date:
+        raw_ranges.append((last_full + timedelta(days=1), end_date))
+    return (first_full, last_full.replace(day=1)), raw_ranges
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    return value
+
+
+def _date_filter(ranges):
+    # Adhure hisso ke liye ek hi OR filter, taaki alag-alag query na chale
+    condition = Q()
+    for start_date, end_date in ranges:
+        condition |= Q(date__range=[start_date, end_date])
+    return condition
+
+
+def _consumption_aggregates():
+    # DailyEntry aur MonthlyCanteenSummary dono me column ke naam same hain
+    aggregates = {key: Sum(column) for key, column in CONSUMPTION_FIELDS.items()}
+    aggregates['total_cash'] = Sum('cash_received')
+    aggregates['total_online'] = Sum('online_received')
+    return aggregates
+
+
+def _merge_totals(totals, other):
+    for key, value in other.items():
+        if value is not None:
+            totals[key] = (totals[key] or 0) + value
+
+
+def _summary_rows(months, canteen=None):
+    rows = MonthlyCanteenSummary.objects.filter(month__range=list(months))
+    if canteen is not None:
+        rows = rows.filter(canteen=canteen)
+    return rows
+
+
+def _raw_consumption(ranges, canteen=None):
+    entries = DailyEntry.objects.filter(_date_filter(ranges))
+    if canteen is not None:
+        entries = entries.filter(canteen=canteen)
+    return entries.aggregate(**_consumption_aggregates())
+
+
+def consumption_totals(start_date, end_date, canteen=None):
+    """
+    DailyEntry ke saare totals (meals + cash/online).
+    Poore mahine summary table se, baaki din raw DailyEntry se.
+    """
+    full_months, raw_ranges = split_range(_as_date(start_date), _as_date(end_date))
+
+    totals = dict.fromkeys(_consumption_aggregates())
+    if full_months:
+        _merge_totals(totals, _summary_rows(full_months, canteen).aggregate(**_consumption_aggregates()))
+    if raw_ranges:
+        _merge_totals(totals, _raw_consumption(raw_ranges, canteen))
+    return totals
+
+
+def _outflow_rows(raw_ranges, canteen=None):
+    """
+    Ek UNION ALL query jo (kind, key, total) rows deti hai:
+      ('expense', <category>, amount)  -- har category ki ek row
+      ('salary', '', amount)
+      ('canteens', '', count), ('staff', '', count)
+    raw_ranges khali ho to sirf counts aate hain.
+    """
+    blank = Value('', output_field=CharField())
+
+    # UNION me poore column ka type ek hi hota hai (SQLite pehli query se leta
+    # hai) - COUNT aage ho to amounts integer ban ke paise kat jaate. Har
+    # hissa isliye ek hi Decimal type me.
+    def total(aggregate):
+        return Cast(aggregate, output_field=DecimalField(max_digits=14, decimal_places=2))
+
+    canteens = Canteen.objects.all()
+    staff = Staff.objects.all()
+    if canteen is not None:
+        canteens = canteens.filter(pk=getattr(canteen, 'pk', canteen))
+        staff = staff.filter(canteen=canteen)
+
+    parts = [
+        canteens.values_list(
+            Value('canteens', output_field=CharField()), blank
+        ).annotate(total=total(Count('id'))).order_by(),
+        staff.values_list(
+            Value('staff', output_field=CharField()), blank
+        ).annotate(total=total(Count('id'))).order_by(),
+    ]
+
+    if raw_ranges:
+        expenses = Expense.objects.filter(_date_filter(raw_ranges))
+        salaries = SalaryPayment.objects.filter(_date_filter(raw_ranges))
+        if canteen is not None:
+            expenses = expenses.filter(canteen=canteen)
+            salaries = salaries.filter(staff__canteen=canteen)
+        parts += [
+            expenses.values_list(
+                Value('expense', output_field=CharField()), F('category')
+            ).annotate(total=total(Sum('amount'))).order_by(),
+            salaries.values_list(
+                Value('salary', output_field=CharField()), blank
+            ).annotate(total=total(Sum('amount'))).order_by(),
+        ]
+    return parts[0].union(*parts[1:], all=True)
+
+
+def financial_rollup(start_date, end_date, canteen=None):
+    """
+    Date range (aur optional canteen) ka poora hisaab.
+    Poore mahine MonthlyCanteenSummary se (O(months) rows), adhure din raw
+    tables se - kul mila ke 2-3 queries.
+    """
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    rollup = FinancialRollup(start_date=start_date, end_date=end_date, canteen=canteen)
+    full_months, raw_ranges = split_range(start_date, end_date)
+
+    totals = dict.fromkeys(_consumption_aggregates())
+    categories = {}
+
+    # 1. Poore mahine: summary rows Python me jodo
+    if full_months:
+        for summary in _summary_rows(full_months, canteen):
+            _merge_totals(totals, {
+                key: getattr(summary, column) for key, column in CONSUMPTION_FIELDS.items()
+            })
+            _merge_totals(totals, {
+                'total_cash': summary.cash_received,
+                'total_online': summary.online_received,
+            })
+            rollup.salary_total += summary.salary_total
+            for category, amount in summary.expense_by_category.items():
+                categories[category] = categories.get(category, Decimal('0')) + Decimal(amount)
+
+    # 2. Adhure din: raw DailyEntry
+    if raw_ranges:
+        _merge_totals(totals, _raw_consumption(raw_ranges, canteen))
+
+    # 3. Raw expense/salary + counts (ek UNION query)
+    for kind, key, total in _outflow_rows(raw_ranges, canteen):
+        if total is None:
+            continue
+        if kind == 'expense':
+            categories[key] = categories.get(key, Decimal('0')) + total
+        elif kind == 'salary':
+            rollup.salary_total += total
+        elif kind == 'canteens':
+            rollup.total_canteens = int(total)
+        elif kind == 'staff':
+            rollup.total_staff = int(total)
+
+    rollup.consumption = totals
+    rollup.total_cash = totals['total_cash'] or Decimal('0')
+    rollup.total_online = totals['total_online'] or Decimal('0')
+    rollup.categories = sorted(categories.items(), key=lambda item: item[1], reverse=True)
+    rollup.expense_total = sum((amount for _, amount in rollup.categories), Decimal('0'))
+    return rollup
+
+
+def monthly_rollup(month_date, canteen=None):
+    first_day, last_day = month_range(month_date)
+    return financial_rollup(first_day, last_day, canteen)
+
+
+# ==========================================
+# Multi-month Trend (Dashboard chart)
+# ==========================================
+
+def monthly_trend(end_month, months=12, canteen=None):
+    """
+    end_month tak pichhle `months` mahino ki income/expense/salary/profit
+    series. Summary table pehle se mahine-wise hai (MonthStart se bani),
+    isliye poori range ek GROUP BY month query - har mahine ka alag rollup nahi.
+    """
+    last = end_month.replace(day=1)
+    first = last - relativedelta(months=months - 1)
+
+    rows = MonthlyCanteenSummary.objects.filter(month__range=[first, last])
+    if canteen is not None:
+        rows = rows.filter(canteen=canteen)
+    totals = {
+        row['month']: row for row in rows.values('month').annotate(
+            cash=Sum('cash_received'), online=Sum('online_received'),
+            expense=Sum('expense_total'), salary=Sum('salary_total'),
+        ).order_by()
+    }
+
+    trend = []
+    for n in range(months):
+        month = first + relativedelta(months=n)
+        row = totals.get(month, {})
+        income = (row.get('cash') or Decimal('0')) + (row.get('online') or Decimal('0'))
+        expense = row.get('expense') or Decimal('0')
+        salary = row.get('salary') or Decimal('0')
+        trend.append({
+            'month': month,
+            'income': income,
+            'expense': expense,
+            'salary': salary,
+            'profit': income - expense - salary, # dashboard wala net profit
+        })
+    return trend
+
+
+# ==========================================
+# Canteen Comparison (sab canteens side by side)
+# ==========================================
+# Har canteen ka alag financial_rollup (5-7 queries x N canteens) ki jagah
+# har table par ek GROUP BY canteen query - canteens kitni bhi hon, ~6 queries.
+# Poore mahine summary table se, adhure din raw tables se (split_range).
+
+MEAL_FIELDS = list(CONSUMPTION_FIELDS.values())
+EXPENSE_CATEGORIES = [key for key, _ in Expense.CATEGORY_CHOICES]
+
+
+def _meals():
+    # DailyEntry aur summary dono me same columns - tea + nasta + ... + tokens
+    total = F(MEAL_FIELDS[0])
+    for column in MEAL_FIELDS[1:]:
+        total += F(column)
+    return Sum(total)
+
+
+@dataclass
+class CanteenComparisonRow:
+    canteen: Canteen = None # None = TOTAL row
+
+    total_cash: Decimal = Decimal('0')
+    total_online: Decimal = Decimal('0')
+    expense_total: Decimal = Decimal('0')
+    salary_total: Decimal = Decimal('0')
+    meals: int = 0
+
+    categories: dict = field(default_factory=dict) # {category: amount}
+    # [(category, amount, percent), ...] - comparison.categories ke order me
+    mix: list = field(default_factory=list)
+
+    @property
+    def name(self):
+        return self.canteen.name if self.canteen else 'TOTAL'
+
+    @property
+    def total_income(self):
+        return self.total_cash + self.total_online
+
+    @property
+    def profit(self):
+        # canteen_summary_report wala profit (salary ke bina)
+        return self.total_income - self.expense_total
+
+    @property
+    def net_profit(self):
+        return self.profit - self.salary_total
+
+    @property
+    def cost_per_meal(self):
+        if not self.meals:
+            return None
+        return (self.expense_total / self.meals).quantize(Decimal('0.01'))
+
+    def add(self, cash=None, online=None, expense=None, salary=None, meals=None):
+        self.total_cash += cash or 0
+        self.total_online += online or 0
+        self.expense_total += expense or 0
+        self.salary_total += salary or 0
+        self.meals += meals or 0
+
+    def add_category(self, category, amount):
+        self.categories[category] = self.categories.get(category, Decimal('0')) + Decimal(amount)
+
+
+@dataclass
+class CanteenComparison:
+    start_date: date
+    end_date: date
+    rows: list = field(default_factory=list)
+    categories: list = field(default_factory=list) # mix ke columns
+    total: CanteenComparisonRow = field(default_factory=CanteenComparisonRow)
+
+
+def canteen_comparison(start_date, end_date):
+    """
+    Date range me har canteen ki income, expense, salary, profit, meals,
+    cost per meal aur expense mix. General (bina canteen) kharche isme nahi.
+    """
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    rows = {canteen.pk: CanteenComparisonRow(canteen) for canteen in Canteen.objects.order_by('name')}
+    full_months, raw_ranges = split_range(start_date, end_date)
+
+    def row_for(canteen_id):
+        return rows.get(canteen_id) # General (NULL) / beech me bani canteen chhod do
+
+    if full_months:
+        summaries = _summary_rows(full_months).filter(canteen__isnull=False)
+        for total in summaries.values('canteen').annotate(
+            cash=Sum('cash_received'), online=Sum('online_received'),
+            expense=Sum('expense_total'), salary=Sum('salary_total'), meals=_meals(),
+        ).order_by():
+            row = row_for(total.pop('canteen'))
+            if row:
+                row.add(**total)
+        # Category-wise amounts JSON me hain - SQL me jod nahi sakte, mahine ki rows Python me
+        for canteen_id, by_category in summaries.values_list('canteen', 'expense_by_category'):
+            row = row_for(canteen_id)
+            if row:
+                for category, amount in by_category.items():
+                    row.add_category(category, amount)
+
+    if raw_ranges:
+        condition = _date_filter(raw_ranges)
+        for total in DailyEntry.objects.filter(condition).values('canteen').annotate(
+            cash=Sum('cash_received'), online=Sum('online_received'), meals=_meals(),
+        ).order_by():
+            row = row_for(total.pop('canteen'))
+            if row:
+                row.add(**total)
+        for total in Expense.objects.filter(condition, canteen__isnull=False).values(
+            'canteen', 'category'
+        ).annotate(amount=Sum('amount')).order_by():
+            row = row_for(total['canteen'])
+            if row:
+                row.add(expense=total['amount'])
+                row.add_category(total['category'], total['amount'])
+        for total in SalaryPayment.objects.filter(condition, staff__canteen__isnull=False).values(
+            'staff__canteen'
+        ).annotate(amount=Sum('amount')).order_by():
+            row = row_for(total['staff__canteen'])
+            if row:
+                row.add(salary=total['amount'])
+
+    comparison = CanteenComparison(start_date=start_date, end_date=end_date, rows=list(rows.values()))
+    found = {category for row in comparison.rows for category in row.categories}
+    comparison.categories = [c for c in EXPENSE_CATEGORIES if c in found] + sorted(found - set(EXPENSE_CATEGORIES))
+
+    total = comparison.total
+    for row in comparison.rows:
+        total.add(row.total_cash, row.total_online, row.expense_total, row.salary_total, row.meals)
+        for category, amount in row.categories.items():
+            total.add_category(category, amount)
+    for row in comparison.rows + [total]:
+        for category in comparison.categories:
+            amount = row.categories.get(category, Decimal('0'))
+            percent = float(amount * 100 / row.expense_total) if row.expense_total else 0.0
+            row.mix.append((category, amount, percent))
+    return comparison
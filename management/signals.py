@@ -0,0 +1,221 @@
+# management/signals.py
+
+# ==========================================
+# Model signals (apps.py ke ready() me load hote hain)
+# ==========================================
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Canteen, DailyEntry, Expense, SalaryPayment, Staff, StaffLeave
+from .ledger import invalidate_ledger
+from .payroll import mark_payroll_stale
+from .report_cache import invalidate_canteen_reports, invalidate_reports
+from .summary import refresh_canteen_summaries, refresh_summary
+
+
+# ------------------------------------------
+# MonthlyCanteenSummary maintenance
+# ------------------------------------------
+# Har model ke liye: instance kis (canteen, month) bucket me aata hai.
+
+def _summary_key(sender, instance):
+    if sender is SalaryPayment:
+        canteen_id = Staff.objects.filter(pk=instance.staff_id).values_list('canteen_id', flat=True).first()
+    else:
+        canteen_id = instance.canteen_id
+    return (canteen_id, instance.date.replace(day=1))
+
+
+@receiver(pre_save, sender=DailyEntry)
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=SalaryPayment)
+@receiver(pre_save, sender=StaffLeave)
+@receiver(pre_save, sender=Staff)
+def remember_old_instance(sender, instance, **kwargs):
+    # Edit me canteen/staff ya date badal sakti hai, to purana bucket bhi refresh karna padega
+    instance._old_instance = None
+    if instance.pk:
+        instance._old_instance = sender.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=DailyEntry)
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=SalaryPayment)
+def update_summary_on_save(sender, instance, **kwargs):
+    keys = {_summary_key(sender, instance)}
+    old = getattr(instance, '_old_instance', None)
+    if old is not None:
+        keys.add(_summary_key(sender, old))
+    for canteen_id, month in keys:
+        refresh_summary(canteen_id, month)
+
+
+@receiver(post_delete, sender=DailyEntry)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=SalaryPayment)
+def update_summary_on_delete(sender, instance, origin=None, **kwargs):
+    # Canteen/Staff delete hone par cascade wale rows ke liye ek-ek refresh
+    # na karein - unka handler niche poori canteen ek baar me refresh karta hai
+    origin_model = getattr(origin, 'model', type(origin)) # QuerySet.delete() me origin QuerySet hota hai
+    if origin is not None and origin_model is not sender:
+        return
+    refresh_summary(*_summary_key(sender, instance))
+
+
+@receiver(post_delete, sender=Canteen)
+def update_summary_on_canteen_delete(sender, instance, **kwargs):
+    # Canteen ke summary rows CASCADE se chale gaye, lekin uske Expense aur
+    # Staff ab canteen=NULL (General) me aa gaye
+    refresh_canteen_summaries(None)
+
+
+@receiver(post_save, sender=Staff)
+def update_summary_on_staff_transfer(sender, instance, created, **kwargs):
+    # Staff dusri canteen me gaya to uski salary bhi nayi canteen me dikhegi
+    old = getattr(instance, '_old_instance', None)
+    if created or old is None or old.canteen_id == instance.canteen_id:
+        return
+    old_canteen_id = old.canteen_id
+    if not SalaryPayment.objects.filter(staff=instance).exists():
+        return
+    refresh_canteen_summaries(old_canteen_id)
+    refresh_canteen_summaries(instance.canteen_id)
+
+
+@receiver(post_delete, sender=Staff)
+def update_summary_on_staff_delete(sender, instance, **kwargs):
+    refresh_canteen_summaries(instance.canteen_id)
+
+
+# ------------------------------------------
+# Payroll snapshot invalidation
+# ------------------------------------------
+# Leave ya payment badla to us mahine ka payslip dobara banega (run_payroll).
+
+def _payroll_period(sender, instance):
+    if sender is StaffLeave:
+        return (instance.staff_id, instance.start_date, instance.end_date)
+    return (instance.staff_id, instance.date, instance.date)
+
+
+@receiver(post_save, sender=StaffLeave)
+@receiver(post_save, sender=SalaryPayment)
+def mark_payroll_stale_on_save(sender, instance, **kwargs):
+    mark_payroll_stale(*_payroll_period(sender, instance))
+    old = getattr(instance, '_old_instance', None)
+    if old is not None:
+        mark_payroll_stale(*_payroll_period(sender, old))
+
+
+@receiver(post_delete, sender=StaffLeave)
+@receiver(post_delete, sender=SalaryPayment)
+def mark_payroll_stale_on_delete(sender, instance, origin=None, **kwargs):
+    # Staff delete par uske payslips bhi CASCADE se chale jaate hain
+    if isinstance(origin, Staff):
+        return
+    mark_payroll_stale(*_payroll_period(sender, instance))
+
+
+# ------------------------------------------
+# Staff ledger checkpoints
+# ------------------------------------------
+# Payment/Leave badla to us mahine se aage ke closing balance galat ho gaye.
+
+def _ledger_start(sender, instance):
+    if sender is StaffLeave:
+        return instance.start_date
+    return instance.date
+
+
+@receiver(post_save, sender=StaffLeave)
+@receiver(post_save, sender=SalaryPayment)
+def invalidate_ledger_on_save(sender, instance, **kwargs):
+    invalidate_ledger(instance.staff_id, _ledger_start(sender, instance))
+    old = getattr(instance, '_old_instance', None)
+    if old is not None:
+        invalidate_ledger(old.staff_id, _ledger_start(sender, old))
+
+
+@receiver(post_delete, sender=StaffLeave)
+@receiver(post_delete, sender=SalaryPayment)
+def invalidate_ledger_on_delete(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Staff):
+        return
+    invalidate_ledger(instance.staff_id, _ledger_start(sender, instance))
+
+
+@receiver(post_save, sender=Staff)
+def invalidate_ledger_on_salary_change(sender, instance, created, **kwargs):
+    # Salary ya joining date badli to poora ledger dobara banega
+    old = getattr(instance, '_old_instance', None)
+    if created or old is None:
+        return
+    if old.monthly_salary != instance.monthly_salary or old.joining_date != instance.joining_date:
+        invalidate_ledger(instance.pk, None)
+
+
+# ------------------------------------------
+# Report cache (management/report_cache.py)
+# ------------------------------------------
+# Sirf badle hue (canteen, month) ki cached reports purani hoti hain.
+
+def _report_period(sender, instance):
+    if sender in (SalaryPayment, StaffLeave):
+        canteen_id = Staff.objects.filter(pk=instance.staff_id).values_list('canteen_id', flat=True).first()
+    else:
+        canteen_id = instance.canteen_id
+    if sender is StaffLeave:
+        return (canteen_id, instance.start_date, instance.end_date)
+    return (canteen_id, instance.date, instance.date)
+
+
+@receiver(post_save, sender=DailyEntry)
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=SalaryPayment)
+@receiver(post_save, sender=StaffLeave)
+def invalidate_reports_on_save(sender, instance, **kwargs):
+    invalidate_reports(*_report_period(sender, instance))
+    old = getattr(instance, '_old_instance', None)
+    if old is not None:
+        invalidate_reports(*_report_period(sender, old))
+
+
+@receiver(post_delete, sender=DailyEntry)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=SalaryPayment)
+@receiver(post_delete, sender=StaffLeave)
+def invalidate_reports_on_delete(sender, instance, origin=None, **kwargs):
+    # Canteen/Staff delete ka cascade niche wale handlers sambhalte hain
+    origin_model = getattr(origin, 'model', type(origin))
+    if origin is not None and origin_model is not sender:
+        return
+    invalidate_reports(*_report_period(sender, instance))
+
+
+@receiver(post_save, sender=Canteen)
+def invalidate_reports_on_canteen_save(sender, instance, **kwargs):
+    # Naam/billing type report me dikhte hain (aur canteen filter ki list)
+    invalidate_canteen_reports(instance.pk)
+
+
+@receiver(post_delete, sender=Canteen)
+def invalidate_reports_on_canteen_delete(sender, instance, **kwargs):
+    # Uske Expense ab General (NULL) me hain
+    invalidate_canteen_reports(instance.pk)
+    invalidate_canteen_reports(None)
+
+
+@receiver(post_save, sender=Staff)
+def invalidate_reports_on_staff_transfer(sender, instance, created, **kwargs):
+    # Salary ab nayi canteen me gine jaati hai (dashboard trend, ETag bhi)
+    old = getattr(instance, '_old_instance', None)
+    if created or old is None or old.canteen_id == instance.canteen_id:
+        return
+    invalidate_canteen_reports(old.canteen_id)
+    invalidate_canteen_reports(instance.canteen_id)
+
+
+@receiver(post_delete, sender=Staff)
+def invalidate_reports_on_staff_delete(sender, instance, **kwargs):
+    invalidate_canteen_reports(instance.canteen_id)
@@ -0,0 +1,27 @@
+// management/static/js/load_more.js
+
+// Lambi report tables ka "Load more": button ki row ki jagah agle page ke
+// rows (server se HTML fragment) aa jaate hain. Naye fragment me aage ka
+// button khud hota hai, isliye click document par sunte hain.
+document.addEventListener('click', function(event) {
+    const button = event.target.closest('.load-more-btn');
+    if (!button) return;
+
+    button.disabled = true;
+    button.textContent = 'Loading...';
+    const row = button.closest('tr');
+
+    fetch(button.dataset.url)
+        .then(response => {
+            if (!response.ok) throw new Error(response.status);
+            return response.text();
+        })
+        .then(html => {
+            row.insertAdjacentHTML('afterend', html);
+            row.remove();
+        })
+        .catch(() => {
+            button.disabled = false;
+            button.textContent = 'Load more (retry)';
+        });
+});
@@ -0,0 +1,146 @@
+# management/summary.py
+
+# ==========================================
+# MonthlyCanteenSummary ko banana / update karna
+# ==========================================
+# Ek (canteen, month) bucket ko raw tables se 3 grouped queries me dobara
+# nikalte hain. Signals sirf badle hue bucket ko refresh karte hain, aur
+# `rebuild_monthly_summary` command poora table ek saath banata hai.
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Sum
+
+from .models import DailyEntry, Expense, MonthlyCanteenSummary as Summary, SalaryPayment
+from .reports import MonthStart, month_range
+
+
+MEAL_FIELDS = [
+    'tea_qty', 'nasta_qty', 'lunch_qty', 'dinner_qty',
+    'normal_token_qty', 'special_token_qty', 'guest_token_qty',
+]
+
+PAYMENT_MODES = Expense.PAYMENT_MODE_CHOICES
+
+# "Sab canteens" ke liye marker (None ka matlab General/NULL canteen hai)
+ALL = object()
+
+
+def _add(bucket, key, amount):
+    bucket[key] = str(Decimal(bucket.get(key, '0')) + amount)
+
+
+def _rebuild(canteen_id=ALL, month=None):
+    """
+    Raw data se summary rows dobara banata hai.
+    canteen_id=ALL aur month=None ho to poora table.
+    """
+    entries = DailyEntry.objects.all()
+    expenses = Expense.objects.all()
+    salaries = SalaryPayment.objects.all()
+    existing = Summary.objects.all()
+
+    if canteen_id is not ALL:
+        entries = entries.filter(canteen_id=canteen_id)
+        expenses = expenses.filter(canteen_id=canteen_id)
+        salaries = salaries.filter(staff__canteen_id=canteen_id)
+        existing = existing.filter(canteen_id=canteen_id)
+
+    if month is not None:
+        first_day, last_day = month_range(month)
+        entries = entries.filter(date__range=[first_day, last_day])
+        expenses = expenses.filter(date__range=[first_day, last_day])
+        salaries = salaries.filter(date__range=[first_day, last_day])
+        existing = existing.filter(month=first_day)
+
+    rows = {}
+
+    def row(canteen, month_start):
+        key = (canteen, month_start)
+        if key not in rows:
+            rows[key] = Summary(
+                canteen_id=canteen, month=month_start,
+                expense_by_category={}, expense_by_mode={},
+            )
+        return rows[key]
+
+    # 1. Meals + Income
+    meal_sums = {name: Sum(name) for name in MEAL_FIELDS}
+    income = entries.annotate(m=MonthStart('date')).values('canteen', 'm').annotate(
+        cash=Sum('cash_received'), online=Sum('online_received'), **meal_sums
+    ).order_by()
+    for item in income:
+        summary = row(item['canteen'], item['m'])
+        for name in MEAL_FIELDS:
+            setattr(summary, name, item[name] or 0)
+        summary.cash_received = item['cash'] or Decimal('0')
+        summary.online_received = item['online'] or Decimal('0')
+
+    # 2. Expenses: category wise rows, payment modes usi row me columns
+    #    (SUM(...) FILTER (WHERE payment_mode = ...)) - mode wise alag rows nahi
+    modes = {f'mode_{n}': mode for n, (mode, _) in enumerate(PAYMENT_MODES)}
+    grouped = expenses.annotate(m=MonthStart('date')).values('canteen', 'm', 'category').annotate(
+        total=Sum('amount'),
+        **{key: Sum('amount', filter=Q(payment_mode=mode)) for key, mode in modes.items()},
+    ).order_by()
+    for item in grouped:
+        summary = row(item['canteen'], item['m'])
+        amount = item['total'] or Decimal('0')
+        summary.expense_total += amount
+        _add(summary.expense_by_category, item['category'], amount)
+        for key, mode in modes.items():
+            if item[key] is not None:
+                _add(summary.expense_by_mode, mode, item[key])
+
+    # 3. Salary (staff ki canteen ke hisaab se)
+    paid = salaries.annotate(m=MonthStart('date')).values(
+        'staff__canteen', 'm'
+    ).annotate(total=Sum('amount')).order_by()
+    for item in paid:
+        row(item['staff__canteen'], item['m']).salary_total = item['total'] or Decimal('0')
+
+    # Do requests ek hi bucket ek saath refresh karein to dusri ka insert unique
+    # constraint (General ke liye partial index) par rukta hai - ek baar phir
+    # delete + insert, tab tak pehli wali ki rows commit ho chuki hoti hain
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                existing.delete()
+                Summary.objects.bulk_create(rows.values(), batch_size=500)
+            break
+        except IntegrityError:
+            if attempt:
+                raise
+    return len(rows)
+
+
+def refresh_summary(canteen_id, month):
+    """Sirf ek (canteen, month) bucket ko refresh karta hai."""
+    return _rebuild(canteen_id=canteen_id, month=month)
+
+
+def refresh_canteen_summaries(canteen_id):
+    """Ek canteen (ya None = General) ke saare mahine refresh karta hai."""
+    return _rebuild(canteen_id=canteen_id)
+
+
+def rebuild_all_summaries():
+    return _rebuild()
+
+
+def refresh_summaries(buckets):
+    """
+    Kai (canteen_id, month) buckets ek saath (bulk_create ke baad, jo signals
+    nahi bhejta). Ek mahine me kai canteens badle hon to us mahine ki saari
+    canteens ek hi rebuild me - har bucket ki alag 3 queries nahi.
+    """
+    by_month = {}
+    for canteen_id, month in buckets:
+        by_month.setdefault(month.replace(day=1), set()).add(canteen_id)
+
+    for month, canteen_ids in sorted(by_month.items()):
+        if len(canteen_ids) == 1:
+            refresh_summary(canteen_ids.pop(), month)
+        else:
+            _rebuild(month=month)
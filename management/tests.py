@@ -1,3 +1,1508 @@
-from django.test import TestCase
+import csv
+import importlib
+import io
+import json
+import os
+import queue
+import runpy
+import tempfile
+import threading
+from datetime import date, datetime, timezone as datetime_timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import Permission, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import QuerySet, Sum
+from django.db.utils import ConnectionHandler, load_backend
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from openpyxl import Workbook, load_workbook
+
+from benchmarks import run as benchmark
+
+from .exports import (
+    collect_canteen_sheets, expense_rows, filtered_expenses, write_canteen_sheet, write_consolidated_workbook, write_csv,
+)
+from .imports import import_rows, read_rows
+from .jobs import export_params, queue_export, run_export_job, save_job_update
+from . import payroll as payroll_module
+from .leaves import LeaveIndex
+from .ledger import staff_ledger
+from .payroll import payroll_for_month, run_payroll
+from .reports import canteen_comparison, financial_rollup
+from .models import (
+    Canteen, DailyEntry, Expense, ExportJob, MonthlyCanteenSummary, Payroll, SalaryPayment, Staff, StaffLeave,
+    StaffLedgerCheckpoint,
+)
+from .perf import QueryBudgetExceeded, percentile, track_queries
+from .report_cache import invalidate_reports, report_cache, report_version
+
+
+# ==========================================
+# Financial Rollup (management/reports.py)
+# ==========================================
+
+class FinancialRollupTests(TestCase):
+
+    def test_partial_month_amounts_keep_paise(self):
+        canteen = Canteen.objects.create(name="Canteen", location="Site")
+        staff = Staff.objects.create(name="Ramesh", role='Cook', canteen=canteen,
+                                     monthly_salary=Decimal('9000'), joining_date=date(2024, 1, 1))
+        DailyEntry.objects.create(canteen=canteen, date=date(2025, 3, 5), cash_received=Decimal('500.50'))
+        Expense.objects.create(canteen=canteen, date=date(2025, 3, 5), category='Gas', description='gas',
+                               amount=Decimal('223.75'))
+        Expense.objects.create(canteen=canteen, date=date(2025, 3, 6), category='Milk', description='milk',
+                               amount=Decimal('50.75'))
+        Expense.objects.create(canteen=canteen, date=date(2025, 2, 28), category='Milk', description='milk',
+                               amount=Decimal('0.37'))
+        SalaryPayment.objects.create(staff=staff, date=date(2025, 3, 7), payment_type='Advance', amount=Decimal('99.99'))
+
+        # Range beech mahine me shuru aur khatam - sab raw tables (UNION) se
+        rollup = financial_rollup(date(2025, 2, 15), date(2025, 3, 20), canteen)
+
+        self.assertEqual(dict(rollup.categories), {'Gas': Decimal('223.75'), 'Milk': Decimal('51.12')})
+        self.assertEqual(rollup.expense_total, Decimal('274.87'))
+        self.assertEqual(rollup.salary_total, Decimal('99.99'))
+        self.assertEqual(rollup.canteen_profit, Decimal('225.63'))
+        self.assertEqual((rollup.total_canteens, rollup.total_staff), (1, 1))
+
+
+# ==========================================
+# Monthly Canteen Summary (management/summary.py + signals)
+# ==========================================
+
+def _summary_rows():
+    # JSON me string amounts - Decimal me badal ke compare
+    return {
+        (row.canteen_id, row.month): (
+            row.lunch_qty, row.cash_received, row.expense_total, row.salary_total,
+            {key: Decimal(value) for key, value in row.expense_by_category.items()},
+            {key: Decimal(value) for key, value in row.expense_by_mode.items()},
+        )
+        for row in MonthlyCanteenSummary.objects.all()
+    }
+
+
+class MonthlyCanteenSummaryTests(TestCase):
+
+    def setUp(self):
+        self.alpha = Canteen.objects.create(name="Alpha", location="Site")
+        self.beta = Canteen.objects.create(name="Beta", location="Site")
+
+    def test_expense_save_edit_and_delete_refresh_buckets(self):
+        march, april = date(2025, 3, 1), date(2025, 4, 1)
+        expense = Expense.objects.create(canteen=self.alpha, date=date(2025, 3, 4), category='Gas',
+                                         description='gas', payment_mode='Cash', amount=Decimal('100.25'))
+        Expense.objects.create(canteen=None, date=date(2025, 3, 9), category='Milk', description='office',
+                               amount=Decimal('20'))
+        rows = _summary_rows()
+        self.assertEqual(rows[self.alpha.pk, march][2:5], (Decimal('100.25'), 0, {'Gas': Decimal('100.25')}))
+        self.assertEqual(rows[None, march][2], Decimal('20'))
+
+        # Dusri canteen aur dusre mahine me - purana bucket khali, naya bhara
+        expense.canteen, expense.date, expense.amount = self.beta, date(2025, 4, 2), Decimal('80')
+        expense.save()
+        rows = _summary_rows()
+        self.assertNotIn((self.alpha.pk, march), rows)
+        self.assertEqual(rows[self.beta.pk, april][2], Decimal('80'))
+        self.assertEqual(rows[self.beta.pk, april][5], {'Cash': Decimal('80')})
+
+        expense.delete()
+        self.assertEqual(set(_summary_rows()), {(None, march)})
+
+    def test_staff_transfer_and_canteen_delete_move_totals(self):
+        march = date(2025, 3, 1)
+        staff = Staff.objects.create(name="Ramesh", role='Cook', canteen=self.alpha,
+                                     monthly_salary=Decimal('9000'), joining_date=date(2024, 1, 1))
+        SalaryPayment.objects.create(staff=staff, date=date(2025, 3, 5), payment_type='Advance', amount=Decimal('500'))
+        self.assertEqual(_summary_rows()[self.alpha.pk, march][3], Decimal('500'))
+
+        staff.canteen = self.beta
+        staff.save()
+        rows = _summary_rows()
+        self.assertNotIn((self.alpha.pk, march), rows)
+        self.assertEqual(rows[self.beta.pk, march][3], Decimal('500'))
+
+        # Canteen delete: staff aur uski salary General (NULL) me
+        Expense.objects.create(canteen=self.beta, date=date(2025, 3, 6), category='Gas', description='gas',
+                               amount=Decimal('40'))
+        self.beta.delete()
+        self.assertEqual(_summary_rows()[None, march][2:4], (Decimal('40'), Decimal('500')))
+
+    def test_rebuild_command_and_migration_match_signal_rows(self):
+        staff = Staff.objects.create(name="Ramesh", role='Cook', canteen=self.alpha,
+                                     monthly_salary=Decimal('9000'), joining_date=date(2024, 1, 1))
+        for day, canteen in [(3, self.alpha), (4, self.beta), (30, None)]:
+            if canteen is not None: # DailyEntry hamesha kisi canteen ki
+                DailyEntry.objects.create(canteen=canteen, date=date(2025, 1, day), lunch_qty=day,
+                                          cash_received=Decimal('10.50'))
+            Expense.objects.create(canteen=canteen, date=date(2025, 1, day), category='Milk', description='milk',
+                                   payment_mode='Online', amount=Decimal('3.30'))
+            Expense.objects.create(canteen=canteen, date=date(2025, 2, day % 28), category='Gas',
+                                   description='gas', amount=Decimal('7.05'))
+        SalaryPayment.objects.create(staff=staff, date=date(2025, 2, 1), payment_type='Monthly', amount=Decimal('9000'))
+        expected = _summary_rows()
+        self.assertEqual(len(expected), 6)
+
+        MonthlyCanteenSummary.objects.all().delete()
+        call_command('rebuild_monthly_summary', stdout=io.StringIO())
+        self.assertEqual(_summary_rows(), expected)
+
+        # 0026 ka data migration sirf historical models se - wahi rows
+        MonthlyCanteenSummary.objects.all().delete()
+        migration = importlib.import_module('management.migrations.0026_monthlycanteensummary')
+        state = MigrationLoader(connection).project_state(('management', '0026_monthlycanteensummary'))
+        migration.build_summaries(state.apps, None)
+        self.assertEqual(_summary_rows(), expected)
+
+    def test_general_bucket_is_unique_and_refresh_retries(self):
+        march = date(2025, 3, 1)
+        Expense.objects.create(canteen=None, date=date(2025, 3, 4), category='Gas', description='gas',
+                               amount=Decimal('10'))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MonthlyCanteenSummary.objects.create(canteen=None, month=march)
+
+        # Dusri request ne hamare delete ke baad General row daal di
+        real_delete = QuerySet.delete
+        competing = []
+
+        def delete_then_compete(queryset):
+            result = real_delete(queryset)
+            if queryset.model is MonthlyCanteenSummary and not competing:
+                competing.append(MonthlyCanteenSummary.objects.create(canteen=None, month=march))
+            return result
+
+        with mock.patch.object(QuerySet, 'delete', delete_then_compete):
+            Expense.objects.create(canteen=None, date=date(2025, 3, 5), category='Gas', description='gas',
+                                   amount=Decimal('5'))
+
+        self.assertEqual(len(competing), 1)
+        self.assertEqual(MonthlyCanteenSummary.objects.filter(canteen=None, month=march).count(), 1)
+        self.assertEqual(_summary_rows()[None, march][2], Decimal('15'))
+
+
+# ==========================================
+# Payroll Summary (management/payroll.py)
+# ==========================================
+
+class PayrollForMonthTests(TestCase):
+
+    def test_batched_totals_match_per_staff_queries(self):
+        canteen = Canteen.objects.create(name="Canteen", location="Site")
+        staff_members = [
+            Staff.objects.create(name=f"Staff {n}", role='Helper', canteen=canteen if n < 3 else None,
+                                 monthly_salary=Decimal('12000'), joining_date=date(2024, 1, 1))
+            for n in range(1, 4)
+        ]
+        for n, staff in enumerate(staff_members[:2], 1):
+            SalaryPayment.objects.create(staff=staff, date=date(2025, 1, 20), payment_type='Advance', amount=Decimal('700.50'))
+            SalaryPayment.objects.create(staff=staff, date=date(2025, 3, 5), payment_type='Advance', amount=Decimal('1000') * n)
+            SalaryPayment.objects.create(staff=staff, date=date(2025, 3, 28), payment_type='Monthly', amount=Decimal('9000'))
+            StaffLeave.objects.create(staff=staff, start_date=date(2025, 3, 10), end_date=date(2025, 3, 11 + n),
+                                      is_paid_leave=n == 1)
+        StaffLeave.objects.create(staff=staff_members[1], start_date=date(2025, 3, 20), end_date=date(2025, 3, 20))
+
+        with self.assertNumQueries(3):
+            payroll = payroll_for_month(date(2025, 3, 15))
+
+        # Purana tareeka: har staff ki alag queries
+        for item in payroll:
+            staff = item.staff
+            payments = SalaryPayment.objects.filter(staff=staff)
+            leaves = StaffLeave.objects.filter(staff=staff, start_date__gte=date(2025, 3, 1), end_date__lte=date(2025, 3, 31))
+            self.assertEqual(item.total_advance_paid,
+                             payments.filter(payment_type='Advance').aggregate(Sum('amount'))['amount__sum'] or 0)
+            self.assertEqual(item.paid_this_month,
+                             payments.filter(date__range=[date(2025, 3, 1), date(2025, 3, 31)]).aggregate(Sum('amount'))['amount__sum'] or 0)
+            self.assertEqual(item.leaves_this_month, sum(leave.total_days() for leave in leaves))
+            self.assertEqual(item.canteen_name, staff.canteen.name if staff.canteen else 'N/A')
+
+        first, second, third = sorted(payroll, key=lambda item: item.staff.name)
+        self.assertEqual((first.paid_leave_days, first.unpaid_leave_days), (3, 0))
+        self.assertEqual((second.paid_leave_days, second.unpaid_leave_days), (0, 5))
+        self.assertEqual((third.total_advance_paid, third.leaves_this_month), (Decimal('0'), 0))
+
+
+# ==========================================
+# Payroll Run snapshots (Payroll table)
+# ==========================================
+
+class PayrollRunTests(TestCase):
+
+    def setUp(self):
+        self.staff = Staff.objects.create(name="Ramesh", role='Cook', monthly_salary=Decimal('3100'),
+                                          joining_date=date(2024, 1, 1))
+
+    def test_leave_and_payment_edits_mark_snapshot_stale(self):
+        payslip, = run_payroll(date(2025, 3, 1))
+        self.assertEqual((payslip.unpaid_leaves, payslip.net_salary), (0, Decimal('3100.00')))
+        with self.assertNumQueries(2): # staff + payslips, kuch recompute nahi
+            run_payroll(date(2025, 3, 1))
+
+        leave = StaffLeave.objects.create(staff=self.staff, start_date=date(2025, 3, 30), end_date=date(2025, 4, 2))
+        self.assertTrue(Payroll.objects.get(staff=self.staff, month=date(2025, 3, 1)).is_stale)
+
+        payslip, = run_payroll(date(2025, 3, 1))
+        self.assertEqual((payslip.unpaid_leaves, payslip.deduction_amount), (2, Decimal('200.00')))
+        self.assertFalse(Payroll.objects.get(pk=payslip.pk).is_stale)
+
+        # Leave paid kar di -> phir se stale, deduction hat jaati hai
+        leave.is_paid_leave = True
+        leave.save()
+        payslip, = run_payroll(date(2025, 3, 1))
+        self.assertEqual((payslip.paid_leaves, payslip.unpaid_leaves, payslip.net_salary), (2, 0, Decimal('3100.00')))
+
+        payment = SalaryPayment.objects.create(staff=self.staff, date=date(2025, 3, 5), payment_type='Advance', amount=Decimal('500'))
+        self.assertTrue(Payroll.objects.get(pk=payslip.pk).is_stale)
+        run_payroll(date(2025, 3, 1))
+        payment.delete()
+        self.assertTrue(Payroll.objects.get(pk=payslip.pk).is_stale)
+
+    def test_view_only_writes_snapshots_for_past_months(self):
+        self.client.force_login(User.objects.create_user('manager', password='x'))
+        url = reverse('generate_payroll')
+        next_month = date.today().replace(day=1) + relativedelta(months=1)
+
+        for params in [{'month': next_month.month, 'year': next_month.year}, {'month': 12, 'year': 2023},
+                       {'month': 1, 'year': 1900}, {'month': 13, 'year': 2025}, {'month': 'abc', 'year': 2025}]:
+            with self.subTest(**params):
+                self.assertRedirects(self.client.get(url, params), url, fetch_redirect_response=False)
+        self.assertFalse(Payroll.objects.exists())
+
+        response = self.client.get(url, {'month': 1, 'year': 2024}) # joining ka mahina
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Payroll.objects.values_list('month', flat=True)), [date(2024, 1, 1)])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_concurrent_run_for_same_month_does_not_fail(self):
+        # Dusri request ne hamare "existing" padhne ke baad payslip bana diya
+        for_staff = LeaveIndex.for_staff
+
+        def competing_run(*args, **kwargs):
+            Payroll.objects.create(staff=self.staff, month=date(2025, 3, 1), base_salary=Decimal('1'),
+                                   net_salary=Decimal('1'))
+            return for_staff(*args, **kwargs)
+
+        with mock.patch.object(payroll_module.LeaveIndex, 'for_staff', side_effect=competing_run):
+            payslip, = run_payroll(date(2025, 3, 1))
+
+        stored = Payroll.objects.get(staff=self.staff, month=date(2025, 3, 1))
+        self.assertEqual((stored.base_salary, stored.net_salary), (Decimal('3100.00'), Decimal('3100.00')))
+        self.assertEqual(payslip.net_salary, Decimal('3100.00'))
+
+
+# ==========================================
+# Staff Ledger checkpoints (management/ledger.py)
+# ==========================================
+
+class StaffLedgerTests(TestCase):
+
+    def test_backdated_payment_recomputes_later_checkpoints(self):
+        # Ledger aaj tak chalta hai - 3 band mahine + chalu mahina, 3000 har mahine
+        this_month = date.today().replace(day=1)
+        months = [this_month - relativedelta(months=n) for n in (3, 2, 1)]
+        staff = Staff.objects.create(name="Ramesh", role='Cook', monthly_salary=Decimal('3000'), joining_date=months[0])
+
+        _, balance = staff_ledger(staff)
+        self.assertEqual(balance, Decimal('12000'))
+
+        def checkpoints():
+            return dict(StaffLedgerCheckpoint.objects.filter(staff=staff).values_list('month', 'closing_balance'))
+
+        self.assertEqual(checkpoints(), dict(zip(months, [Decimal('3000'), Decimal('6000'), Decimal('9000')])))
+
+        # Doosre mahine ka purana payment: usse pehle ka checkpoint bacha, baad ke hat gaye
+        SalaryPayment.objects.create(staff=staff, date=months[1] + relativedelta(days=14),
+                                     payment_type='Advance', amount=Decimal('500'))
+        self.assertEqual(checkpoints(), {months[0]: Decimal('3000')})
+
+        # Date filter wala view checkpoint se shuru hota hai, aur sahi balance banata hai
+        rows, balance = staff_ledger(staff, start_date=months[2])
+        self.assertEqual(balance, Decimal('11500'))
+        self.assertEqual(rows[0]['date'], months[2])
+        self.assertEqual(rows[0]['balance'], Decimal('8500'))
+        self.assertEqual(checkpoints(), dict(zip(months, [Decimal('3000'), Decimal('5500'), Decimal('8500')])))
+
+        # Checkpoints ke bina poora hisaab - wahi result
+        StaffLedgerCheckpoint.objects.all().delete()
+        self.assertEqual(staff_ledger(staff)[1], balance)
+
+
+# ==========================================
+# Leave Interval Index (management/leaves.py)
+# ==========================================
+
+class LeaveIndexTests(TestCase):
+
+    def test_leave_crossing_month_end_is_split(self):
+        index = LeaveIndex([(date(2025, 1, 29), date(2025, 2, 3), False)])
+        self.assertEqual(index.leave_days(date(2025, 1, 1), date(2025, 1, 31)), (0, 3))
+        self.assertEqual(index.leave_days(date(2025, 2, 1), date(2025, 2, 28)), (0, 3))
+        self.assertEqual(index.leave_days(date(2025, 3, 1), date(2025, 3, 31)), (0, 0))
+
+    def test_leave_crossing_year_end_is_split(self):
+        index = LeaveIndex([(date(2024, 12, 30), date(2025, 1, 2), True)])
+        self.assertEqual(index.leave_days(date(2024, 12, 1), date(2024, 12, 31)), (2, 0))
+        self.assertEqual(index.leave_days(date(2025, 1, 1), date(2025, 1, 31)), (2, 0))
+        self.assertEqual(index.leave_days(date(2024, 1, 1), date(2025, 12, 31)), (4, 0))
+
+    def test_overlapping_leaves_count_each_day_once(self):
+        index = LeaveIndex([
+            (date(2025, 3, 1), date(2025, 3, 5), False),
+            (date(2025, 3, 4), date(2025, 3, 8), False),  # overlap
+            (date(2025, 3, 9), date(2025, 3, 9), False),  # lagatar
+            (date(2025, 3, 2), date(2025, 3, 3), False),  # andar hi
+            (date(2025, 3, 20), date(2025, 3, 21), True),
+            (date(2025, 3, 10), date(2025, 3, 9), False), # ulti dates - chhod do
+        ])
+        self.assertEqual(index.leave_days(date(2025, 3, 1), date(2025, 3, 31)), (2, 9))
+        self.assertEqual(index.leave_days(date(2025, 3, 6), date(2025, 3, 20)), (1, 4))
+
+    def test_payroll_and_ledger_split_leave_across_months(self):
+        staff = Staff.objects.create(name="Ramesh", role='Cook', monthly_salary=Decimal('3000'),
+                                     joining_date=date(2024, 1, 1))
+        StaffLeave.objects.create(staff=staff, start_date=date(2024, 12, 30), end_date=date(2025, 1, 2))
+
+        self.assertEqual(run_payroll(date(2024, 12, 1))[0].unpaid_leaves, 2)
+        self.assertEqual(run_payroll(date(2025, 1, 1))[0].unpaid_leaves, 2)
+        self.assertEqual(payroll_for_month(date(2025, 1, 1))[0].unpaid_leave_days, 2)
+        credits = {
+            row['date']: row['credit'] for row in staff_ledger(staff, date(2024, 12, 1), date(2025, 1, 31))[0]
+        }
+        self.assertEqual(credits, {date(2024, 12, 1): Decimal('2800.00'), date(2025, 1, 1): Decimal('2800.00')})
+
+    def test_migration_0029_marks_old_snapshots_for_recompute(self):
+        migration = importlib.import_module('management.migrations.0029_recompute_leave_snapshots')
+        staff = Staff.objects.create(name="Ramesh", role='Cook', monthly_salary=Decimal('3000'),
+                                     joining_date=date(2024, 1, 1))
+        Payroll.objects.create(staff=staff, month=date(2025, 1, 1), base_salary=Decimal('3000'),
+                               net_salary=Decimal('3000'))
+        StaffLedgerCheckpoint.objects.create(staff=staff, month=date(2025, 1, 1), closing_balance=Decimal('1'))
+
+        state = MigrationLoader(connection).project_state(('management', '0029_recompute_leave_snapshots'))
+        migration.recompute_leave_snapshots(state.apps, None)
+
+        self.assertTrue(Payroll.objects.get(staff=staff).is_stale)
+        self.assertFalse(StaffLedgerCheckpoint.objects.exists())
+
+
+# ==========================================
+# Summary report - din ke line items (fetch)
+# ==========================================
+
+class CanteenDayExpensesTests(TestCase):
+
+    def test_bad_date_or_canteen_is_404(self):
+        canteen = Canteen.objects.create(name="Canteen", location="Site")
+        Expense.objects.create(canteen=canteen, date=date(2025, 3, 4), category='Gas', description='gas', amount=Decimal('10'))
+        self.client.force_login(User.objects.create_user('manager', password='x'))
+
+        response = self.client.get(reverse('canteen_day_expenses', args=[canteen.pk, '2025-03-04']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['expenses']), 1)
+        for canteen_id, date_str in [(canteen.pk, 'notadate'), (canteen.pk, '2025-02-30'), (canteen.pk + 1, '2025-03-04')]:
+            with self.subTest(canteen_id=canteen_id, date_str=date_str):
+                response = self.client.get(reverse('canteen_day_expenses', args=[canteen_id, date_str]))
+                self.assertEqual(response.status_code, 404)
+
+
+# ==========================================
+# Expense CSV export filters
+# ==========================================
+
+class ExpenseExportFilterTests(TestCase):
+
+    def test_non_numeric_canteen_is_ignored(self):
+        canteen = Canteen.objects.create(name="Canteen", location="Site")
+        Expense.objects.create(canteen=canteen, date=date(2025, 3, 4), category='Gas', description='gas', amount=Decimal('10'))
+        Expense.objects.create(canteen=None, date=date(2025, 3, 4), category='Gas', description='office', amount=Decimal('20'))
+        self.client.force_login(User.objects.create_user('manager', password='x'))
+
+        url = reverse('export_expenses') + '?start_date=2025-03-01&end_date=2025-03-31&canteen='
+        for canteen_param, expected_rows in [('abc', 2), ('', 2), (str(canteen.pk), 1)]:
+            with self.subTest(canteen=canteen_param):
+                response = self.client.get(url + canteen_param)
+                self.assertEqual(response.status_code, 200)
+                lines = b''.join(response.streaming_content).decode().strip().splitlines()
+                self.assertEqual(len(lines) - 1, expected_rows)
+
+        response = self.client.post(reverse('export_jobs'), {'kind': 'CANTEEN_EXCEL', 'canteen': 'abc'})
+        self.assertRedirects(response, reverse('export_jobs'))
+        self.assertFalse(ExportJob.objects.exists())
+
+
+# ==========================================
+# CSV / Excel export files (management/exports.py)
+# ==========================================
+
+def _export_data():
+    canteens = [
+        Canteen.objects.create(name=name, location="Site", billing_type=billing)
+        for name, billing in [("Alpha", 'DAILY'), ("Beta", 'MONTHLY'), ("Gamma: Main/Hall", 'DAILY')]
+    ]
+    for n, canteen in enumerate(canteens, 1):
+        for day in range(1, 11):
+            DailyEntry.objects.create(canteen=canteen, date=date(2025, 3, day) if day < 10 else date(2025, 4, 2),
+                                      lunch_qty=10, cash_received=Decimal('100.50') * n, online_received=Decimal('20'))
+        for day in range(1, 6):
+            Expense.objects.create(canteen=canteen, date=date(2025, 3, day * 5), category='Milk',
+                                   description='milk', amount=Decimal('33.25') * n)
+    return canteens
+
+
+def _sheet_rows(ws):
+    return [row for row in ws.iter_rows(values_only=True)]
+
+
+class ExportFileTests(TestCase):
+
+    def setUp(self):
+        self.canteens = _export_data()
+        self.start, self.end = date(2025, 3, 1), date(2025, 4, 10)
+
+    def test_csv_has_every_row_and_total(self):
+        output = io.StringIO()
+        progress = []
+        with mock.patch('management.exports.EXPORT_CHUNK_SIZE', 4):
+            write_csv(output, expense_rows(filtered_expenses(self.start, self.end)),
+                      total=15, progress=lambda done, total: progress.append(done))
+
+        header, *rows = list(csv.reader(io.StringIO(output.getvalue())))
+        self.assertEqual(header, ['Date', 'Category', 'Description', 'Canteen', 'Payment Mode', 'Amount'])
+        self.assertEqual(len(rows), 15)
+        self.assertEqual(sum(Decimal(row[-1]) for row in rows), Decimal('33.25') * 5 * 6)
+        self.assertEqual(progress, [4, 8, 12])
+
+    def test_canteen_sheet_rows_and_summary_match_rollup(self):
+        canteen = self.canteens[1]
+        wb = Workbook(write_only=True)
+        write_canteen_sheet(wb, canteen, self.start, self.end)
+        target = io.BytesIO()
+        wb.save(target)
+
+        rows = _sheet_rows(load_workbook(target).active)
+        rollup = financial_rollup(self.start, self.end, canteen)
+        self.assertEqual(rows[0][0], "CANTEEN REPORT: BETA")
+        self.assertEqual([Decimal(str(value)) for value in rows[6][:3]],
+                         [rollup.total_income, rollup.expense_total, rollup.canteen_profit])
+
+        income_header = rows.index(('Date', 'Tea', 'Nasta', 'Lunch', 'Dinner', 'Cash (₹)', 'Online (₹)',
+                                    'Normal Token', 'Special Token', 'Guest Token'))
+        expense_title = [row[0] for row in rows].index("DETAILED EXPENSES")
+        incomes = [row for row in rows[income_header + 1:expense_title] if row[0]]
+        expenses = rows[expense_title + 2:]
+        self.assertEqual(len(incomes), 10)
+        self.assertEqual(len(expenses), 5)
+        self.assertEqual(sum(Decimal(str(row[5])) + Decimal(str(row[6])) for row in incomes), rollup.total_income)
+        self.assertEqual(sum(Decimal(str(row[3])) for row in expenses), rollup.expense_total)
+
+
+class ConsolidatedWorkbookTests(TransactionTestCase):
+    # Process pool ke child processes ko data dikhna chahiye - isliye commit (TransactionTestCase)
+
+    def test_one_sheet_per_canteen_with_rollup_totals(self):
+        canteens = _export_data()
+        start, end = date(2025, 3, 1), date(2025, 4, 10)
+
+        books = {}
+        for workers in (1, 2):
+            target = io.BytesIO()
+            write_consolidated_workbook(target, start, end, workers=workers)
+            books[workers] = load_workbook(target)
+
+        for workers, wb in books.items():
+            with self.subTest(workers=workers):
+                self.assertEqual(wb.sheetnames, ['Summary', 'Alpha', 'Beta', 'Gamma- Main-Hall'])
+                summary = _sheet_rows(wb['Summary'])
+                for canteen, row in zip(canteens, summary[4:7]):
+                    rollup = financial_rollup(start, end, canteen)
+                    self.assertEqual(row[0], canteen.name)
+                    self.assertEqual([Decimal(str(value)) for value in row[3:6]],
+                                     [rollup.total_income, rollup.expense_total, rollup.canteen_profit])
+                self.assertEqual(summary[7][0], 'TOTAL')
+                self.assertEqual(Decimal(str(summary[7][3])), sum(Decimal(str(row[3])) for row in summary[4:7]))
+                self.assertEqual(_sheet_rows(wb['Beta'])[0][0], "CANTEEN REPORT: BETA")
+
+        # Pool (2 workers) aur sequential - har sheet same
+        for name in books[1].sheetnames:
+            self.assertEqual(_sheet_rows(books[1][name]), _sheet_rows(books[2][name]))
+
+
+    def test_pool_child_builds_sheets_in_process(self):
+        canteens = _export_data()
+        start, end = date(2025, 3, 1), date(2025, 4, 10)
+        # Export worker ke child jaisa: parent_process() set - naya pool nahi banna chahiye
+        with mock.patch('management.exports.multiprocessing.parent_process', return_value=object()), \
+                mock.patch('management.exports.ProcessPoolExecutor', side_effect=AssertionError("nested pool")):
+            sheets = collect_canteen_sheets(canteens, start, end, workers=4)
+        self.assertEqual([sheet.canteen_name for sheet in sheets], ["Alpha", "Beta", "Gamma: Main/Hall"])
+
+
+# ==========================================
+# Background export worker (run_export_worker)
+# ==========================================
+
+class ExportWorkerTests(TransactionTestCase):
+    # Asli process pool: children sirf padhte hain, job row parent likhta hai
+
+    def test_concurrent_jobs_all_finish(self):
+        canteens = _export_data()
+        kinds = [
+            ('EXPENSE_CSV', None, None), ('EXPENSE_CSV', None, 'Milk'), ('EXPENSE_CSV', canteens[0].pk, None),
+            ('CANTEEN_EXCEL', canteens[0].pk, None), ('CANTEEN_EXCEL', canteens[1].pk, None),
+            ('CONSOLIDATED_EXCEL', None, None),
+        ]
+        jobs = [
+            queue_export(kind, export_params(kind, canteen_id=canteen_id, start_date=date(2025, 3, 1),
+                                             end_date=date(2025, 4, 30), category=category))
+            for kind, canteen_id, category in kinds
+        ]
+
+        # cpu_count 4: consolidated job child ke andar bhi workers > 1 maangega
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media), \
+                mock.patch('management.exports.os.cpu_count', return_value=4):
+            call_command('run_export_worker', workers=4, once=True, poll=0.05, stdout=io.StringIO())
+
+            for job in jobs:
+                job.refresh_from_db()
+                self.assertEqual((job.kind, job.status, job.progress, job.error), (job.kind, 'DONE', 100, ''))
+                self.assertTrue(os.path.exists(job.file.path))
+            with open(jobs[0].file.path, encoding='utf-8') as fileobj:
+                self.assertEqual(len(fileobj.read().splitlines()), 1 + 15)
+
+    def test_progress_goes_to_parent_queue(self):
+        canteen = _export_data()[0]
+        job = queue_export('EXPENSE_CSV', export_params('EXPENSE_CSV', canteen_id=canteen.pk, start_date=date(2025, 3, 1),
+                                                        end_date=date(2025, 4, 30)))
+        updates = queue.SimpleQueue()
+
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media), \
+                mock.patch('management.exports.EXPORT_CHUNK_SIZE', 1):
+            job_id, fields = run_export_job(job.pk, updates)
+
+        self.assertEqual(fields['status'], 'DONE')
+        self.assertGreater(updates.qsize(), 0)
+        self.assertEqual(updates.get()[0], job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'PENDING') # child ne khud kuch nahi likha
+        save_job_update(job_id, {'progress': 40}) # RUNNING nahi - late progress ignore
+        save_job_update(job_id, fields)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress), ('DONE', 100))
+
+
+# ==========================================
+# Composite Indexes (migration 0032)
+# ==========================================
+# EXPLAIN QUERY PLAN se check karte hain ki hot queries sahi index use karein.
+# Plan DB par depend karta hai, isliye sirf SQLite (humara production DB).
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output SQLite specific hai")
+class CompositeIndexPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.canteen = Canteen.objects.create(name="Test Canteen", location="Site A")
+        cls.staff = Staff.objects.create(
+            name="Ramesh", role="Cook", canteen=cls.canteen,
+            monthly_salary=Decimal('15000'), joining_date=date(2025, 1, 1),
+        )
+        for day in range(1, 11):
+            Expense.objects.create(
+                canteen=cls.canteen, date=date(2025, 1, day), category='Milk',
+                description='milk', amount=Decimal('100'),
+            )
+            SalaryPayment.objects.create(
+                staff=cls.staff, date=date(2025, 1, day), payment_type='Advance', amount=Decimal('500'),
+            )
+        StaffLeave.objects.create(
+            staff=cls.staff, start_date=date(2025, 1, 5), end_date=date(2025, 1, 7), is_paid_leave=False,
+        )
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"Query plan me {index_name} nahi mila:\n{plan}")
+
+    def test_expense_canteen_date_range(self):
+        expenses = Expense.objects.filter(
+            canteen=self.canteen, date__range=[date(2025, 1, 1), date(2025, 1, 31)]
+        ).order_by('date', 'id')
+        self.assertUsesIndex(expenses, 'expense_canteen_date_idx')
+
+    def test_expense_date_range_by_category(self):
+        expenses = Expense.objects.filter(
+            date__range=[date(2025, 1, 1), date(2025, 1, 31)]
+        ).values('category').order_by()
+        self.assertUsesIndex(expenses, 'expense_date_category_idx')
+
+    def test_salary_payments_for_staff_from_date(self):
+        payments = SalaryPayment.objects.filter(
+            staff=self.staff, date__gte=date(2025, 1, 1)
+        ).order_by('date', 'id')
+        self.assertUsesIndex(payments, 'salary_staff_date_type_idx')
+
+    def test_leave_index_query_is_covering(self):
+        leaves = StaffLeave.objects.filter(
+            staff=self.staff, start_date__lte=date(2025, 1, 31), end_date__gte=date(2025, 1, 1),
+        ).values_list('start_date', 'end_date', 'is_paid_leave')
+        self.assertUsesIndex(leaves, 'COVERING INDEX leave_staff_dates_idx')
+
+        # Wahi query jo LeaveIndex chalata hai - result bhi sahi ho
+        index = LeaveIndex.for_staff([self.staff.pk], date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual(index[self.staff.pk].leave_days(date(2025, 1, 1), date(2025, 1, 31)), (0, 3))
+
+
+# ==========================================
+# Query Budgets (settings.PERF_QUERY_BUDGETS)
+# ==========================================
+# Test runner strict mode on karta hai - koi view budget se zyada queries
+# chalaye to QueryBudgetExceeded aur test fail. Data me kai canteens/staff
+# hain taaki N+1 wali query turant budget tod de.
+
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('manager', password='x', is_staff=True)
+        cls.canteens = [
+            Canteen.objects.create(name=f"Canteen {n}", location="Site", billing_type=billing)
+            for n, billing in enumerate(['DAILY', 'MONTHLY', 'MONTHLY'], 1)
+        ]
+        cls.staff = []
+        for n, canteen in enumerate(cls.canteens * 2, 1):
+            staff = Staff.objects.create(
+                name=f"Staff {n}", role='Helper', canteen=canteen,
+                monthly_salary=Decimal('12000'), joining_date=date(2025, 1, 1),
+            )
+            cls.staff.append(staff)
+            SalaryPayment.objects.create(staff=staff, date=date(2025, 3, 5), payment_type='Advance', amount=Decimal('1000'))
+            SalaryPayment.objects.create(staff=staff, date=date(2025, 3, 28), payment_type='Monthly', amount=Decimal('9000'))
+            StaffLeave.objects.create(staff=staff, start_date=date(2025, 3, 10), end_date=date(2025, 3, 11), is_paid_leave=n % 2 == 0)
+        for canteen in cls.canteens:
+            for day in (3, 4, 5):
+                DailyEntry.objects.create(canteen=canteen, date=date(2025, 3, day), lunch_qty=20, cash_received=Decimal('2000'))
+                Expense.objects.create(canteen=canteen, date=date(2025, 3, day), category='Milk', description='milk', amount=Decimal('300'))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_views_stay_within_query_budget(self):
+        canteen, staff = self.canteens[1], self.staff[0]
+        period = '?start_date=2025-03-01&end_date=2025-03-31'
+        urls = [
+            reverse('home_dashboard') + '?filter_date=2025-03',
+            reverse('canteen_summary_report', args=[canteen.pk]) + period,
+            reverse('canteen_detail_report', args=[canteen.pk, '2025-03-04']),
+            reverse('canteen_day_expenses', args=[canteen.pk, '2025-03-04']),
+            reverse('payroll_summary'),
+            reverse('generate_payroll') + '?month=3&year=2025',
+            reverse('get_canteen_data'),
+            reverse('dashboard_trend') + '?months=12&end=2025-03',
+            reverse('staff_list'),
+            reverse('staff_profile', args=[staff.pk]),
+            reverse('print_staff_ledger', args=[staff.pk]),
+            reverse('staff_leave_history'),
+            reverse('staff_leave_history_rows') + '?cursor=2025-03-10_1',
+            reverse('consumption_report') + period,
+            reverse('consumption_rows') + period + '&cursor=2025-03-04_1',
+            reverse('canteen_summary_rows', args=[canteen.pk, 'expenses']) + period + '&cursor=2025-03-04',
+            reverse('export_expenses') + period,
+            reverse('export_canteen_excel', args=[canteen.pk]) + period,
+            reverse('ex_staff_list'),
+            reverse('bulk_daily_entry') + '?date=2025-03-04',
+            reverse('bulk_daily_entry') + f'?date=2025-03-01&canteen={canteen.pk}',
+            reverse('canteen_comparison_report') + '?start_date=2025-02-15&end_date=2025-03-31&sort=-cost_per_meal',
+            reverse('export_comparison_excel') + '?start_date=2025-02-15&end_date=2025-03-31',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                if response.streaming:
+                    b''.join(response.streaming_content) # stream ki queries bhi gini jaayein
+
+    @override_settings(PERF_QUERY_BUDGETS={'get_canteen_data': 1})
+    def test_exceeding_budget_fails_in_tests(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('get_canteen_data'))
+
+    @override_settings(PERF_QUERY_BUDGETS={'get_canteen_data': 1}, PERF_BUDGET_STRICT=False)
+    def test_exceeding_budget_warns_in_production(self):
+        with self.assertLogs('management.budget', 'WARNING') as logs:
+            response = self.client.get(reverse('get_canteen_data'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('get_canteen_data', logs.output[0])
+
+    def test_request_is_recorded_in_perf_log(self):
+        with self.assertLogs('management.perf', 'INFO') as logs:
+            self.client.get(reverse('payroll_summary'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'payroll_summary')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['bytes'], 0)
+
+    def test_track_queries_context_manager(self):
+        with track_queries() as stats:
+            list(Staff.objects.all())
+            list(Canteen.objects.all())
+        self.assertEqual(stats.count, 2)
+        with self.assertRaises(QueryBudgetExceeded):
+            with track_queries(budget=1, label='two queries'):
+                list(Staff.objects.all())
+                list(Canteen.objects.all())
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+
+class ColdLedgerBudgetTests(TransactionTestCase):
+    # Pehla view checkpoints likhta hai. TestCase ke transaction me bulk_create
+    # ka BEGIN chhup jaata hai, isliye yahan asli autocommit
+
+    def test_first_view_inserts_checkpoints_within_budget(self):
+        user = User.objects.create_user('manager', password='x', is_staff=True)
+        staff = Staff.objects.create(name="Staff", role='Helper', monthly_salary=Decimal('12000'),
+                                     joining_date=date(2025, 1, 1))
+        SalaryPayment.objects.create(staff=staff, date=date(2025, 3, 5), payment_type='Advance', amount=Decimal('1000'))
+        self.client.force_login(user)
+
+        for name in ['staff_profile', 'print_staff_ledger']:
+            StaffLedgerCheckpoint.objects.all().delete()
+            counts = []
+            for _ in range(2): # cold, phir warm
+                with self.subTest(view=name, run=len(counts)), self.assertLogs('management.perf', 'INFO') as logs:
+                    response = self.client.get(reverse(name, args=[staff.pk]))
+                self.assertEqual(response.status_code, 200)
+                counts.append(json.loads(logs.records[0].getMessage())['queries'])
+            self.assertTrue(StaffLedgerCheckpoint.objects.filter(staff=staff).exists())
+            # Budget pehle view ka hi naap hai; dusri baar BEGIN + INSERT nahi
+            self.assertEqual(counts, [settings.PERF_QUERY_BUDGETS[name], settings.PERF_QUERY_BUDGETS[name] - 2])
+
+
+# ==========================================
+# Eager loading (Staff.objects.for_list(), DailyEntry.objects.for_report(), ...)
+# ==========================================
+# Rows badhane par kisi list/report page ki queries nahi badhni chahiye -
+# badhi to template kisi row ka related object alag query se padh raha hai (N+1).
+
+class ConstantQueryCountTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('manager', password='x', is_staff=True)
+        cls.canteens = [
+            Canteen.objects.create(name=f"Canteen {n}", location="Site", billing_type=billing)
+            for n, billing in enumerate(['DAILY', 'MONTHLY'], 1)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.day = 0
+
+    def add_rows(self, count):
+        for _ in range(count):
+            self.day += 1
+            for canteen in self.canteens:
+                staff = Staff.objects.create(
+                    name=f"Staff {canteen.pk}-{self.day}", role='Helper', canteen=canteen,
+                    monthly_salary=Decimal('12000'), joining_date=date(2025, 1, 1),
+                )
+                Staff.objects.create(
+                    name=f"Ex Staff {canteen.pk}-{self.day}", role='Cook', canteen=canteen,
+                    monthly_salary=Decimal('15000'), joining_date=date(2024, 1, 1),
+                    is_active=False, leaving_date=date(2025, 2, self.day),
+                )
+                StaffLeave.objects.create(
+                    staff=staff, start_date=date(2025, 3, self.day), end_date=date(2025, 3, self.day),
+                )
+                SalaryPayment.objects.create(
+                    staff=staff, date=date(2025, 3, self.day), payment_type='Advance', amount=Decimal('500'),
+                )
+                DailyEntry.objects.create(
+                    canteen=canteen, date=date(2025, 3, self.day), lunch_qty=20, cash_received=Decimal('2000'),
+                )
+                Expense.objects.create(
+                    canteen=canteen, date=date(2025, 3, self.day), category='Milk',
+                    description='milk', amount=Decimal('300'),
+                )
+
+    def count_queries(self, url):
+        report_cache().clear() # har baar poora page bane, cache se nahi
+        with track_queries() as stats:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return stats.count
+
+    def test_query_count_does_not_grow_with_rows(self):
+        period = '?start_date=2025-03-01&end_date=2025-03-31'
+        urls = [
+            reverse('consumption_report') + period,
+            reverse('canteen_summary_report', args=[self.canteens[1].pk]) + period,
+            reverse('staff_leave_history'),
+            reverse('staff_list'),
+            reverse('ex_staff_list'),
+            reverse('payroll_summary'),
+            reverse('apply_leave'),
+        ]
+        self.add_rows(1)
+        few = {url: self.count_queries(url) for url in urls}
+        self.add_rows(5)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), few[url])
+
+
+# ==========================================
+# Keyset pagination ("Load more" cursors)
+# ==========================================
+# Page size chhota, aur ek date par kai rows - taaki ties page ki seema par
+# bantein. Cursor chain poori chalne par har row ek hi baar aaye.
+
+@override_settings(REPORT_PAGE_SIZE=5)
+class KeysetPaginationTests(TestCase):
+    PERIOD = '?start_date=2025-03-01&end_date=2025-03-31'
+    # Galat date, galat parts, negative/bigint se bada id
+    BAD_CURSORS = ['abc', '2025-13-01_1', '2025-03-04_1_2', '2025-03-04_-1',
+                   '2025-03-04_99999999999999999999999']
+
+    def setUp(self):
+        report_cache().clear()
+        self.client.force_login(User.objects.create_user('manager', password='x'))
+        self.canteens = [Canteen.objects.create(name=f"Canteen {n}", location="Site") for n in range(3)]
+        # Har din teeno canteens ki entry (ek date par 3 rows), pehli canteen ke do expense
+        for day in range(1, 8):
+            for canteen in self.canteens:
+                DailyEntry.objects.create(canteen=canteen, date=date(2025, 3, day), lunch_qty=day,
+                                          cash_received=Decimal(day * 10))
+            for canteen in self.canteens + self.canteens[:1]:
+                Expense.objects.create(canteen=canteen, date=date(2025, 3, day * 2), category='Gas',
+                                       description='gas', amount=Decimal(day))
+        # Range ke bahar - kisi page me nahi
+        DailyEntry.objects.create(canteen=self.canteens[0], date=date(2025, 4, 1), lunch_qty=100)
+
+    def walk(self, url):
+        """Har next_url follow karo - (saare rows, pages ki ginti)."""
+        rows, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.context['page']
+            rows += page.rows
+            pages += 1
+            url = page.next_url
+        return rows, pages
+
+    def test_consumption_cursor_chain_covers_range_once(self):
+        rows, pages = self.walk(reverse('consumption_rows') + self.PERIOD)
+
+        expected = list(DailyEntry.objects.filter(date__month=3).order_by('-date', '-id').values_list('pk', flat=True))
+        self.assertEqual(len(expected), 21)
+        self.assertEqual([row.pk for row in rows], expected)
+        self.assertEqual(pages, 5)
+
+        # Pehla page report ke saath; totals poori range ke, sirf pehle page ke nahi
+        report = self.client.get(reverse('consumption_report') + self.PERIOD)
+        self.assertEqual([row.pk for row in report.context['entries'].rows], expected[:5])
+        self.assertEqual(report.context['totals']['total_lunch'], 3 * 28)
+
+    def test_summary_cursor_chains_cover_range_once(self):
+        canteen = self.canteens[0]
+        entries = list(DailyEntry.objects.filter(canteen=canteen, date__month=3)
+                       .order_by('-date', '-id').values_list('pk', flat=True))
+
+        for table in ('incomes', 'consumption'):
+            rows, pages = self.walk(reverse('canteen_summary_rows', args=[canteen.pk, table]) + self.PERIOD)
+            self.assertEqual([row.pk for row in rows], entries, table)
+            self.assertEqual(pages, 2, table)
+
+        rows, pages = self.walk(reverse('canteen_summary_rows', args=[canteen.pk, 'expenses']) + self.PERIOD)
+        self.assertEqual([(row['date'].day, row['total_amount']) for row in rows],
+                         [(day * 2, 2 * day) for day in range(7, 0, -1)])
+        self.assertEqual(pages, 2)
+
+        report = self.client.get(reverse('canteen_summary_report', args=[canteen.pk]) + self.PERIOD)
+        self.assertEqual([row.pk for row in report.context['incomes'].rows], entries[:5])
+        self.assertEqual(report.context['total_income'], 10 * 28)
+
+    def test_invalid_cursor_is_404(self):
+        canteen = self.canteens[0]
+        urls = [reverse('consumption_rows')] + [
+            reverse('canteen_summary_rows', args=[canteen.pk, table]) for table in ('incomes', 'consumption', 'expenses')
+        ]
+        for url in urls:
+            for cursor in self.BAD_CURSORS:
+                response = self.client.get(url + self.PERIOD + '&cursor=' + cursor)
+                self.assertEqual(response.status_code, 404, (url, cursor))
+
+
+# ==========================================
+# Bulk Daily Entry Grid (bulk_create upsert)
+# ==========================================
+
+class BulkDailyEntryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('supervisor', password='x')
+        cls.daily = Canteen.objects.create(name="A Daily", location="Site", billing_type='DAILY')
+        cls.monthly = Canteen.objects.create(name="B Monthly", location="Site", billing_type='MONTHLY')
+        cls.entry = DailyEntry.objects.create(
+            canteen=cls.monthly, date=date(2025, 3, 4), lunch_qty=20, cash_received=Decimal('2000'),
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def grid_data(self, count, **rows):
+        # Grid ka bina badla POST (sab 0 / maujooda values), phir rows[index] ke badlaav
+        data = {'form-TOTAL_FORMS': count, 'form-INITIAL_FORMS': count}
+        for n in range(count):
+            for field in ['tea_qty', 'nasta_qty', 'lunch_qty', 'dinner_qty', 'normal_token_qty',
+                          'special_token_qty', 'guest_token_qty']:
+                data[f'form-{n}-{field}'] = 0
+            data[f'form-{n}-cash_received'] = data[f'form-{n}-online_received'] = '0.00'
+        for key, value in rows.items():
+            data[f'form-{key}'] = value
+        return data
+
+    def test_all_canteens_for_a_date_are_upserted(self):
+        url = reverse('bulk_daily_entry') + '?date=2025-03-04'
+        data = self.grid_data(2, **{
+            '0-lunch_qty': 50, '0-cash_received': '4000.00',
+            '0-normal_token_qty': 9, # DAILY canteen - disabled field, ignore hona chahiye
+            '1-lunch_qty': 25, '1-cash_received': '2000.00', '1-normal_token_qty': 7,
+        })
+        response = self.client.post(url, data)
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+
+        new = DailyEntry.objects.get(canteen=self.daily, date=date(2025, 3, 4))
+        self.assertEqual((new.lunch_qty, new.normal_token_qty, new.cash_received), (50, 0, Decimal('4000.00')))
+        self.entry.refresh_from_db()
+        self.assertEqual((self.entry.lunch_qty, self.entry.normal_token_qty), (25, 7))
+        self.assertEqual(DailyEntry.objects.count(), 2)
+
+        # bulk_create signals nahi bhejta - summary phir bhi taaza ho
+        summary = MonthlyCanteenSummary.objects.get(canteen=self.daily, month=date(2025, 3, 1))
+        self.assertEqual((summary.lunch_qty, summary.cash_received), (50, Decimal('4000.00')))
+
+    def test_week_for_one_canteen_skips_untouched_days(self):
+        url = reverse('bulk_daily_entry') + f'?date=2025-03-30&canteen={self.monthly.pk}'
+        data = self.grid_data(7, **{'0-tea_qty': 10, '3-tea_qty': 40}) # 30 March, 2 April
+        self.client.post(url, data)
+
+        self.assertEqual(
+            list(DailyEntry.objects.filter(canteen=self.monthly).order_by('date').values_list('date', 'tea_qty')),
+            [(date(2025, 3, 4), 0), (date(2025, 3, 30), 10), (date(2025, 4, 2), 40)],
+        )
+        self.assertEqual(MonthlyCanteenSummary.objects.get(canteen=self.monthly, month=date(2025, 4, 1)).tea_qty, 40)
+
+    def test_invalid_row_saves_nothing(self):
+        url = reverse('bulk_daily_entry') + '?date=2025-03-05'
+        response = self.client.post(url, self.grid_data(2, **{'0-lunch_qty': 5, '1-lunch_qty': 'abc'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(DailyEntry.objects.filter(date=date(2025, 3, 5)).exists())
+
+
+# ==========================================
+# CSV / Excel Import (management/imports.py)
+# ==========================================
+
+class ImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('supervisor', password='x')
+        cls.canteen = Canteen.objects.create(name="Shree Aaiji", location="Site", billing_type='DAILY')
+        DailyEntry.objects.create(canteen=cls.canteen, date=date(2025, 1, 2), lunch_qty=5)
+
+    EXPENSES_CSV = (
+        "Date,Canteen,Category,Description,Amount,Payment Mode\n"
+        "31/01/2025,shree aaiji,milk,Doodh,250.50,cash\n"
+        "2025-01-15,,Gas Cylinder/Fuel,Cylinder,1100,\n"
+        "2025-01-16,Nahi Hai,Milk,Doodh,abc,Cash\n"
+    )
+
+    def test_csv_expenses_import_valid_rows_and_report_errors(self):
+        file = io.BytesIO(self.EXPENSES_CSV.encode('utf-8-sig'))
+        with track_queries() as stats:
+            result = import_rows('expenses', read_rows(file, 'bills.csv'))
+
+        self.assertEqual((result.rows, result.created), (3, 2))
+        self.assertEqual(len(result.errors), 1)
+        number, message = result.errors[0]
+        self.assertEqual(number, 4)
+        self.assertIn("Nahi Hai", message)
+        self.assertIn("Amount", message)
+
+        milk = Expense.objects.get(category='Milk')
+        self.assertEqual((milk.canteen, milk.date, milk.payment_mode), (self.canteen, date(2025, 1, 31), 'Cash'))
+        general = Expense.objects.get(category='Gas')
+        self.assertEqual((general.canteen, general.payment_mode), (None, 'Online')) # khali = default
+        # bulk_create ke baad bhi summary taaza
+        summary = MonthlyCanteenSummary.objects.get(canteen=self.canteen, month=date(2025, 1, 1))
+        self.assertEqual(summary.expense_total, Decimal('250.50'))
+        self.assertLess(stats.count, 20) # rows ke hisaab se nahi badhti
+
+    def test_xlsx_daily_entries_skip_duplicates(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['Date', 'Canteen', 'Lunch Qty', 'cash_received'])
+        sheet.append([datetime(2025, 1, 1), self.canteen.pk, 40, 3200])
+        sheet.append([datetime(2025, 1, 2), self.canteen.name, 50, 4000]) # DB me pehle se
+        sheet.append([datetime(2025, 1, 1), self.canteen.name, 60, 100]) # file me dobara
+        file = io.BytesIO()
+        workbook.save(file)
+        file.seek(0)
+
+        result = import_rows('daily_entries', read_rows(file, 'galla.xlsx'), chunk_size=2)
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([number for number, _ in result.errors], [3, 4])
+        entry = DailyEntry.objects.get(date=date(2025, 1, 1))
+        self.assertEqual((entry.lunch_qty, entry.tea_qty, entry.cash_received), (40, 0, Decimal('3200')))
+
+    def test_error_report_download_is_a_dry_run(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('bills.csv', self.EXPENSES_CSV.encode())
+        response = self.client.post(reverse('import_data'), {'kind': 'expenses', 'file': upload, 'report': 'csv'})
+
+        report = b''.join(response.streaming_content).decode()
+        self.assertIn("Row,Error", report)
+        self.assertIn("Nahi Hai", report)
+        self.assertFalse(Expense.objects.exists())
+
+
+# ==========================================
+# SQLite production profile (DB_PROFILE=production)
+# ==========================================
+# Alag temp file database par, production wali settings ke saath - kai
+# threads ek saath likhein aur padhein, "database is locked" nahi aana chahiye.
+
+@override_settings(SQLITE_PRAGMAS=settings.SQLITE_PRODUCTION_PRAGMAS)
+class SQLiteProductionProfileTests(TestCase):
+    WRITERS = 4
+    WRITES = 25
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.connections = ConnectionHandler({
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': f"{directory.name}/profile.sqlite3",
+                **settings.SQLITE_PRODUCTION,
+            },
+        })
+        self.addCleanup(self.connections.close_all)
+        with self.connections['default'].cursor() as cursor:
+            cursor.execute("CREATE TABLE entry (id INTEGER PRIMARY KEY, writer INTEGER, n INTEGER)")
+
+    def test_pragmas_are_applied(self):
+        with self.connections['default'].cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1) # NORMAL
+
+    def test_parallel_writers_do_not_lock(self):
+        errors = []
+
+        def write(writer):
+            db = self.connections['default'] # har thread ka apna connection
+            try:
+                for n in range(self.WRITES):
+                    with db.cursor() as cursor:
+                        cursor.execute("BEGIN IMMEDIATE")
+                        cursor.execute("SELECT COUNT(*) FROM entry") # padho, phir likho (upsert jaisa)
+                        cursor.execute("INSERT INTO entry (writer, n) VALUES (%s, %s)", [writer, n])
+                        cursor.execute("COMMIT")
+            except OperationalError as error:
+                errors.append(error)
+            finally:
+                db.close()
+
+        def read():
+            db = self.connections['default']
+            try:
+                for _ in range(self.WRITES):
+                    with db.cursor() as cursor:
+                        cursor.execute("SELECT writer, COUNT(*) FROM entry GROUP BY writer")
+            except OperationalError as error:
+                errors.append(error)
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=write, args=[n]) for n in range(self.WRITERS)]
+        threads += [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        with self.connections['default'].cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM entry")
+            self.assertEqual(cursor.fetchone()[0], self.WRITERS * self.WRITES)
+
+
+# ==========================================
+# Dashboard trend API
+# ==========================================
+
+class DashboardTrendTests(TestCase):
+
+    def test_monthly_series_with_cache_headers(self):
+        user = User.objects.create_user('manager', password='x')
+        canteen = Canteen.objects.create(name="Canteen", location="Site")
+        staff = Staff.objects.create(name="Ramesh", role='Cook', canteen=canteen,
+                                     monthly_salary=Decimal('9000'), joining_date=date(2024, 1, 1))
+        DailyEntry.objects.create(canteen=canteen, date=date(2025, 1, 10), cash_received=Decimal('1000'),
+                                  online_received=Decimal('500'))
+        DailyEntry.objects.create(canteen=canteen, date=date(2025, 3, 10), cash_received=Decimal('800'))
+        Expense.objects.create(canteen=canteen, date=date(2025, 3, 2), category='Gas', description='gas',
+                               amount=Decimal('300'))
+        SalaryPayment.objects.create(staff=staff, date=date(2025, 3, 5), payment_type='Monthly', amount=Decimal('200'))
+
+        self.client.force_login(user)
+        response = self.client.get(reverse('dashboard_trend') + '?months=3&end=2025-03')
+
+        self.assertEqual(response.json(), {
+            'labels': ['Jan 2025', 'Feb 2025', 'Mar 2025'],
+            'months': ['2025-01', '2025-02', '2025-03'],
+            'income': [1500.0, 0.0, 800.0],
+            'expense': [0.0, 0.0, 300.0],
+            'salary': [0.0, 0.0, 200.0],
+            'profit': [1500.0, 0.0, 300.0],
+        })
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+
+# ==========================================
+# Conditional GET (ETag -> 304)
+# ==========================================
+# ETag report cache ke version counters se - data na badla to sirf
+# session/user ki queries, report ya aggregate nahi.
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        report_cache().clear()
+        self.canteen = Canteen.objects.create(name="Canteen", location="Site")
+        DailyEntry.objects.create(canteen=self.canteen, date=date(2025, 3, 4), lunch_qty=10)
+        self.client.force_login(User.objects.create_user('manager', password='x'))
+
+    def assertRevalidates(self, url, change):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        with self.assertNumQueries(2): # session + user
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        change()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_report_returns_304_until_its_month_changes(self):
+        url = reverse('canteen_summary_report', args=[self.canteen.pk]) + '?start_date=2025-03-01&end_date=2025-03-31'
+        self.assertRevalidates(url, lambda: Expense.objects.create(
+            canteen=self.canteen, date=date(2025, 3, 9), category='Gas', description='gas', amount=Decimal('300'),
+        ))
+
+    def test_filtered_consumption_report_lists_new_canteen(self):
+        # Cached report HTML (?canteen=X) me bhi canteen dropdown nayi canteen dikhaye
+        url = reverse('consumption_report') + f'?start_date=2025-03-01&end_date=2025-03-31&canteen={self.canteen.pk}'
+        self.assertNotContains(self.client.get(url), "Second")
+        Canteen.objects.create(name="Second", location="Site")
+        self.assertContains(self.client.get(url), "Second")
+
+    def test_filtered_consumption_report_revalidates_when_a_canteen_is_added(self):
+        url = reverse('consumption_report') + f'?start_date=2025-03-01&end_date=2025-03-31&canteen={self.canteen.pk}'
+        self.assertRevalidates(url, lambda: Canteen.objects.create(name="Second", location="Site"))
+
+    def test_canteen_data_returns_304_until_a_canteen_changes(self):
+        self.assertRevalidates(reverse('get_canteen_data'), lambda: Canteen.objects.create(
+            name="Second", location="Site", billing_type='MONTHLY',
+        ))
+
+
+class ReportCacheBackendTests(TestCase):
+
+    def settings_with(self, **env):
+        path = os.path.join(settings.BASE_DIR, 'Canteen_Manager', 'settings.py')
+        with mock.patch.dict(os.environ, env):
+            for name in ('REPORT_CACHE', 'DB_PROFILE', 'DB_ENGINE'):
+                if name not in env:
+                    os.environ.pop(name, None)
+            return runpy.run_path(path)
+
+    def test_multi_process_profiles_default_to_shared_cache(self):
+        file_cache = 'django.core.cache.backends.filebased.FileBasedCache'
+        for env in ({'DB_PROFILE': 'production'}, {'DB_ENGINE': 'postgres'}, {'REPORT_CACHE': 'file'}):
+            caches_setting = self.settings_with(**env)['CACHES']
+            self.assertEqual(caches_setting['reports']['BACKEND'], file_cache, env)
+            self.assertEqual(caches_setting['report_versions']['BACKEND'], file_cache, env)
+
+        local = self.settings_with(DB_PROFILE='production', REPORT_CACHE='locmem')['CACHES']
+        self.assertEqual(local['reports']['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+
+    @override_settings(CACHES={
+        'reports': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'cull-test',
+                    'OPTIONS': {'MAX_ENTRIES': 3}},
+        'report_versions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'cull-versions'},
+    })
+    def test_html_cull_keeps_version_counters(self):
+        version = report_version(1, date(2025, 1, 1), date(2025, 3, 31))
+        for n in range(20):
+            report_cache().set(f"report:{n}", b"<table></table>")
+        self.assertEqual(report_version(1, date(2025, 1, 1), date(2025, 3, 31)), version)
+
+        invalidate_reports(1, date(2025, 2, 1))
+        self.assertNotEqual(report_version(1, date(2025, 1, 1), date(2025, 3, 31)), version)
+
+
+# ==========================================
+# Canteen Comparison (GROUP BY canteen)
+# ==========================================
+
+class CanteenComparisonTests(TestCase):
+
+    def test_matches_per_canteen_rollup_and_sorts(self):
+        canteens = [Canteen.objects.create(name=name, location="Site") for name in ("Alpha", "Beta")]
+        for n, canteen in enumerate(canteens, 1):
+            staff = Staff.objects.create(name=f"Staff {n}", role='Cook', canteen=canteen,
+                                         monthly_salary=Decimal('9000'), joining_date=date(2024, 1, 1))
+            # Poora January (summary table) + adhura February (raw tables)
+            for day in (date(2025, 1, 10), date(2025, 2, 3), date(2025, 2, 20)):
+                DailyEntry.objects.create(canteen=canteen, date=day, lunch_qty=10 * n, tea_qty=5,
+                                          cash_received=Decimal('1000') * n)
+                Expense.objects.create(canteen=canteen, date=day, category='Gas', description='gas',
+                                       amount=Decimal('100'))
+            Expense.objects.create(canteen=canteen, date=date(2025, 2, 4), category='Milk', description='milk',
+                                   amount=Decimal('100') * n)
+            SalaryPayment.objects.create(staff=staff, date=date(2025, 2, 5), payment_type='Advance', amount=Decimal('500'))
+        Expense.objects.create(canteen=None, date=date(2025, 2, 4), category='Other', description='office',
+                               amount=Decimal('999'))
+
+        with self.assertNumQueries(6):
+            comparison = canteen_comparison(date(2025, 1, 1), date(2025, 2, 10))
+
+        for row in comparison.rows:
+            rollup = financial_rollup(date(2025, 1, 1), date(2025, 2, 10), row.canteen)
+            self.assertEqual(row.total_income, rollup.total_income)
+            self.assertEqual(row.expense_total, rollup.expense_total)
+            self.assertEqual(row.salary_total, rollup.salary_total)
+            self.assertEqual(row.profit, rollup.canteen_profit)
+        alpha, beta = comparison.rows
+        self.assertEqual(alpha.meals, 2 * 15)
+        self.assertEqual(alpha.cost_per_meal, Decimal('10.00')) # 300 / 30
+        self.assertEqual(comparison.categories, ['Gas', 'Milk'])
+        self.assertEqual(beta.mix, [('Gas', Decimal('200'), 50.0), ('Milk', Decimal('200'), 50.0)])
+        self.assertEqual(comparison.total.total_income, Decimal('6000')) # General kharcha nahi
+
+        self.client.force_login(User.objects.create_user('manager', password='x'))
+        response = self.client.get(reverse('canteen_comparison_report') + '?start_date=2025-01-01&end_date=2025-02-10&sort=-meals')
+        self.assertEqual([row.name for row in response.context['rows']], ['Beta', 'Alpha'])
+
+
+# ==========================================
+# Summary aggregation (MonthStart + FILTER)
+# ==========================================
+
+class SummaryAggregationTests(TestCase):
+
+    def test_month_buckets_and_payment_mode_columns(self):
+        canteen = Canteen.objects.create(name="Canteen", location="Site")
+        for day, mode, amount in [(date(2025, 1, 31), 'Cash', '100'), (date(2025, 1, 1), 'Online', '50.50'),
+                                  (date(2025, 2, 1), 'Pending', '20')]:
+            Expense.objects.create(canteen=canteen, date=day, category='Milk', description='milk',
+                                   payment_mode=mode, amount=Decimal(amount))
+
+        def amounts(bucket):
+            # JSON me string amounts - SQLite scale ("150.5") chhod deta hai, isliye Decimal me
+            return {key: Decimal(value) for key, value in bucket.items()}
+
+        january = MonthlyCanteenSummary.objects.get(canteen=canteen, month=date(2025, 1, 1))
+        self.assertEqual(january.expense_total, Decimal('150.50'))
+        self.assertEqual(amounts(january.expense_by_category), {'Milk': Decimal('150.50')})
+        self.assertEqual(amounts(january.expense_by_mode), {'Cash': Decimal('100'), 'Online': Decimal('50.50')})
+        february = MonthlyCanteenSummary.objects.get(canteen=canteen, month=date(2025, 2, 1))
+        self.assertEqual(amounts(february.expense_by_mode), {'Pending': Decimal('20')})
+
+
+# ==========================================
+# copy_from_sqlite (SQLite -> PostgreSQL)
+# ==========================================
+# Asli PostgreSQL ke bina: temp SQLite file (source) se test database (target)
+# me copy. IDs, foreign keys aur M2M wahi rehne chahiye.
+
+class CopyFromSQLiteTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source = connections.configure_settings({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': f"{directory.name}/old.sqlite3"},
+        })['default']
+        # Settings me nahi, seedha handler me (test framework dynamic connections allow karta hai)
+        old = load_backend(source['ENGINE']).DatabaseWrapper(source, 'old')
+        setattr(connections._connections, 'old', old)
+        self.addCleanup(delattr, connections._connections, 'old')
+        self.addCleanup(old.close)
+        call_command('migrate', database='old', verbosity=0)
+
+    def test_copies_rows_with_same_ids(self):
+        canteen = Canteen.objects.using('old').create(pk=7, name="Old Canteen", location="Site")
+        staff = Staff.objects.using('old').create(
+            pk=40, name="Ramesh", role='Cook', canteen=canteen,
+            monthly_salary=Decimal('15000'), joining_date=date(2024, 1, 1),
+        )
+        Expense.objects.using('old').create(
+            canteen=canteen, date=date(2024, 5, 1), category='Milk', description='milk', amount=Decimal('120.50'),
+        )
+        user = User.objects.using('old').create(username='owner')
+        user.user_permissions.add(Permission.objects.using('old').get(codename='add_expense'))
+
+        call_command('copy_from_sqlite', source='old', stdout=io.StringIO())
+
+        self.assertEqual(Staff.objects.get(pk=40).canteen_id, 7)
+        self.assertEqual(Expense.objects.get().amount, Decimal('120.50'))
+        self.assertTrue(User.objects.get(username='owner').has_perm('management.add_expense'))
+        # Naye rows copy ke baad bhi bante rahein (sequence/autoincrement aage)
+        self.assertGreater(Canteen.objects.create(name="New", location="Site").pk, 7)
+
+    def test_keeps_auto_now_dates(self):
+        created = datetime(2024, 5, 1, 9, 30, tzinfo=datetime_timezone.utc)
+        job = ExportJob.objects.using('old').create(kind='EXPENSE_CSV')
+        ExportJob.objects.using('old').filter(pk=job.pk).update(created_at=created)
+        staff = Staff.objects.using('old').create(
+            name="Ramesh", role='Cook', monthly_salary=Decimal('15000'), joining_date=date(2024, 1, 1),
+        )
+        StaffLedgerCheckpoint.objects.using('old').create(staff=staff, month=date(2024, 1, 1), closing_balance=Decimal('0'))
+        StaffLedgerCheckpoint.objects.using('old').update(computed_at=created)
+
+        call_command('copy_from_sqlite', source='old', stdout=io.StringIO())
+
+        self.assertEqual(ExportJob.objects.get(pk=job.pk).created_at, created)
+        self.assertEqual(StaffLedgerCheckpoint.objects.get().computed_at, created)
+        # Copy ke baad auto_now_add phir se chalu
+        self.assertGreater(ExportJob.objects.create(kind='EXPENSE_CSV').created_at, created)
+
+    def test_refuses_non_empty_target(self):
+        Canteen.objects.create(name="Already here", location="Site")
+        with self.assertRaises(CommandError):
+            call_command('copy_from_sqlite', source='old', stdout=io.StringIO())
+
+
+# ==========================================
+# seed_scale (scale-test data)
+# ==========================================
+
+class SeedScaleTests(TestCase):
+    ARGS = ['--canteens', '2', '--staff', '4', '--years', '1', '--end-date', '2025-12-31', '--batch-size', '500']
+
+    def seeded_rows(self):
+        # pk har run me alag ho sakte hain - canteen/staff naam se pehchano
+        return {
+            'staff': list(Staff.objects.order_by('name').values_list(
+                'canteen__name', 'name', 'role', 'joining_date', 'monthly_salary', 'leaving_date')),
+            'entries': list(DailyEntry.objects.order_by('canteen__name', 'date').values_list(
+                'canteen__name', 'date', 'lunch_qty', 'tea_qty', 'cash_received', 'online_received')),
+            'expenses': list(Expense.objects.order_by('pk').values_list(
+                'canteen__name', 'date', 'category', 'amount', 'payment_mode')),
+            'payments': list(SalaryPayment.objects.order_by('pk').values_list(
+                'staff__name', 'date', 'payment_type', 'amount', 'notes')),
+            'leaves': list(StaffLeave.objects.order_by('pk').values_list(
+                'staff__name', 'start_date', 'end_date', 'reason', 'is_paid_leave')),
+        }
+
+    def test_same_seed_gives_same_rows_in_every_category(self):
+        # Pehla run savepoint me - rollback se database phir khali (delete signals ke bina)
+        with transaction.atomic():
+            call_command('seed_scale', *self.ARGS, stdout=io.StringIO())
+            first = self.seeded_rows()
+            transaction.set_rollback(True)
+        self.assertFalse(Canteen.objects.exists())
+
+        call_command('seed_scale', *self.ARGS, stdout=io.StringIO())
+        self.assertEqual(self.seeded_rows(), first)
+
+        self.assertEqual(len(first['entries']), 2 * 365)
+        self.assertEqual(
+            {category for _, _, category, _, _ in first['expenses']},
+            {value for value, _ in Expense.CATEGORY_CHOICES},
+        )
+        self.assertTrue(first['payments'] and first['leaves'])
+        # Raw insert signals nahi bhejta - summary rebuild se bani honi chahiye
+        self.assertEqual(
+            MonthlyCanteenSummary.objects.filter(canteen__isnull=False).count(), 2 * 12,
+        )
+
+        with self.assertRaises(CommandError):
+            call_command('seed_scale', *self.ARGS, stdout=io.StringIO())
+
+
+# ==========================================
+# Benchmarks (benchmarks/run.py)
+# ==========================================
+
+class BenchmarkCompareTests(TestCase):
+
+    def result(self, median_ms=100, queries=5, peak_kb=1000):
+        return {'median_ms': median_ms, 'queries': queries, 'peak_kb': peak_kb}
+
+    def regressions(self, current, base):
+        return benchmark.compare({'tiny': {'view': current}}, {'tiny': {'view': base}})
+
+    def test_time_needs_tolerance_and_min_delta(self):
+        base = self.result(median_ms=100)
+        self.assertEqual(self.regressions(self.result(median_ms=120), base), []) # 25% ke andar
+        self.assertEqual(self.regressions(self.result(median_ms=130), base),
+                         [('tiny', 'view', 'median_ms', 100, 130)])
+
+        # Chhote views par 25% se zyada, par MIN_TIME_DELTA_MS se kam - noise
+        fast = self.result(median_ms=2)
+        self.assertEqual(self.regressions(self.result(median_ms=2 + benchmark.MIN_TIME_DELTA_MS), fast), [])
+        self.assertEqual(len(self.regressions(self.result(median_ms=3 + benchmark.MIN_TIME_DELTA_MS), fast)), 1)
+
+    def test_any_extra_query_and_memory_growth(self):
+        base = self.result()
+        self.assertEqual(self.regressions(self.result(queries=6), base), [('tiny', 'view', 'queries', 5, 6)])
+        self.assertEqual(self.regressions(self.result(queries=4, peak_kb=1250), base), [])
+        self.assertEqual(self.regressions(self.result(peak_kb=1300), base), [('tiny', 'view', 'peak_kb', 1000, 1300)])
+
+    def test_views_missing_from_baseline_are_skipped(self):
+        self.assertEqual(benchmark.compare({'tiny': {'new_view': self.result(queries=50)}}, {}), [])
+
+    def test_tiny_scale_smoke_run(self):
+        # Worker wala raasta (seed -> har view naapo), bas test database par
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with mock.patch.dict(os.environ, {'BENCH_DB': os.path.join(directory.name, 'tiny.sqlite3')}), \
+                mock.patch('sys.stdout', io.StringIO()), mock.patch('sys.stderr', io.StringIO()):
+            benchmark._prepare_database('tiny')
+        self.assertEqual(Canteen.objects.count(), 2)
+
+        self.client.force_login(User.objects.create_superuser('bench', password='x'))
+        results = {name: benchmark._measure(self.client, url, repeats=1)
+                   for name, url in benchmark._benchmark_urls().items()}
+
+        self.assertEqual(set(results), set(json.loads(benchmark.BASELINE_FILE.read_text())['tiny']))
+        for name, result in results.items():
+            self.assertGreater(result['bytes'], 0, name)
+            self.assertGreater(result['queries'], 0, name)
+        self.assertEqual(benchmark.compare({'tiny': results}, {'tiny': results}), [])
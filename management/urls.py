@@ -9,7 +9,9 @@ urlpatterns = [
     
     # 2. Canteen Reports
     path('report/canteen/<int:canteen_id>/summary/', views.canteen_summary_report, name='canteen_summary_report'),
+    path('report/canteen/<int:canteen_id>/summary/<str:table>/', views.canteen_summary_rows, name='canteen_summary_rows'),
     path('report/canteen/<int:canteen_id>/date/<str:date_str>/', views.canteen_detail_report, name='canteen_detail_report'),
+    path('report/canteen/<int:canteen_id>/date/<str:date_str>/expenses/', views.canteen_day_expenses, name='canteen_day_expenses'),
     
     # 3. Payroll (Conflict Theek Kar Diya)
     path('payroll/summary/', views.payroll_summary, name='payroll_summary'),
@@ -17,6 +19,7 @@ urlpatterns = [
 
     # 4. API
     path('get-canteen-data/', views.get_canteen_data, name='get_canteen_data'),
+    path('api/dashboard-trend/', views.dashboard_trend, name='dashboard_trend'),
 
     # 5. Staff Management (Job Left wale link hata diye)
     path('staff/list/', views.staff_list, name='staff_list'),
@@ -30,18 +33,30 @@ urlpatterns = [
     path('staff/<int:staff_id>/add-payment/', views.add_staff_payment, name='add_staff_payment'), # Name fix
     path('staff/apply-leave/', views.apply_leave, name='apply_leave'),
     path('staff/leave-history/', views.staff_leave_history, name='staff_leave_history'),
+    path('staff/leave-history/rows/', views.staff_leave_history_rows, name='staff_leave_history_rows'),
 
     # 7. Expense & Entries
     path('add-expense/', views.add_expense, name='add_expense'),
     path('add-daily-entry/', views.add_daily_entry, name='add_daily_entry'),
+    path('add-daily-entry/bulk/', views.bulk_daily_entry, name='bulk_daily_entry'),
+    path('import/', views.import_data, name='import_data'),
     path('add-consumption/', views.add_consumption, name='add_consumption'),
     
     # 8. Exports
     path('export/expenses/', views.export_monthly_expenses, name='export_expenses'),
     path('canteen/<int:canteen_id>/download-excel/', views.export_canteen_excel, name='export_canteen_excel'),
+    path('export/jobs/', views.export_jobs, name='export_jobs'),
+    path('export/jobs/<int:job_id>/', views.export_job_status, name='export_job_status'),
+    path('export/jobs/<int:job_id>/download/', views.export_job_download, name='export_job_download'),
     path('report/consumption/', views.consumption_report, name='consumption_report'),
+    path('report/consumption/rows/', views.consumption_rows, name='consumption_rows'),
+    path('report/comparison/', views.canteen_comparison_report, name='canteen_comparison_report'),
+    path('report/comparison/download-excel/', views.export_comparison_excel, name='export_comparison_excel'),
     # Staff Management section me:
     path('staff/ex-employees/', views.ex_staff_list, name='ex_staff_list'),
     path('staff/<int:staff_id>/left/', views.mark_staff_left, name='mark_staff_left'),
     path('staff/<int:staff_id>/rejoin/', views.rejoin_staff, name='rejoin_staff'),
+
+    # 9. Performance (staff only)
+    path('_perf/', views.perf_dashboard, name='perf_dashboard'),
 ]
\ No newline at end of file
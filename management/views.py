@@ -1,8 +1,10 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Sum , F
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from datetime import date, timedelta
 import datetime # Date parsing ke liye zaroori
 from dateutil.relativedelta import relativedelta
@@ -11,16 +13,28 @@ import json
 from datetime import date
 from .models import Canteen, Expense, Staff, SalaryPayment, StaffLeave, DailyEntry
 from .forms import SalaryPaymentForm, ExpenseForm, DailyEntryForm , ConsumptionForm
-import openpyxl 
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter  # <--- Ye line add karein
-from .forms import StaffLeaveForm
+from .forms import StaffLeaveForm, DailyEntryGridFormSet, ImportUploadForm
 import calendar
-from django.db.models import Count, Q
+from django.db.models import Count, Min, Q
 from .forms import StaffForm # Upar import check karein
 from django.utils import timezone
 from .models import Staff, StaffLeave
 from datetime import timedelta
+from .reports import financial_rollup, monthly_rollup, monthly_trend, consumption_totals, month_range, _as_date
+from .reports import canteen_comparison
+from .report_cache import cached_report, canteens_version, report_etag, report_html
+from .bulk_entry import upsert_daily_entries
+from .imports import ImportFileError, error_report_rows, import_rows, read_rows
+from .pagination import keyset_page, next_page_url
+from .payroll import payroll_for_month, run_payroll
+from .ledger import staff_ledger
+from .exports import canteen_excel_response, comparison_excel_response, expense_rows, filtered_expenses, show_tokens_for, streaming_csv_response
+from .jobs import export_params, queue_export
+from .models import ExportJob
+from .perf import read_perf_log, view_percentiles
+from django.http import FileResponse, Http404
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
 
 
@@ -46,67 +60,25 @@ def home_dashboard(request):
         # Default: Aaj ka din
         today = date.today()
 
-    # Is mahine ki range nikalo (1st to Last date)
-    first_day_of_month = today.replace(day=1)
-    last_day_of_month = first_day_of_month + relativedelta(months=1) - timedelta(days=1)
+    # --- 2. Poora mahine ka hisaab (Income, Expense, Salary, Counts) ek saath ---
+    rollup = monthly_rollup(today)
 
-    # --- 2. Expense & Salary Calculation ---
-    monthly_expenses_sum = Expense.objects.filter(
-        date__gte=first_day_of_month,
-        date__lte=last_day_of_month
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    # --- 3. Charts Data ---
+    pie_labels, pie_data = rollup.pie_chart()
 
-    monthly_salary_paid = SalaryPayment.objects.filter(
-        date__gte=first_day_of_month,
-        date__lte=last_day_of_month
-    ).aggregate(total=Sum('amount'))['total'] or 0
-
-    total_outflow = monthly_expenses_sum + monthly_salary_paid
-
-    # --- 3. Income Calculation ---
-    income_entries = DailyEntry.objects.filter(
-        date__gte=first_day_of_month,
-        date__lte=last_day_of_month
-    )
-    
-    total_cash = income_entries.aggregate(total=Sum('cash_received'))['total'] or 0
-    total_online = income_entries.aggregate(total=Sum('online_received'))['total'] or 0
-    total_income = total_cash + total_online 
-
-    # --- 4. Net Profit ---
-    net_profit = total_income - total_outflow
-
-    # --- 5. Charts Data ---
-    expense_categories = Expense.objects.filter(
-        date__gte=first_day_of_month,
-        date__lte=last_day_of_month
-    ).values('category').annotate(sum=Sum('amount')).order_by('-sum')
-
-    pie_labels = []
-    pie_data = []
-    
-    for item in expense_categories:
-        pie_labels.append(item['category'])
-        pie_data.append(float(item['sum']))
-
-    if monthly_salary_paid > 0:
-        pie_labels.append('Staff Salary')
-        pie_data.append(float(monthly_salary_paid))
-
-    # --- Context ---
     all_canteens = Canteen.objects.all().order_by('name') 
-    total_canteens = Canteen.objects.count()
-    total_staff = Staff.objects.count()
 
     context = {
         'current_month': today.strftime("%B %Y"), # Heading ke liye (e.g. December 2025)
         'filter_date': today.strftime("%Y-%m"),   # Input box me value rakhne ke liye
-        'total_canteens': total_canteens,
-        'total_staff': total_staff,
+        'month_start': month_range(today)[0],     # Consolidated Excel export ke liye
+        'month_end': month_range(today)[1],
+        'total_canteens': rollup.total_canteens,
+        'total_staff': rollup.total_staff,
         'all_canteens': all_canteens,
-        'total_income': total_income,
-        'total_expense': total_outflow,
-        'net_profit': net_profit,
+        'total_income': rollup.total_income,
+        'total_expense': rollup.total_outflow,
+        'net_profit': rollup.net_profit,
         'pie_labels': pie_labels,
         'pie_data': pie_data,
     }
@@ -123,11 +95,16 @@ def home_dashboard(request):
 
 # management/views.py
 
-@login_required
-def canteen_summary_report(request, canteen_id):
-    canteen = get_object_or_404(Canteen, pk=canteen_id)
-    
-    # 1. Date Filter
+# Har table: (rows template, keyset fields). Rows "Load more" se page-page aate
+# hain (management/pagination.py); upar ke totals hamesha poori range ke.
+SUMMARY_TABLES = {
+    'incomes': ('management/partials/summary_income_rows.html', ('date', 'id')),
+    'consumption': ('management/partials/summary_consumption_rows.html', ('date', 'id')),
+    'expenses': ('management/partials/summary_expense_rows.html', ('date',)),
+}
+
+
+def _summary_dates(request):
     start_date_str = request.GET.get('start_date')
     end_date_str = request.GET.get('end_date')
     
@@ -141,65 +118,122 @@ def canteen_summary_report(request, canteen_id):
         end_date = datetime.datetime.strptime(end_date_str, "%Y-%m-%d").date()
     else:
         end_date = today
+    return start_date, end_date
 
-    # 2. FETCH INCOMES & CALCULATE TOTALS (Annotate)
-    # Yahan hum Python me hi total nikal rahe hain taaki HTML me {% with %} na lagana pade
-    incomes = DailyEntry.objects.filter(
-        canteen=canteen, 
-        date__range=[start_date, end_date]
-    ).annotate(
-        # Income Total
-        total_money=F('cash_received') + F('online_received'),
-        # Food Total
-        total_food=F('tea_qty') + F('nasta_qty') + F('lunch_qty') + F('dinner_qty') + 
-                   F('normal_token_qty') + F('special_token_qty') + F('guest_token_qty')
-    ).order_by('-date')
-
-    # 3. FETCH EXPENSES
-    raw_expenses = Expense.objects.filter(canteen=canteen, date__range=[start_date, end_date]).order_by('-date')
-
-    # Group Expenses
-    expenses_grouped = {}
-    for exp in raw_expenses:
-        d = exp.date
-        if d not in expenses_grouped:
-            expenses_grouped[d] = {'date': d, 'total_amount': 0, 'items': []}
-        expenses_grouped[d]['total_amount'] += exp.amount
-        expenses_grouped[d]['items'].append(exp)
-    
-    final_expense_list = list(expenses_grouped.values())
-
-    # 4. OVERALL SUMMARY TOTALS
-    consumption_totals = incomes.aggregate(
-        total_tea=Sum('tea_qty'), total_nasta=Sum('nasta_qty'),
-        total_lunch=Sum('lunch_qty'), total_dinner=Sum('dinner_qty'),
-        total_normal=Sum('normal_token_qty'), total_special=Sum('special_token_qty'),
-        total_guest=Sum('guest_token_qty'),
-        total_cash=Sum('cash_received'), total_online=Sum('online_received')
+
+def _summary_table(canteen, table, start_date, end_date, cursor=None):
+    if table == 'expenses':
+        # Din-wise total DB me hi (GROUP BY date). Line items tabhi aate hain
+        # jab din khola jaaye (canteen_day_expenses)
+        rows = Expense.objects.filter(
+            canteen=canteen, date__range=[start_date, end_date]
+        ).values('date').annotate(total_amount=Sum('amount'))
+    else:
+        # Total DB me hi, taaki HTML me {% with %} na lagana pade
+        rows = DailyEntry.objects.for_report().filter(
+            canteen=canteen, 
+            date__range=[start_date, end_date]
+        ).annotate(
+            # Income Total
+            total_money=F('cash_received') + F('online_received'),
+            # Food Total
+            total_food=F('tea_qty') + F('nasta_qty') + F('lunch_qty') + F('dinner_qty') + 
+                       F('normal_token_qty') + F('special_token_qty') + F('guest_token_qty')
+        )
+        if table == 'incomes':
+            rows = rows.filter(total_money__gt=0)
+        else:
+            rows = rows.filter(total_food__gt=0)
+
+    page = keyset_page(rows, SUMMARY_TABLES[table][1], cursor)
+    page.next_url = next_page_url(
+        reverse('canteen_summary_rows', args=[canteen.pk, table]),
+        {'start_date': start_date, 'end_date': end_date}, page,
     )
+    return page
 
-    total_income_sum = (consumption_totals['total_cash'] or 0) + (consumption_totals['total_online'] or 0)
-    total_expense_sum = raw_expenses.aggregate(Sum('amount'))['amount__sum'] or 0
-    net_profit = total_income_sum - total_expense_sum
 
-    # Token Logic
-    show_tokens = False
-    if canteen.billing_type and 'monthly' in str(canteen.billing_type).lower():
-        show_tokens = True
+def _summary_etag(request, canteen_id, table=None):
+    # Conditional GET: data (version counters) na badla to 304, report bane bina
+    start_date, end_date = _summary_dates(request)
+    return report_etag(
+        request, 'canteen_summary_report', canteen_id, start_date, end_date,
+        extra=(table, request.GET.get('cursor')),
+    )
 
-    context = {
-        'canteen': canteen,
-        'incomes': incomes,
-        'grouped_expenses': final_expense_list,
-        'cons_totals': consumption_totals,
-        'total_income': total_income_sum,
-        'total_expense': total_expense_sum,
-        'net_profit': net_profit,
-        'start_date': start_date,
-        'end_date': end_date,
-        'show_tokens': show_tokens,
-    }
-    return render(request, 'management/canteen_summary_report.html', context)
+
+@login_required
+@cache_control(private=True, no_cache=True) # browser har baar If-None-Match se pooche
+@condition(etag_func=_summary_etag)
+def canteen_summary_report(request, canteen_id):
+    canteen = get_object_or_404(Canteen, pk=canteen_id)
+    
+    # 1. Date Filter
+    start_date, end_date = _summary_dates(request)
+
+    def build_context():
+        # 2. Tables ka pehla page (Income, Consumption, Expense)
+        tables = {
+            table: _summary_table(canteen, table, start_date, end_date) for table in SUMMARY_TABLES
+        }
+
+        # 3. OVERALL SUMMARY TOTALS (Rollup service se, poori range)
+        rollup = financial_rollup(start_date, end_date, canteen)
+
+        context = {
+            'canteen': canteen,
+            'incomes': tables['incomes'],
+            'consumption': tables['consumption'],
+            'grouped_expenses': tables['expenses'],
+            'cons_totals': rollup.consumption,
+            'total_income': rollup.total_income,
+            'total_expense': rollup.expense_total,
+            'net_profit': rollup.canteen_profit,
+            'start_date': start_date,
+            'end_date': end_date,
+            'show_tokens': show_tokens_for(canteen),
+        }
+        return context
+
+    # 4. Report HTML cache se (sirf is canteen ke badle hue mahine dobara bante hain)
+    return cached_report(
+        request, 'management/canteen_summary_report.html', {'canteen': canteen},
+        'canteen_summary_report', 'management/partials/canteen_summary_report.html',
+        canteen.pk, start_date, end_date, build_context,
+    )
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_summary_etag)
+def canteen_summary_rows(request, canteen_id, table):
+    # "Load more": ek table ke agle rows (HTML fragment), wahi report cache
+    canteen = get_object_or_404(Canteen, pk=canteen_id)
+    if table not in SUMMARY_TABLES:
+        raise Http404("Unknown table")
+    start_date, end_date = _summary_dates(request)
+    cursor = request.GET.get('cursor')
+
+    def build_context():
+        return {
+            'canteen': canteen,
+            'page': _summary_table(canteen, table, start_date, end_date, cursor),
+            'show_tokens': show_tokens_for(canteen),
+        }
+
+    return HttpResponse(report_html(
+        'canteen_summary_report', SUMMARY_TABLES[table][0],
+        canteen.pk, start_date, end_date, build_context, extra=(table, cursor),
+    ))
+
+@login_required
+def canteen_day_expenses(request, canteen_id, date_str):
+    # Summary report me din kholne par (fetch se) us din ke line items - sirf table rows
+    canteen = get_object_or_404(Canteen, pk=canteen_id)
+    day = _parse_date(date_str)
+    if day is None:
+        raise Http404("Galat date")
+    expenses = Expense.objects.filter(canteen=canteen, date=day).order_by('id')
+    return render(request, 'management/partials/day_expense_items.html', {'expenses': expenses})
 
 @login_required
 def canteen_detail_report(request, canteen_id, date_str):
@@ -222,39 +256,9 @@ def canteen_detail_report(request, canteen_id, date_str):
 @login_required
 def payroll_summary(request):
     today = date.today()
-    first_day_of_month = today.replace(day=1)
-    last_day_of_month = first_day_of_month + relativedelta(months=1) - relativedelta(days=1)
-
-    all_staff = Staff.objects.all().order_by('canteen__name', 'name')
-    payroll_data = []
-
-    for staff in all_staff:
-        advance_paid = SalaryPayment.objects.filter(
-            staff=staff,
-            payment_type='Advance'
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-
-        paid_this_month = SalaryPayment.objects.filter(
-            staff=staff,
-            date__gte=first_day_of_month,
-            date__lte=last_day_of_month
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-
-        leaves_this_month_periods = StaffLeave.objects.filter(
-            staff=staff,
-            start_date__gte=first_day_of_month,
-            end_date__lte=last_day_of_month
-        )
-        total_leaves = sum(leave.total_days() for leave in leaves_this_month_periods)
 
-        payroll_data.append({
-            'staff': staff,
-            'canteen_name': staff.canteen.name if staff.canteen else 'N/A',
-            'monthly_salary': staff.monthly_salary,
-            'total_advance_paid': advance_paid,
-            'paid_this_month': paid_this_month,
-            'leaves_this_month': total_leaves,
-        })
+    # Saare staff ka data 3 queries me (management/payroll.py)
+    payroll_data = payroll_for_month(today)
 
     context = {
         'payroll_data': payroll_data,
@@ -266,16 +270,79 @@ def payroll_summary(request):
 # ==========================================
 # 4. API (JavaScript के लिए डेटा)
 # ==========================================
+def _canteen_data_etag(request):
+    return f"canteens-{canteens_version()}"
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_canteen_data_etag)
 def get_canteen_data(request):
     canteens = Canteen.objects.all().values('id', 'billing_type')
     data = {str(c['id']): c['billing_type'] for c in canteens}
     return JsonResponse(data)
 
 
+TREND_MAX_MONTHS = 60
+TREND_CACHE_SECONDS = 300 # browser itni der dobara nahi maangega
+
+
+def _trend_params(request):
+    try:
+        months = min(max(int(request.GET.get('months', 12)), 1), TREND_MAX_MONTHS)
+    except ValueError:
+        months = 12
+    try:
+        end_month = datetime.datetime.strptime(request.GET.get('end', ''), "%Y-%m").date()
+    except ValueError:
+        end_month = date.today()
+
+    canteen_id = request.GET.get('canteen') or None
+    if canteen_id is not None and not canteen_id.isdigit():
+        raise Http404("Canteen nahi mili")
+    return months, end_month, canteen_id
+
+
+def _trend_etag(request):
+    months, end_month, canteen_id = _trend_params(request)
+    first = end_month.replace(day=1) - relativedelta(months=months - 1)
+    return report_etag(request, 'dashboard_trend', canteen_id, first, end_month, extra=(months,))
+
+
+@login_required
+@cache_control(private=True, max_age=TREND_CACHE_SECONDS) # user ka data - sirf browser cache
+@condition(etag_func=_trend_etag)
+def dashboard_trend(request):
+    """Dashboard chart: ?months=12&end=YYYY-MM[&canteen=ID] ki monthly series (JSON)."""
+    months, end_month, canteen_id = _trend_params(request)
+    trend = monthly_trend(end_month, months, canteen=canteen_id)
+    return JsonResponse({
+        'labels': [row['month'].strftime("%b %Y") for row in trend],
+        'months': [row['month'].strftime("%Y-%m") for row in trend],
+        **{
+            series: [float(row[series]) for row in trend]
+            for series in ('income', 'expense', 'salary', 'profit')
+        },
+    })
+
+
 # ==========================================
 # 5. स्टाफ प्रोफाइल व्यू (Bank Passbook Style)
 # ==========================================
+def _parse_date(value):
+    # GET se aayi 'YYYY-MM-DD' date, galat/khali ho to None
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_canteen_id(value):
+    # GET/POST se aayi canteen ID - khali ya number nahi to None (filter hi nahi)
+    value = (value or '').strip()
+    return int(value) if value.isdigit() else None
+
+
 @login_required
 def staff_profile_view(request, staff_id):
     staff = get_object_or_404(Staff, pk=staff_id)
@@ -283,64 +350,12 @@ def staff_profile_view(request, staff_id):
     start_filter = request.GET.get('start_date')
     end_filter = request.GET.get('end_date')
 
-    loop_start_date = staff.joining_date if staff.joining_date else date(date.today().year, 1, 1)
-    today = date.today()
-
-    all_transactions = []
-
-    # 1. Payments (Debit)
-    payments = SalaryPayment.objects.filter(staff=staff)
-    for pay in payments:
-        all_transactions.append({
-            'date': pay.date,
-            'description': f"Payment Taken ({pay.payment_type})",
-            'credit': 0,
-            'debit': pay.amount,
-            'type': 'debit'
-        })
-
-    # 2. Monthly Salary (Credit) - Salary on 1st
-    current_date = loop_start_date.replace(day=1)
-    
-    while current_date <= today.replace(day=1):
-        last_day = current_date + relativedelta(months=1) - timedelta(days=1)
-        
-        monthly_salary = staff.monthly_salary
-        leaves = StaffLeave.objects.filter(staff=staff, start_date__gte=current_date, end_date__lte=last_day)
-        total_leave_days = sum(leave.total_days() for leave in leaves)
-        daily_rate = monthly_salary / 30 
-        deduction = daily_rate * total_leave_days
-        net_salary = monthly_salary - deduction
-
-        all_transactions.append({
-            'date': current_date, 
-            'description': f"Salary Credited ({current_date.strftime('%B %Y')})",
-            'credit': net_salary,
-            'debit': 0,
-            'type': 'credit'
-        })
-
-        current_date += relativedelta(months=1)
-
-    # 3. Sort (Oldest first for calculation)
-    all_transactions.sort(key=lambda x: (x['date'], 0 if x['type'] == 'credit' else 1))
-
-    # 4. Calculate Balance
-    running_balance = 0
-    final_ledger = []
-    
-    for trans in all_transactions:
-        running_balance = running_balance + trans['credit'] - trans['debit']
-        trans['balance'] = running_balance
-        
-        include_row = True
-        if start_filter and str(trans['date']) < start_filter:
-            include_row = False
-        if end_filter and str(trans['date']) > end_filter:
-            include_row = False
-            
-        if include_row:
-            final_ledger.append(trans)
+    # Ledger engine (management/ledger.py) - filter ho to nazdeeki checkpoint se shuru
+    final_ledger, running_balance = staff_ledger(
+        staff,
+        start_date=_parse_date(start_filter),
+        end_date=_parse_date(end_filter),
+    )
 
     # Note: final_ledger.reverse() hata diya gaya hai taaki purana upar dikhe
     
@@ -361,7 +376,7 @@ def staff_profile_view(request, staff_id):
 @login_required
 def staff_list(request):
     # Sirf wahi dikhao jo abhi ACTIVE hain
-    staff_members = Staff.objects.filter(is_active=True).order_by('canteen__name', 'name')
+    staff_members = Staff.objects.for_list().active().order_by('canteen__name', 'name')
     return render(request, 'management/staff_list.html', {'all_staff': staff_members})
 
 # ==========================================
@@ -369,7 +384,7 @@ def staff_list(request):
 # ==========================================
 @login_required
 def staff_detail_view(request, staff_id):
-    staff = get_object_or_404(Staff, pk=staff_id)
+    staff = get_object_or_404(Staff.objects.with_canteen(), pk=staff_id)
     return render(request, 'management/staff_detail.html', {'staff': staff})
 
 
@@ -378,67 +393,96 @@ def staff_detail_view(request, staff_id):
 # ==========================================
 @login_required
 def export_monthly_expenses(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="Monthly_Expense_Report.csv"'
+    # Filters: ?start_date=&end_date=&canteen=&category= (default: is mahine ki 1st se)
+    today = date.today()
+    start_date = _parse_date(request.GET.get('start_date')) or today.replace(day=1)
+    end_date = _parse_date(request.GET.get('end_date'))
 
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'Category', 'Description', 'Canteen', 'Payment Mode', 'Amount'])
+    expenses = filtered_expenses(
+        start_date, end_date,
+        canteen_id=_parse_canteen_id(request.GET.get('canteen')),
+        category=request.GET.get('category'),
+    )
 
-    today = date.today()
-    first_day = today.replace(day=1)
-    
-    expenses = Expense.objects.filter(date__gte=first_day).order_by('-date')
+    # Rows DB se chunks me aate hain aur seedhe response me stream hote hain
+    return streaming_csv_response(
+        expense_rows(expenses),
+        "Monthly_Expense_Report.csv",
+    )
 
-    for expense in expenses:
-        canteen_name = expense.canteen.name if expense.canteen else "General"
-        writer.writerow([
-            expense.date, 
-            expense.category, 
-            expense.description, 
-            canteen_name, 
-            expense.payment_mode, 
-            expense.amount
-        ])
 
-    return response
+# ==========================================
+# Background Exports (run_export_worker chalata hai)
+# ==========================================
+
+@login_required
+def export_jobs(request):
+    if request.method == 'POST':
+        kind = request.POST.get('kind')
+        if kind not in dict(ExportJob.KIND_CHOICES):
+            messages.error(request, "Invalid export type.")
+            return redirect('export_jobs')
+        canteen_id = _parse_canteen_id(request.POST.get('canteen'))
+        if kind == 'CANTEEN_EXCEL' and canteen_id is None:
+            messages.error(request, "Canteen Excel report ke liye canteen chunein.")
+            return redirect('export_jobs')
+
+        params = export_params(
+            kind,
+            canteen_id=canteen_id,
+            start_date=_parse_date(request.POST.get('start_date')),
+            end_date=_parse_date(request.POST.get('end_date')),
+            category=request.POST.get('category'),
+        )
+        job = queue_export(kind, params, request.user)
+        if job.status == 'DONE':
+            messages.success(request, "Ye export pehle se taiyar hai - seedhe download karein.")
+        else:
+            messages.success(request, "Export queue me daal diya gaya hai.")
+        return redirect('export_jobs')
+
+    context = {
+        'jobs': ExportJob.objects.all()[:25],
+        'canteens': Canteen.objects.all().order_by('name'),
+        'kinds': ExportJob.KIND_CHOICES,
+        'today': date.today(),
+    }
+    return render(request, 'management/export_jobs.html', context)
+
+
+@login_required
+def export_job_status(request, job_id):
+    job = get_object_or_404(ExportJob, pk=job_id)
+    data = {
+        'id': job.pk,
+        'status': job.status,
+        'progress': job.progress,
+        'error': job.error,
+        'download_url': None,
+    }
+    if job.status == 'DONE':
+        data['download_url'] = reverse('export_job_download', args=[job.pk])
+    return JsonResponse(data)
+
+
+@login_required
+def export_job_download(request, job_id):
+    job = get_object_or_404(ExportJob, pk=job_id, status='DONE')
+    try:
+        fileobj = job.file.open('rb')
+    except (ValueError, FileNotFoundError):
+        raise Http404("Export file nahi mili - dobara export karein.")
+    return FileResponse(fileobj, as_attachment=True, filename=job.filename)
 
 
 # ==========================================
 # 9. Print Staff Ledger (Print View)
 # ==========================================
+
 @login_required
 def print_staff_ledger(request, staff_id):
-    staff = get_object_or_404(Staff, pk=staff_id)
-    loop_start_date = staff.joining_date if staff.joining_date else date(date.today().year, 1, 1)
-    today = date.today()
-    all_transactions = []
-
-    payments = SalaryPayment.objects.filter(staff=staff)
-    for pay in payments:
-        all_transactions.append({ 'date': pay.date, 'description': f"Payment ({pay.payment_type})", 'credit': 0, 'debit': pay.amount, 'type': 'debit' })
-
-    current_date = loop_start_date.replace(day=1)
-    while current_date <= today.replace(day=1):
-        last_day = current_date + relativedelta(months=1) - timedelta(days=1)
-        monthly_salary = staff.monthly_salary
-        leaves = StaffLeave.objects.filter(staff=staff, start_date__gte=current_date, end_date__lte=last_day)
-        deduction = (monthly_salary / 30) * sum(l.total_days() for l in leaves)
-        
-        all_transactions.append({
-            'date': current_date, # Salary on 1st
-            'description': f"Salary Credited ({current_date.strftime('%B %Y')})",
-            'credit': monthly_salary - deduction, 'debit': 0, 'type': 'credit'
-        })
-        current_date += relativedelta(months=1)
-
-    all_transactions.sort(key=lambda x: (x['date'], 0 if x['type'] == 'credit' else 1))
-
-    running_balance = 0
-    final_ledger = []
-    for trans in all_transactions:
-        running_balance = running_balance + trans['credit'] - trans['debit']
-        trans['balance'] = running_balance
-        final_ledger.append(trans)
+    staff = get_object_or_404(Staff.objects.with_canteen(), pk=staff_id)
+    final_ledger, running_balance = staff_ledger(staff, payment_label="Payment")
     
     return render(request, 'management/staff_ledger_print.html', {'staff': staff, 'ledger_data': final_ledger, 'overall_balance': running_balance, 'print_date': date.today()})
 
@@ -532,44 +576,282 @@ def add_consumption(request):
     return render(request, 'management/add_consumption.html', context)
 
 
-# management/views.py
+# ==========================================
+# Bulk Daily Entry Grid
+# ==========================================
+# ?date=YYYY-MM-DD            -> us din ki saari canteens
+# ?canteen=ID&date=YYYY-MM-DD -> us canteen ke date se 7 din
+# Ek POST, ek upsert (bulk_entry.upsert_daily_entries).
+
+BULK_ENTRY_WEEK = 7
+
 
 @login_required
-def consumption_report(request):
-    # 1. Defaults (Aaj ka mahina)
+def bulk_daily_entry(request):
+    canteens = list(Canteen.objects.order_by('name'))
+    try:
+        day = _as_date(request.GET.get('date')) or date.today()
+    except ValueError:
+        day = date.today()
+
+    canteen_id = request.GET.get('canteen')
+    selected_canteen = None
+    if canteen_id:
+        selected_canteen = next((c for c in canteens if str(c.pk) == canteen_id), None)
+        if selected_canteen is None:
+            raise Http404("Canteen nahi mili")
+        days = [day + timedelta(days=n) for n in range(BULK_ENTRY_WEEK)]
+        rows = [(selected_canteen, d) for d in days]
+    else:
+        days = [day]
+        rows = [(c, day) for c in canteens]
+
+    # Maujooda entries ek query me - grid me pehle se bhari dikhein
+    existing = DailyEntry.objects.filter(
+        canteen__in=[c for c, _ in rows], date__range=[days[0], days[-1]]
+    )
+    existing = {(e.canteen_id, e.date): e for e in existing}
+    entries = []
+    for canteen, d in rows:
+        entry = existing.get((canteen.pk, d)) or DailyEntry(date=d)
+        entry.canteen = canteen # billing_type ke liye alag query na ho
+        entries.append(entry)
+
+    if request.method == 'POST':
+        formset = DailyEntryGridFormSet(request.POST, entries=entries)
+        if formset.is_valid():
+            saved = upsert_daily_entries(formset.changed_entries())
+            messages.success(request, f"{saved} entries save ho gayi! ✅")
+            return redirect(request.get_full_path())
+        messages.error(request, "Kuch rows me galti hai - laal boxes check karein.")
+    else:
+        formset = DailyEntryGridFormSet(entries=entries)
+
+    context = {
+        'formset': formset,
+        'grid': list(zip(entries, formset.forms)),
+        'canteens': canteens,
+        'selected_canteen': selected_canteen,
+        'day': day,
+        'prev_day': day - timedelta(days=len(days)),
+        'next_day': day + timedelta(days=len(days)),
+        'show_tokens': any(c.billing_type == 'MONTHLY' for c, _ in rows),
+    }
+    return render(request, 'management/bulk_daily_entry.html', context)
+
+
+# ==========================================
+# CSV / Excel Import
+# ==========================================
+# "Error report (CSV)" button file ko sirf check (dry run) karke errors ki CSV deta hai.
+
+IMPORT_ERROR_LIMIT = 500 # page par itne, poori list CSV me
+
+
+@login_required
+def import_data(request):
+    result = None
+    if request.method == 'POST':
+        form = ImportUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            dry_run = form.cleaned_data['dry_run'] or request.POST.get('report') == 'csv'
+            try:
+                result = import_rows(form.cleaned_data['kind'], read_rows(upload, upload.name), dry_run=dry_run)
+            except ImportFileError as error:
+                form.add_error('file', str(error))
+
+        if result and request.POST.get('report') == 'csv':
+            return streaming_csv_response(error_report_rows(result), f"import_errors_{result.kind}.csv")
+        if result and result.dry_run:
+            messages.info(request, f"Check complete: {result.valid} sahi, {len(result.errors)} galat rows (kuch save nahi hua).")
+        elif result:
+            messages.success(request, f"{result.created} rows import ho gayi! ✅ ({len(result.errors)} rows me galti)")
+    else:
+        form = ImportUploadForm()
+
+    context = {
+        'form': form,
+        'result': result,
+        'errors': result.errors[:IMPORT_ERROR_LIMIT] if result else [],
+        'hidden_errors': max(len(result.errors) - IMPORT_ERROR_LIMIT, 0) if result else 0,
+    }
+    return render(request, 'management/import_data.html', context)
+
+
+# management/views.py
+
+def _consumption_entries(start_date, end_date, selected_canteen, cursor=None):
+    # Queryset (Data Filter karna) - ek page, naye pehle
+    entries = DailyEntry.objects.for_report().filter(date__range=[start_date, end_date])
+
+    if selected_canteen:
+        entries = entries.filter(canteen_id=selected_canteen)
+
+    page = keyset_page(entries, ('date', 'id'), cursor)
+    page.next_url = next_page_url(reverse('consumption_rows'), {
+        'start_date': start_date, 'end_date': end_date, 'canteen': selected_canteen,
+    }, page)
+    return page
+
+
+def _consumption_filters(request):
+    # Defaults (Aaj ka mahina)
     today = date.today()
     start_date = request.GET.get('start_date', today.replace(day=1).strftime('%Y-%m-%d'))
     end_date = request.GET.get('end_date', today.strftime('%Y-%m-%d'))
     selected_canteen = request.GET.get('canteen')
+    return start_date, end_date, selected_canteen
 
-    # 2. Queryset (Data Filter karna)
-    entries = DailyEntry.objects.filter(date__range=[start_date, end_date]).order_by('-date')
 
-    if selected_canteen:
-        entries = entries.filter(canteen_id=selected_canteen)
+def _consumption_etag(request):
+    # Page ke dropdown me saari canteens - unka counter bhi (cache key jaisa)
+    start_date, end_date, selected_canteen = _consumption_filters(request)
+    return report_etag(
+        request, 'consumption_report', int(selected_canteen) if selected_canteen else None,
+        _as_date(start_date), _as_date(end_date), extra=(request.GET.get('cursor'), canteens_version()),
+    )
 
-    # 3. Totals Calculate karna (Magic 🪄)
-    totals = entries.aggregate(
-        total_tea=Sum('tea_qty'),
-        total_nasta=Sum('nasta_qty'),
-        total_lunch=Sum('lunch_qty'),
-        total_dinner=Sum('dinner_qty'),
-        # Tokens
-        total_normal=Sum('normal_token_qty'),
-        total_special=Sum('special_token_qty'),
-        total_guest=Sum('guest_token_qty')
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_consumption_etag)
+def consumption_report(request):
+    # 1. Filters
+    start_date, end_date, selected_canteen = _consumption_filters(request)
+
+    def build_context():
+        # 2. Entries ka pehla page
+        entries = _consumption_entries(start_date, end_date, selected_canteen)
+
+        # 3. Totals Calculate karna (Magic 🪄) - poori range ke
+        totals = consumption_totals(start_date, end_date, selected_canteen or None)
+
+        # Context bhejna
+        return {
+            'entries': entries,
+            'totals': totals,
+            'all_canteens': Canteen.objects.all(),
+            'start_date': start_date,
+            'end_date': end_date,
+            'selected_canteen': int(selected_canteen) if selected_canteen else None
+        }
+
+    # 4. Report HTML cache se (canteen filter na ho to sab canteens wala version).
+    # Filter dropdown me saari canteens hain - ?canteen=X ka version sirf X ka,
+    # isliye canteen list ka counter bhi key me.
+    return cached_report(
+        request, 'management/consumption_report.html', {},
+        'consumption_report', 'management/partials/consumption_report.html',
+        int(selected_canteen) if selected_canteen else None,
+        _as_date(start_date), _as_date(end_date), build_context, extra=(canteens_version(),),
     )
 
-    # Context bhejna
-    context = {
-        'entries': entries,
-        'totals': totals,
-        'all_canteens': Canteen.objects.all(),
-        'start_date': start_date,
-        'end_date': end_date,
-        'selected_canteen': int(selected_canteen) if selected_canteen else None
-    }
-    return render(request, 'management/consumption_report.html', context)
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_consumption_etag)
+def consumption_rows(request):
+    # "Load more" ke agle rows (HTML fragment)
+    start_date, end_date, selected_canteen = _consumption_filters(request)
+    cursor = request.GET.get('cursor')
+
+    def build_context():
+        return {'page': _consumption_entries(start_date, end_date, selected_canteen, cursor)}
+
+    return HttpResponse(report_html(
+        'consumption_report', 'management/partials/consumption_rows.html',
+        int(selected_canteen) if selected_canteen else None,
+        _as_date(start_date), _as_date(end_date), build_context, extra=('rows', cursor),
+    ))
+
+
+# ==========================================
+# Canteen Comparison Report (sab canteens ek table me)
+# ==========================================
+
+# ?sort=<key> (chhota se bada) ya ?sort=-<key> (bada pehle)
+COMPARISON_SORTS = {
+    'name': "Canteen",
+    'total_income': "Income",
+    'expense_total': "Expense",
+    'salary_total': "Salary",
+    'profit': "Profit",
+    'net_profit': "Net (after Salary)",
+    'meals': "Meals",
+    'cost_per_meal': "Cost / Meal",
+}
+COMPARISON_DEFAULT_SORT = '-profit'
+
+
+def _comparison_filters(request):
+    start_date, end_date = _summary_dates(request)
+    sort = request.GET.get('sort') or COMPARISON_DEFAULT_SORT
+    if sort.lstrip('-') not in COMPARISON_SORTS:
+        sort = COMPARISON_DEFAULT_SORT
+    return start_date, end_date, sort
+
+
+def _sorted_comparison(rows, sort):
+    key = sort.lstrip('-')
+    # Cost / Meal khali (meals hi nahi) wali canteens hamesha neeche
+    present = [row for row in rows if getattr(row, key) is not None]
+    missing = [row for row in rows if getattr(row, key) is None]
+    present.sort(
+        key=lambda row: row.name.lower() if key == 'name' else getattr(row, key),
+        reverse=sort.startswith('-'),
+    )
+    return present + missing
+
+
+def _comparison_columns(sort):
+    # Header links: wahi column dobara click = ulta order, naya number column = bada pehle
+    columns = []
+    for key, label in COMPARISON_SORTS.items():
+        if sort.lstrip('-') == key:
+            next_sort, arrow = (key, '▼') if sort.startswith('-') else ('-' + key, '▲')
+        else:
+            next_sort, arrow = (key if key == 'name' else '-' + key), ''
+        columns.append({'key': key, 'label': label, 'sort': next_sort, 'arrow': arrow})
+    return columns
+
+
+def _comparison_etag(request):
+    start_date, end_date, sort = _comparison_filters(request)
+    return report_etag(request, 'canteen_comparison_report', None, start_date, end_date, extra=(sort,))
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_comparison_etag)
+def canteen_comparison_report(request):
+    start_date, end_date, sort = _comparison_filters(request)
+
+    def build_context():
+        comparison = canteen_comparison(start_date, end_date)
+        return {
+            'comparison': comparison,
+            'rows': _sorted_comparison(comparison.rows, sort),
+            'columns': _comparison_columns(sort),
+            'sort': sort,
+            'start_date': start_date,
+            'end_date': end_date,
+        }
+
+    # Sab canteens ka data - ALL_CANTEENS wale counters (koi bhi canteen badli to naya)
+    return cached_report(
+        request, 'management/canteen_comparison_report.html', {},
+        'canteen_comparison_report', 'management/partials/canteen_comparison_report.html',
+        None, start_date, end_date, build_context, extra=(sort,),
+    )
+
+
+@login_required
+def export_comparison_excel(request):
+    start_date, end_date, sort = _comparison_filters(request)
+    comparison = canteen_comparison(start_date, end_date)
+    comparison.rows = _sorted_comparison(comparison.rows, sort)
+    return comparison_excel_response(comparison)
 
 
 # management/views.py ke sabse niche paste karein
@@ -595,141 +877,8 @@ def export_canteen_excel(request, canteen_id):
     else:
         end_date = today
 
-    # 2. DATA FETCHING
-    incomes = DailyEntry.objects.filter(canteen=canteen, date__range=[start_date, end_date]).order_by('date')
-    expenses = Expense.objects.filter(canteen=canteen, date__range=[start_date, end_date]).order_by('date')
-
-    # Totals Calculate
-    total_income = (incomes.aggregate(Sum('cash_received'))['cash_received__sum'] or 0) + \
-                   (incomes.aggregate(Sum('online_received'))['online_received__sum'] or 0)
-    total_expense = expenses.aggregate(Sum('amount'))['amount__sum'] or 0
-    net_profit = total_income - total_expense
-
-    # 3. EXCEL WORKBOOK SETUP
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Report"
-
-    # --- STYLES ---
-    bold_font = Font(bold=True, size=12)
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid") 
-    center_align = Alignment(horizontal="center")
-    currency_format = '#,##0'
-
-    # --- A. REPORT HEADER ---
-    ws.merge_cells('A1:G1')
-    ws['A1'] = f"CANTEEN REPORT: {canteen.name.upper()}"
-    ws['A1'].font = Font(bold=True, size=16, color="000000")
-    ws['A1'].alignment = center_align
-
-    ws.merge_cells('A2:G2')
-    ws['A2'] = f"Period: {start_date} to {end_date}"
-    ws['A2'].alignment = center_align
-
-    # --- B. FINANCIAL SUMMARY BOX ---
-    ws['A4'] = "FINANCIAL SUMMARY"
-    ws['A4'].font = bold_font
-    
-    headers = ["Total Income", "Total Expense", "NET PROFIT"]
-    values = [total_income, total_expense, net_profit]
-
-    ws.append([]) 
-    ws.append(headers)
-    ws.append(values)
-
-    # Styling Summary
-    for col_num, cell in enumerate(ws[6], 1): # Header Row
-        cell.font = Font(bold=True, color="FFFFFF")
-        if col_num == 1: cell.fill = PatternFill(start_color="28a745", fill_type="solid") # Green
-        elif col_num == 2: cell.fill = PatternFill(start_color="dc3545", fill_type="solid") # Red
-        elif col_num == 3: cell.fill = PatternFill(start_color="007bff", fill_type="solid") # Blue
-        cell.alignment = center_align
-
-    for cell in ws[7]: # Value Row
-        cell.font = Font(bold=True, size=12)
-        cell.number_format = currency_format
-        cell.alignment = center_align
-
-    ws.append([]) 
-    ws.append([]) 
-
-    # --- C. DAILY CONSUMPTION & INCOME ---
-    ws.append(["DAILY INCOME & CONSUMPTION DETAILS"])
-    ws[ws.max_row][0].font = bold_font
-
-    columns = ['Date', 'Tea', 'Nasta', 'Lunch', 'Dinner', 'Cash (₹)', 'Online (₹)']
-    
-    show_tokens = False
-    if canteen.billing_type and 'monthly' in str(canteen.billing_type).lower():
-        show_tokens = True
-        columns.extend(['Normal Token', 'Special Token', 'Guest Token'])
-    
-    ws.append(columns)
-
-    for cell in ws[ws.max_row]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = center_align
-
-    for row in incomes:
-        data = [
-            row.date,
-            row.tea_qty, row.nasta_qty, row.lunch_qty, row.dinner_qty,
-            row.cash_received, row.online_received
-        ]
-        if show_tokens:
-            data.extend([row.normal_token_qty, row.special_token_qty, row.guest_token_qty])
-        
-        ws.append(data)
-
-    ws.append([]) 
-    ws.append([]) 
-
-    # --- D. EXPENSE DETAILS ---
-    ws.append(["DETAILED EXPENSES"])
-    ws[ws.max_row][0].font = bold_font
-
-    exp_columns = ['Date', 'Category', 'Description', 'Amount (₹)']
-    ws.append(exp_columns)
-    
-    exp_header_fill = PatternFill(start_color="C0504D", fill_type="solid")
-    for cell in ws[ws.max_row]:
-        cell.font = header_font
-        cell.fill = exp_header_fill
-        cell.alignment = center_align
-
-    for exp in expenses:
-        ws.append([exp.date, exp.category, exp.description, exp.amount])
-
-    # --- AUTO-ADJUST COLUMN WIDTH (FIXED LOGIC) ---
-    # Hum enumerate use karenge taaki column index mil sake (1, 2, 3...)
-    for i, col in enumerate(ws.columns, 1):
-        max_length = 0
-        
-        # FIX: Cell se puchhne ke bajaye, hum helper function se letter nikalenge
-        column_letter = get_column_letter(i) 
-        
-        for cell in col:
-            try:
-                if cell.value:
-                    val_len = len(str(cell.value))
-                    if val_len > max_length:
-                        max_length = val_len
-            except:
-                pass
-        
-        adjusted_width = (max_length + 2)
-        # Width set karte waqt sahi letter use karenge
-        ws.column_dimensions[column_letter].width = adjusted_width
-
-    # 4. RESPONSE
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    filename = f"{canteen.name}_Report_{start_date}_to_{end_date}.xlsx"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    wb.save(response)
-    return response
+    # 2. EXCEL (write-only mode, temp file se stream - management/exports.py)
+    return canteen_excel_response(canteen, start_date, end_date)
 
 @login_required
 def apply_leave(request):
@@ -748,15 +897,24 @@ def apply_leave(request):
 
 # management/views.py
 
+def _leave_page(staff_id, cursor=None):
+    # Saare leaves (Latest pehle), ek page
+    leaves = StaffLeave.objects.for_report()
+    if staff_id:
+        leaves = leaves.filter(staff_id=staff_id)
+
+    page = keyset_page(leaves, ('start_date', 'id'), cursor)
+    page.next_url = next_page_url(reverse('staff_leave_history_rows'), {'staff': staff_id}, page)
+    return page
+
+
 @login_required
 def staff_leave_history(request):
-    # 1. Default: Saare leaves nikalo (Latest pehle)
-    leaves = StaffLeave.objects.select_related('staff').all().order_by('-start_date')
-    
-    # 2. Filter Logic (Agar user ne staff select kiya hai)
+    # 1. Filter Logic (Agar user ne staff select kiya hai)
     staff_id = request.GET.get('staff') # URL se ID layega
-    if staff_id:
-        leaves = leaves.filter(staff_id=staff_id)
+
+    # 2. Leaves ka pehla page (baaki "Load more" se)
+    leaves = _leave_page(staff_id)
     
     # 3. Dropdown ke liye saare staff members
     all_staff = Staff.objects.all()
@@ -770,78 +928,46 @@ def staff_leave_history(request):
     return render(request, 'management/staff_leave_history.html', context)
 
 
+@login_required
+def staff_leave_history_rows(request):
+    # "Load more" ke agle rows (HTML fragment)
+    context = {
+        'page': _leave_page(request.GET.get('staff'), request.GET.get('cursor')),
+        'today': date.today(),
+    }
+    return render(request, 'management/partials/leave_rows.html', context)
+
+
 @login_required
 def generate_payroll(request):
     # Default: Current Month
     today = date.today()
     selected_month = request.GET.get('month', today.month)
     selected_year = request.GET.get('year', today.year)
-    
-    selected_month = int(selected_month)
-    selected_year = int(selected_year)
 
-    # 1. Mahine ke total din nikalo (28, 30, ya 31)
-    _, num_days = calendar.monthrange(selected_year, selected_month)
-    
-    payroll_data = []
-    
-    all_staff = Staff.objects.all()
-    
-    for staff in all_staff:
-        # Salary Calculation Logic
-        
-        # A. Total Unpaid Leaves Count karo
-        # Hum filter karenge: Staff wahi ho + Mahina/Saal wahi ho + Paid Leave FALSE ho
-        unpaid_leaves_count = 0
-        leaves = StaffLeave.objects.filter(
-            staff=staff, 
-            start_date__year=selected_year, 
-            start_date__month=selected_month,
-            is_paid_leave=False  # <--- SIRF UNPAID GINO
-        )
-        
-        for leave in leaves:
-            # Leave duration nikalo (End - Start + 1)
-            duration = (leave.end_date - leave.start_date).days + 1
-            unpaid_leaves_count += duration
-
-        # B. Paid Leaves Count (Just for info)
-        paid_leaves_count = 0
-        p_leaves = StaffLeave.objects.filter(
-            staff=staff, 
-            start_date__year=selected_year, 
-            start_date__month=selected_month,
-            is_paid_leave=True   # <--- PAID VALI
+    try:
+        month_date = date(int(selected_year), int(selected_month), 1)
+    except (TypeError, ValueError):
+        month_date = None
+
+    # GET par bhi payslips table me likhe jaate hain - isliye sirf pehle staff ki
+    # joining se is mahine tak. Aage/bahut purane mahine ke snapshot nahi banenge.
+    current_month = today.replace(day=1)
+    first_month = current_month
+    if month_date is not None and month_date < current_month:
+        first_joining = Staff.objects.aggregate(first=Min('joining_date'))['first']
+        if first_joining:
+            first_month = min(first_joining.replace(day=1), current_month)
+    if month_date is None or not first_month <= month_date <= current_month:
+        messages.error(
+            request,
+            f"Payroll sirf {first_month.strftime('%B %Y')} se {current_month.strftime('%B %Y')} tak ban sakta hai.",
         )
-        for pl in p_leaves:
-            duration = (pl.end_date - pl.start_date).days + 1
-            paid_leaves_count += duration
-
-        # C. Calculation 🧮
-        # Per Day Salary = Monthly / Total Days (e.g. 15000 / 30 = 500)
-        if num_days > 0:
-            per_day_salary = staff.monthly_salary / num_days
-        else:
-            per_day_salary = 0
-            
-        deduction = unpaid_leaves_count * per_day_salary
-        net_salary = staff.monthly_salary - deduction
-        
-        # Working Days (Present)
-        present_days = num_days - unpaid_leaves_count 
-        # Note: Paid leave ko hum working day hi mante hain salary ke hisab se
-
-        payroll_data.append({
-            'staff': staff,
-            'total_days': num_days,
-            'present_days': present_days,
-            'paid_leaves': paid_leaves_count,
-            'unpaid_leaves': unpaid_leaves_count,
-            'per_day': round(per_day_salary, 2),
-            'base_salary': staff.monthly_salary,
-            'deduction': round(deduction, 2),
-            'net_salary': round(net_salary, 2)
-        })
+        return redirect('generate_payroll')
+    selected_month, selected_year = month_date.month, month_date.year
+
+    # Payroll table se frozen payslips; sirf badle hue staff recompute hote hain
+    payroll_data = run_payroll(month_date)
 
     context = {
         'payroll_data': payroll_data,
@@ -871,7 +997,7 @@ def add_staff(request):
 @login_required
 def ex_staff_list(request):
     # Sirf wahi dikhao jo ACTIVE NAHI hain
-    ex_staff = Staff.objects.filter(is_active=False).order_by('-leaving_date')
+    ex_staff = Staff.objects.for_list().former().order_by('-leaving_date')
     return render(request, 'management/ex_staff_list.html', {'ex_staff': ex_staff})
 
 
@@ -935,4 +1061,17 @@ def rejoin_staff(request, staff_id):
         messages.success(request, f"Welcome back! {staff.name} has rejoined. Gap period marked as Unpaid Leave.")
         return redirect('staff_profile', staff_id=staff.id)
     
-    return redirect('staff_list')
\ No newline at end of file
+    return redirect('staff_list')
+
+
+# ==========================================
+# Performance Dashboard (sirf staff users)
+# ==========================================
+
+@staff_member_required
+def perf_dashboard(request):
+    # Rotating perf log (settings.PERF_LOG_FILE) se view-wise percentiles
+    context = {
+        'rows': view_percentiles(read_perf_log()),
+    }
+    return render(request, 'management/perf_dashboard.html', context)